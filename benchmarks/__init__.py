@@ -0,0 +1,3 @@
+"""
+Throughput and memory benchmarks of the validator hot paths, run with `python -m benchmarks`.
+"""
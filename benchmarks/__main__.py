@@ -0,0 +1,45 @@
+from argparse import ArgumentParser
+from .corpus import CORPORA, DEFAULT_BUNDLE_SIZE
+from .suite import DEFAULT_SAMPLE, DEFAULT_SIZE, compare, load_results, run_suite, save_results
+
+if __name__ == '__main__':
+    """
+    Benchmarks every shipped config (or the ones given with --config) against a synthetic corpus.
+    Arguments:
+      --size (int): Records per corpus.
+      --output (string): Path of the JSON file the results are saved to.
+      --compare (string): Path of a previously saved results file to compare records/sec against.
+
+    Output:
+      Prints records/sec, peak RSS and the most expensive fields of each config.
+    """
+    parser = ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--config", dest="configs", action="append", choices=sorted(CORPORA), help="Config to benchmark, may be repeated. Defaults to all shipped configs.", metavar="CONFIG")
+    parser.add_argument("--size", dest="size", type=int, default=DEFAULT_SIZE, help="Number of records generated per corpus.", metavar="SIZE")
+    parser.add_argument("--sample", dest="sample", type=int, default=DEFAULT_SAMPLE, help="Number of records used for the per-field and allocation measurements.", metavar="SAMPLE")
+    parser.add_argument("--bundle-size", dest="bundle_size", type=int, default=DEFAULT_BUNDLE_SIZE, help="bundleSize of the generated JSON records.", metavar="BUNDLESIZE")
+    parser.add_argument("--workers", dest="workers", type=int, help="Number of worker processes passed to validate_stream.", metavar="WORKERS")
+    parser.add_argument("--failures-only", dest="failures_only", action="store_true", help="Validate in failures-only mode.")
+    parser.add_argument("--in-process", dest="in_process", action="store_true", help="Run every config in this process instead of a fresh one, peak RSS is then cumulative.")
+    parser.add_argument("--top-fields", dest="top_fields", type=int, default=5, help="Number of most expensive fields printed per config.", metavar="N")
+    parser.add_argument("--output", dest="output_path", help="Path of the JSON file the results are saved to.", metavar="OUTPUTPATH")
+    parser.add_argument("--compare", dest="compare_path", help="Path of a previous results file to compare against.", metavar="COMPAREPATH")
+    args = parser.parse_args()
+
+    results = run_suite(args.configs, isolated=not args.in_process, size=args.size, sample=args.sample,
+        bundle_size=args.bundle_size, workers=args.workers, failures_only=args.failures_only)
+
+    for benchmark in results["benchmarks"]:
+        print("%-26s %-26s %10.0f rec/s  peak RSS %7d KB  %8.1f alloc blocks/rec  %d failures" % (benchmark["config"], benchmark["corpus"],
+            benchmark["records_per_sec"] or 0, benchmark["peak_rss_kb"], benchmark["allocations"]["blocks_per_record"], benchmark["failures"]))
+        for path, cost in list(benchmark["fields"].items())[:args.top_fields]:
+            print("    %-90s %9.2f us/call %8d calls" % (path, cost["us_per_call"], cost["calls"]))
+
+    if args.compare_path:
+        print("\nCompared to %s:" % args.compare_path)
+        for config_name, previous_rate, current_rate, ratio in compare(load_results(args.compare_path), results):
+            print("%-26s %10.0f -> %10.0f rec/s  (x%.2f)" % (config_name, previous_rate, current_rate, ratio))
+
+    if args.output_path:
+        save_results(results, args.output_path)
+        print("\nResults saved to %s" % args.output_path)
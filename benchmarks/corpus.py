@@ -0,0 +1,74 @@
+import copy
+import json
+import os
+from datetime import timedelta
+from odevalidator.timestamps import parse_timestamp
+
+TESTFILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'testfiles')
+CONFIGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'odevalidator', 'configs')
+
+# template data file each shipped config is benchmarked against
+CORPORA = {
+    'config.ini': 'good.json',
+    'config_alert.ini': 'good.json',
+    'config_bsm.ini': 'good_bsmTx.json',
+    'config_tim.ini': 'good_broadcast_tim.json',
+    'configAltPercent.ini': 'good_altValPercent.json',
+    'csvconfig.ini': 'good_vsl.csv',
+    'csv_timestamp_config.ini': 'good_vsl_timestamp.csv',
+    'regex_config.ini': 'good_regex.csv',
+}
+
+DEFAULT_BUNDLE_SIZE = 10
+# spacing of the generated recordGeneratedAt/odeReceivedAt timestamps
+RECORD_INTERVAL = timedelta(milliseconds=100)
+
+def read_template(filename):
+    """
+    Returns the data lines of a file in tests/testfiles, without blank lines and '#' comments.
+    """
+    with open(os.path.join(TESTFILES_DIR, filename)) as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+def generate_corpus(filename, size, bundle_size=DEFAULT_BUNDLE_SIZE):
+    """
+    Builds a corpus of `size` records by cycling through the records of a template file. JSON records carrying a
+    serialId are renumbered into consecutive bundles of `bundle_size` records with increasing timestamps, so the
+    sequential checks see a well-formed stream. CSV corpora keep the template header as their first line.
+    """
+    lines = read_template(filename)
+    if filename.endswith('.csv'):
+        header, rows = lines[0], lines[1:]
+        return [header] + [rows[index % len(rows)] for index in range(size)]
+
+    templates = [json.loads(line) for line in lines]
+    start_time = None
+    for template in templates:
+        metadata = template.get('metadata', {})
+        if 'recordGeneratedAt' in metadata:
+            start_time = parse_timestamp(metadata['recordGeneratedAt'])
+            break
+
+    corpus = []
+    for index in range(size):
+        record = templates[index % len(templates)]
+        metadata = record.get('metadata')
+        if metadata is not None and 'serialId' in metadata:
+            record = copy.deepcopy(record)
+            metadata = record['metadata']
+            metadata['serialId'].update({
+                'bundleSize': bundle_size,
+                'bundleId': index // bundle_size,
+                'recordId': index % bundle_size,
+                'serialNumber': index,
+            })
+            if start_time is not None:
+                timestamp = _format_timestamp(start_time + index * RECORD_INTERVAL)
+                for key in ('recordGeneratedAt', 'odeReceivedAt'):
+                    if key in metadata:
+                        metadata[key] = timestamp
+        corpus.append(json.dumps(record))
+    return corpus
+
+def _format_timestamp(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%S.') + '%03dZ' % (value.microsecond // 1000)
@@ -0,0 +1,179 @@
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from odevalidator import TestCase
+from odevalidator.sequential import Sequential
+from .corpus import CONFIGS_DIR, CORPORA, DEFAULT_BUNDLE_SIZE, generate_corpus
+
+DEFAULT_SIZE = 5000
+# records of the corpus used for the per-field timings and the allocation pass, both are far slower than a plain run
+DEFAULT_SAMPLE = 1000
+TOP_ALLOCATION_SITES = 5
+
+# list indexes are folded so that every element of a list is reported under one path
+LIST_INDEX_PATTERN = re.compile(r'\{\d+\}')
+
+def run_benchmark(config_name, size=DEFAULT_SIZE, sample=DEFAULT_SAMPLE, bundle_size=DEFAULT_BUNDLE_SIZE, workers=None, failures_only=False):
+    """
+    Benchmarks one shipped config against a synthetic corpus of `size` records and returns the measurements as a
+    JSON-serialisable dict: throughput of a full validate_stream run, per-field and per-phase cost over the first
+    `sample` records, peak RSS of the process and the allocation sites still holding memory after the sample.
+    """
+    data_file = CORPORA[config_name]
+    lines = generate_corpus(data_file, size, bundle_size)
+    test_case = TestCase(os.path.join(CONFIGS_DIR, config_name), failures_only=failures_only)
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    gc_before = [stats['collections'] for stats in gc.get_stats()]
+    start = time.perf_counter()
+    result_count = 0
+    failure_count = 0
+    for result in test_case.validate_stream(lines, workers=workers):
+        result_count += 1
+        for field_validation in result.field_validations:
+            if not field_validation.valid:
+                failure_count += 1
+    elapsed = time.perf_counter() - start
+    gc_collections = [stats['collections'] - before for stats, before in zip(gc.get_stats(), gc_before)]
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    sample_lines = list(test_case._iter_records(lines))
+    header_lines = []
+    if test_case.has_header:
+        header_lines, sample_lines = sample_lines[:1], sample_lines[1:]
+    sample_lines = sample_lines[:sample]
+
+    return {
+        "config": config_name,
+        "corpus": data_file,
+        "records": size,
+        "workers": workers,
+        "failures_only": failures_only,
+        "seconds": elapsed,
+        "records_per_sec": size / elapsed if elapsed else None,
+        "results": result_count,
+        "failures": failure_count,
+        "gc_collections": gc_collections,
+        "rss_before_kb": rss_before,
+        "peak_rss_kb": peak_rss,
+        "sample": len(sample_lines),
+        "phases": _phase_costs(test_case, sample_lines),
+        "fields": _field_costs(test_case, sample_lines),
+        "allocations": _allocations(test_case, header_lines, sample_lines),
+    }
+
+def _phase_costs(test_case, lines):
+    parse = test_case.record_parser[test_case.data_type]
+    start = time.perf_counter()
+    records = [parse(line) for line in lines]
+    parse_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for record in records:
+        test_case.populate_field_list(record)
+    list_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for record in records:
+        test_case._validate(record)
+    validate_seconds = time.perf_counter() - start
+
+    sequential_seconds = 0.0
+    if test_case.SequentialValidation and records:
+        seq = Sequential(test_case.skip_sequential_checks)
+        start = time.perf_counter()
+        for record in records:
+            seq.add_record(Sequential.slim_record(record))
+        seq.close()
+        sequential_seconds = time.perf_counter() - start
+
+    return {
+        "parse_seconds": parse_seconds,
+        "list_expansion_seconds": list_seconds,
+        "validate_seconds": validate_seconds,
+        "sequential_seconds": sequential_seconds,
+    }
+
+def _field_costs(test_case, lines):
+    parse = test_case.record_parser[test_case.data_type]
+    calls = defaultdict(int)
+    seconds = defaultdict(float)
+    timer = time.perf_counter
+    for line in lines:
+        record = parse(line)
+        for field in test_case.field_list + test_case.populate_field_list(record):
+            start = timer()
+            field.validate(record)
+            elapsed = timer() - start
+            path = LIST_INDEX_PATTERN.sub('{n}', field.path)
+            calls[path] += 1
+            seconds[path] += elapsed
+
+    costs = {path: {"calls": calls[path], "total_us": seconds[path] * 1e6, "us_per_call": seconds[path] * 1e6 / calls[path]} for path in calls}
+    return dict(sorted(costs.items(), key=lambda item: item[1]["total_us"], reverse=True))
+
+def _allocations(test_case, header_lines, lines):
+    # results are kept alive so the snapshot shows what a run that collects its results holds on to
+    tracemalloc.start()
+    try:
+        results = list(test_case.validate_stream(header_lines + lines))
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(True, '*odevalidator*')])
+    statistics = snapshot.statistics('lineno')
+    return {
+        "traced_current_bytes": current,
+        "traced_peak_bytes": peak,
+        "blocks": sum(stat.count for stat in statistics),
+        "blocks_per_record": sum(stat.count for stat in statistics) / len(lines) if lines else 0,
+        "results": len(results),
+        "top_sites": [{"site": str(stat.traceback[0]), "blocks": stat.count, "bytes": stat.size} for stat in statistics[:TOP_ALLOCATION_SITES]],
+    }
+
+def run_isolated(config_name, **kwargs):
+    """
+    Runs run_benchmark in a freshly spawned process so that the peak RSS only reflects that config.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_benchmark, config_name, **kwargs).result()
+
+def run_suite(config_names=None, isolated=True, **kwargs):
+    config_names = config_names or sorted(CORPORA)
+    runner = run_isolated if isolated else run_benchmark
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        "benchmarks": [runner(config_name, **kwargs) for config_name in config_names],
+    }
+
+def compare(previous, current):
+    """
+    Returns (config, previous records/sec, current records/sec, ratio) for every config found in both runs.
+    """
+    previous_rates = {benchmark["config"]: benchmark["records_per_sec"] for benchmark in previous["benchmarks"]}
+    rows = []
+    for benchmark in current["benchmarks"]:
+        previous_rate = previous_rates.get(benchmark["config"])
+        if previous_rate:
+            rows.append((benchmark["config"], previous_rate, benchmark["records_per_sec"], benchmark["records_per_sec"] / previous_rate))
+    return rows
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+def save_results(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
@@ -1,3 +1,4 @@
 from .validator import *
 from .result import *
 from .sequential import *
+from .profiling import *
@@ -1,39 +1,130 @@
-import json
-import queue
+import os
+import sys
 from argparse import ArgumentParser
-from odevalidator import TestCase
+from odevalidator import TestCase, ValidationProfiler
+from odevalidator.checkpoint import DEFAULT_CHECKPOINT_INTERVAL, Checkpointer
+from odevalidator.decoding import JSON_BACKEND_AUTO, JSON_BACKENDS
+from odevalidator.ingest import read_lines
+from odevalidator.writers import OUTPUT_FAILURES, OUTPUT_FORMATS, OUTPUT_SUMMARY, OUTPUT_TEXT, get_writer
 
 if __name__ == '__main__':
     """
     Provided for convenience. Allows users to perform validation using only the library.
     Arguments:
-      --data-file (string): Newline-separated file containing records in json format.
+      --data-file (string): Newline-separated file containing records in json format, optionally gzip-compressed.
+      --output-format (string): text (default), ndjson, failures or summary.
+      --output (string): File the results are written to instead of stdout.
+      --profile (int): Print the N most expensive config sections after validating.
+      --checkpoint (string): File the progress of the run is saved to, every --checkpoint-interval records.
+      --resume: Continue the run from its last checkpoint.
+      --sample-rate (float) / --sample-size (int): Only validate a hash-based sample or a reservoir of the records.
+      --duplicates: Report duplicated records.
 
     Output:
-      Prints results in json.dumps format.
+      Writes results as they are produced, in the selected output format.
     """
     parser = ArgumentParser()
     parser.add_argument("--data-file", dest="data_file_path", help="Path to log data file that will be sent to the ODE for validation.", metavar="DATAFILEPATH", required=True)
     parser.add_argument("--config-file", dest="config_file_path", help="Path to config.ini file that will be used to validate the data file.", metavar="CONFIGFILEPATH", required=False)
+    parser.add_argument("--workers", dest="workers", type=int, help="Number of worker processes used to validate records in parallel.", metavar="WORKERS", required=False)
+    parser.add_argument("--json-backend", dest="json_backend", choices=JSON_BACKENDS, default=JSON_BACKEND_AUTO, help="Decoder used for json records.", required=False)
+    parser.add_argument("--output-format", dest="output_format", choices=OUTPUT_FORMATS, default=OUTPUT_TEXT, help="Format results are written in.", required=False)
+    parser.add_argument("--output", dest="output_path", help="Path of the file results are written to, defaults to stdout.", metavar="OUTPUTPATH", required=False)
+    parser.add_argument("--include-records", dest="include_records", action="store_true", help="Include the validated records in ndjson and failures output.", required=False)
+    parser.add_argument("--sequential-shards", dest="sequential_shards", type=int, help="Partition the sequential checks by streamId/bundleId into N shards checked in parallel.", metavar="N", required=False)
+    parser.add_argument("--profile", dest="profile", type=int, help="Profile the run and print the N most expensive config sections.", metavar="N", required=False)
+    parser.add_argument("--checkpoint", dest="checkpoint_path", help="Path of the file the progress of the run is saved to, removed once the run completes.", metavar="CHECKPOINTPATH", required=False)
+    parser.add_argument("--checkpoint-interval", dest="checkpoint_interval", type=int, default=DEFAULT_CHECKPOINT_INTERVAL, help="Number of records validated between two checkpoints.", metavar="N", required=False)
+    parser.add_argument("--resume", dest="resume", action="store_true", help="Resume the run from the file given with --checkpoint, if it exists.", required=False)
+    parser.add_argument("--sample-rate", dest="sample_rate", type=float, help="Only validate the fields of a deterministic, hash-based sample of this fraction of the records.", metavar="RATE", required=False)
+    parser.add_argument("--sample-size", dest="sample_size", type=int, help="Only validate the fields of a uniform sample (reservoir) of N records.", metavar="N", required=False)
+    parser.add_argument("--sample-seed", dest="sample_seed", type=int, help="Seed of the reservoir sample.", metavar="SEED", required=False)
+    parser.add_argument("--confidence", dest="confidence", type=float, help="Confidence level of the failure rate intervals of a sampled run, defaults to 0.95.", metavar="LEVEL", required=False)
+    parser.add_argument("--duplicates", dest="duplicates", action="store_true", help="Report records whose metadata.serialId was seen before, even when the config doesn't enable duplicate detection.", required=False)
     args = parser.parse_args()
+    if args.resume and not args.checkpoint_path:
+        parser.error("--resume requires --checkpoint")
+    sampler = None
+    if args.sample_rate is not None or args.sample_size is not None:
+        if args.sample_rate is not None and args.sample_size is not None:
+            parser.error("--sample-rate and --sample-size are exclusive")
+        if args.checkpoint_path or args.workers:
+            parser.error("a sampled run can't be checkpointed nor use --workers")
+        from odevalidator.sampling import DEFAULT_CONFIDENCE, HashSampler, ReservoirSampler  # only imported by sampled runs
+        confidence = args.confidence if args.confidence is not None else DEFAULT_CONFIDENCE
+        if args.sample_rate is not None:
+            sampler = HashSampler(args.sample_rate, confidence)
+        else:
+            sampler = ReservoirSampler(args.sample_size, args.sample_seed, confidence)
+    profiler = ValidationProfiler() if args.profile else None
 
-    msg_list = []
-    with open(args.data_file_path, 'r') as f:
-        msg_list = f.read().splitlines()
+    test_case_args = {
+        "profiler": profiler,
+        "json_backend": args.json_backend,
+        "retain_records": args.include_records,
+        # valid fields are only counted when they are not written out
+        "failures_only": args.output_format in (OUTPUT_FAILURES, OUTPUT_SUMMARY),
+        "sequential_shards": args.sequential_shards,
+        "duplicate_detection": True if args.duplicates else None,
+    }
+    if args.config_file_path:
+        test_case_args["filepath"] = args.config_file_path
+    test_case = TestCase(**test_case_args)
 
-    msg_queue = queue.Queue()
-    for msg in msg_list:
-        if msg and not msg.startswith('#'):
-            msg_queue.put(msg)
+    checkpointer = None
+    checkpoint = None
+    if args.checkpoint_path:
+        checkpointer = Checkpointer(args.checkpoint_path, args.checkpoint_interval)
+        checkpoint = checkpointer.load() if args.resume else None
+    output_path = os.path.abspath(args.output_path) if args.output_path else None
+    if checkpoint is not None and checkpoint.extra["output_path"] != output_path:
+        # the resumed run appends to the output of the checkpointed one, anything else would lose or mangle results
+        parser.error("the checkpointed run wrote its results to '%s', resume it with the same --output" % (checkpoint.extra["output_path"] or "stdout"))
 
-    results = TestCase(args.config_file_path).validate_queue(msg_queue)
-    #print(results[0].field_validations[0].valid)
+    if args.output_path and checkpoint is not None:
+        # drop what was written after the checkpoint, it is written again
+        output = open(args.output_path, 'r+')
+        output.truncate(checkpoint.extra["output_offset"])
+        output.seek(0, 2)
+    else:
+        output = open(args.output_path, 'w') if args.output_path else sys.stdout
+    # reports other than the results go to stderr when the results are written to stdout in a machine readable format
+    report = sys.stdout if args.output_path or args.output_format == OUTPUT_TEXT else sys.stderr
+    try:
+        # lines are streamed from the file (gzip-compressed logs included) and results are written as they come
+        with get_writer(args.output_format, output, test_case) as writer:
+            if checkpointer is not None:
+                def checkpoint_state():
+                    output.flush()
+                    return {"writer": writer.get_state(), "output_path": output_path, "output_offset": output.tell() if args.output_path else None}
+                checkpointer.extra_state = checkpoint_state
+            if checkpoint is not None:
+                writer.set_state(checkpoint.extra["writer"])
+            if sampler is not None:
+                writer.write_all(test_case.validate_sample(read_lines(args.data_file_path), sampler))
+            else:
+                writer.write_all(test_case.validate_file(args.data_file_path, workers=args.workers, checkpointer=checkpointer, checkpoint=checkpoint))
+    finally:
+        if args.output_path:
+            output.close()
 
-    success = True
-    for result in results:
-        for field in result.field_validations:
-            if field.valid == False:
-                print("Invalid field '" + field.field_path + "' due to " + field.details + " at log id: " + str(result.serial_id))
-            success = success and field.valid
+    if args.output_path:
+        print("\nSuccess: ", writer.success, "\n", file=report)
 
-    print ("\nSuccess: ", success,"\n")
+    if sampler is not None:
+        print("Sampled %d of %d records, failure rates at %g confidence:" % (sampler.report.sampled_count, sampler.report.record_count, sampler.report.confidence), file=report)
+        for field_path, rate in sampler.report.failure_rates().items():
+            if rate["Failed"]:
+                print("  %8.4f [%.4f, %.4f] %8d of %8d  %s" % (rate["FailureRate"], rate["Low"], rate["High"], rate["Failed"], rate["Sampled"], field_path), file=report)
+
+    if test_case.duplicate_detector is not None:
+        duplicates = test_case.duplicate_detector
+        print("Duplicates: %d confirmed, %d probable in %d records (false positive rate %.2g)" % (duplicates.duplicate_count, duplicates.probable_count, duplicates.record_count, duplicates.filter.false_positive_rate()), file=report)
+
+    if profiler is not None:
+        print("Profiled %d records:" % profiler.record_count, file=report)
+        for phase, seconds in profiler.phase_seconds.items():
+            print("  %-10s %10.3f s" % (phase, seconds), file=report)
+        print("\nTop %d config sections:" % args.profile, file=report)
+        for section, seconds, calls in profiler.top_sections(args.profile):
+            print("  %10.3f s %10d calls  %s" % (seconds, calls, section), file=report)
@@ -0,0 +1,78 @@
+import os
+from .result import ValidatorException
+
+# records validated between two checkpoints
+DEFAULT_CHECKPOINT_INTERVAL = 100000
+# bump when the layout of checkpoints changes
+CHECKPOINT_FORMAT_VERSION = 1
+
+class Checkpoint:
+    """
+    State of a validation run of a data file after its first `offset` bytes: the serial id counter, the summary and
+    the sequential check state of the run, see ValidationRun.get_state(). `extra` holds whatever the caller saved
+    along, e.g. the state of its result writer.
+    """
+    def __init__(self, data_path, config_path, offset, run_state, extra=None):
+        self.version = CHECKPOINT_FORMAT_VERSION
+        self.data_path = os.path.abspath(data_path)
+        self.config_path = os.path.abspath(config_path)
+        self.offset = offset
+        self.run_state = run_state
+        self.extra = extra
+
+    def check(self, data_path, config_path):
+        if self.version != CHECKPOINT_FORMAT_VERSION:
+            raise ValidatorException("Checkpoint has format version %s, expected %s" % (self.version, CHECKPOINT_FORMAT_VERSION))
+        if self.data_path != os.path.abspath(data_path) or self.config_path != os.path.abspath(config_path):
+            raise ValidatorException("Checkpoint of '%s' validated with '%s' can't resume '%s' validated with '%s'" % (self.data_path, self.config_path, data_path, config_path))
+
+class Checkpointer:
+    """
+    Saves a Checkpoint of a file validation every `interval` records, see TestCase.validate_file. Checkpoints are
+    pickles written under a temporary name and renamed, so a run killed while saving leaves the previous checkpoint
+    intact; only load checkpoints from a location as trusted as the code itself. `extra_state`, when given, is called
+    before each save and its picklable result is saved as the checkpoint's `extra`. The checkpoint is removed once
+    the run completes.
+    """
+    def __init__(self, path, interval=DEFAULT_CHECKPOINT_INTERVAL, extra_state=None):
+        self.path = path
+        self.interval = interval
+        self.extra_state = extra_state
+        self.saved_count = 0
+
+    def load(self):
+        """
+        Returns the last saved Checkpoint, or None when there is none.
+        """
+        import pickle  # only imported when checkpoints are used
+        try:
+            with open(self.path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            raise ValidatorException("Checkpoint '%s' could not be read: %s" % (self.path, e))
+
+    def save(self, data_path, config_path, offset, run_state):
+        import pickle
+        import tempfile
+        extra = self.extra_state() if self.extra_state is not None else None
+        checkpoint = Checkpoint(data_path, config_path, offset, run_state, extra)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.saved_count += 1
+        return checkpoint
+
+    def remove(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,113 @@
+class RecordLookups:
+    """
+    Values read from the record being validated, shared by every field of a test case. begin() opens a record and,
+    with a trie (see validator.PathTrie), reads the paths of the compiled fields in a single walk; other paths are
+    read on first use. clear() closes the record. Lookups on any other data are not cached.
+    """
+    __slots__ = ('data', 'values', 'trie')
+
+    def __init__(self, trie=None):
+        self.data = None
+        self.values = {}
+        self.trie = trie
+
+    def begin(self, data):
+        # the values dict is reused by every record
+        self.data = data
+        values = self.values
+        values.clear()
+        if self.trie is not None:
+            self.trie.resolve(data, values)
+        return values
+
+    def clear(self):
+        self.data = None
+        self.values.clear()
+
+    def get(self, accessor, data):
+        return _lookup(accessor, data, self.values if data is self.data else None)
+
+class ConditionIndex:
+    """
+    Decision structure of the compiled EqualsValue conditions of a field. Conditions are grouped by the field they
+    refer to and every group maps each of their fieldValues to the conditions it meets, so matching a record takes a
+    lookup per referenced field instead of a scan of every fieldValues list. Conditions without fieldValues, and
+    fieldValues that can't be hashed, are still checked one by one. Matches are returned in config order.
+    """
+    def __init__(self, conditions):
+        self.conditions = conditions
+        # (referenced field accessor, {value: (positions,)}, (positions checked with 'in'))
+        groups = {}
+        existence = []
+        for position, (if_accessor, expected_field_values, then_part, sw_accessor, match_values) in enumerate(conditions):
+            if expected_field_values is None:
+                existence.append(position)
+                continue
+            accessor, index, linear = groups.setdefault(if_accessor.path, (if_accessor, {}, []))
+            try:
+                if not isinstance(expected_field_values, (list, tuple)):
+                    raise TypeError  # e.g. a string, 'in' would be a substring test
+                values = set(expected_field_values)
+            except TypeError:
+                linear.append(position)
+                continue
+            for value in values:
+                index[value] = index.get(value, ()) + (position,)
+        self.groups = tuple((accessor, index, tuple(linear)) for accessor, index, linear in groups.values())
+        self.existence = tuple(existence)
+        # positions only need sorting when they can come from several places
+        self.ordered = len(self.groups) + bool(self.existence) + sum(bool(linear) for accessor, index, linear in self.groups) <= 1
+        # the common case of conditions on a single field with hashable fieldValues is one dict lookup
+        self.single = self.groups[0][:2] if len(self.groups) == 1 and not self.groups[0][2] and not self.existence else None
+        # conditions that only mark the field for sequential check skipping
+        self.skip_sequential = tuple(bool(then_part and 'skipSequentialValidation' in then_part and then_part['skipSequentialValidation'])
+                                     for if_accessor, expected_field_values, then_part, sw_accessor, match_values in conditions)
+
+    def matches(self, data, data_field_value, lookups=None):
+        """
+        Returns a sequence of the positions of the conditions met by a record, in config order.
+        """
+        values = lookups.values if lookups is not None and lookups.data is data else None
+        if self.single is not None:
+            accessor, index = self.single
+            path = accessor.path
+            if values is None:
+                referenced_field_value = accessor.get(data)
+            elif path in values:
+                referenced_field_value = values[path]
+            else:
+                referenced_field_value = values[path] = accessor.get(data)
+            try:
+                return index.get(referenced_field_value, ())
+            except TypeError:
+                return ()  # unhashable values can't equal any of the indexed ones
+
+        positions = []
+        for accessor, index, linear in self.groups:
+            referenced_field_value = _lookup(accessor, data, values)
+            try:
+                hit = index.get(referenced_field_value)
+            except TypeError:
+                hit = None
+            if hit:
+                positions.extend(hit)
+            for position in linear:
+                if referenced_field_value in self.conditions[position][1]:
+                    positions.append(position)
+        if not data_field_value:
+            # a condition without fieldValues is met when neither the referenced field nor the field has a value
+            for position in self.existence:
+                if not _lookup(self.conditions[position][0], data, values):
+                    positions.append(position)
+        if not self.ordered and len(positions) > 1:
+            positions.sort()
+        return positions
+
+def _lookup(accessor, data, values):
+    if values is None:
+        return accessor.get(data)
+    path = accessor.path
+    if path in values:
+        return values[path]
+    value = values[path] = accessor.get(data)
+    return value
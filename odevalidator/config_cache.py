@@ -0,0 +1,62 @@
+import os
+import sys
+
+# setting this environment variable enables the cache for every TestCase that isn't given a cache_dir
+CACHE_DIR_ENV = 'ODEVALIDATOR_CACHE_DIR'
+# bump when the layout of compiled configs changes
+CACHE_FORMAT_VERSION = '1'
+
+# compiled configs are pickled Field objects, so they are only valid for the code that built them
+_COMPILED_SOURCES = tuple(os.path.join(os.path.dirname(os.path.abspath(__file__)), name) for name in ('validator.py', 'conditions.py'))
+
+def default_cache_dir():
+    return os.environ.get(CACHE_DIR_ENV) or None
+
+class CompiledConfigCache:
+    """
+    Directory of compiled configs. An entry is keyed by the absolute path, modification time and sha256 of the INI
+    file, so editing a config (or the validator code) simply misses the cache. Entries are pickles: only point the
+    cache at a directory that is as trusted as the code itself. Failing to read or write an entry is not an error,
+    the config is compiled from the INI file instead.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def entry_path(self, config_path, content):
+        import hashlib  # like pickle and tempfile, only imported when the cache is used
+        config_stat = os.stat(config_path)
+        key = [CACHE_FORMAT_VERSION, sys.version, os.path.abspath(config_path), str(config_stat.st_mtime_ns), hashlib.sha256(content).hexdigest()]
+        for source in _COMPILED_SOURCES:
+            source_stat = os.stat(source)
+            key += [str(source_stat.st_mtime_ns), str(source_stat.st_size)]
+        key = '\0'.join(key)
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.pickle')
+
+    def load(self, config_path):
+        import pickle
+        try:
+            with open(config_path, 'rb') as f:
+                entry_path = self.entry_path(config_path, f.read())
+            with open(entry_path, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def save(self, config_path, compiled):
+        import pickle
+        import tempfile
+        try:
+            with open(config_path, 'rb') as f:
+                entry_path = self.entry_path(config_path, f.read())
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # written under a temporary name and renamed, so concurrent jobs never read a partial entry
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, entry_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except (OSError, pickle.PicklingError):
+            pass
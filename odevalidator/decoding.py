@@ -0,0 +1,167 @@
+import json
+from json.decoder import JSONDecodeError, WHITESPACE, scanstring
+from .result import ValidatorException
+
+try:
+    import orjson
+except ImportError:  # optional dependency, see extras_require in setup.py
+    orjson = None
+
+JSON_BACKEND_AUTO = 'auto'
+JSON_BACKEND_JSON = 'json'
+JSON_BACKEND_ORJSON = 'orjson'
+JSON_BACKEND_LAZY = 'lazy'
+JSON_BACKENDS = (JSON_BACKEND_AUTO, JSON_BACKEND_JSON, JSON_BACKEND_ORJSON, JSON_BACKEND_LAZY)
+
+def orjson_loads(line):
+    try:
+        return orjson.loads(line)
+    except orjson.JSONDecodeError:
+        # orjson is stricter than json (NaN, integers over 64 bits, lone surrogates), so json has the last word
+        return json.loads(line)
+
+def get_json_parser(backend=JSON_BACKEND_AUTO, paths=()):
+    """
+    Returns the function used to decode json records. 'auto' picks orjson when it is installed and json otherwise,
+    'lazy' only decodes the parts of a record found at the given field paths. A callable is returned as is.
+    """
+    if callable(backend):
+        return backend
+    if backend == JSON_BACKEND_AUTO:
+        return orjson_loads if orjson is not None else json.loads
+    if backend == JSON_BACKEND_JSON:
+        return json.loads
+    if backend == JSON_BACKEND_ORJSON:
+        if orjson is None:
+            raise ValidatorException("json_backend '%s' requires the orjson package" % backend)
+        return orjson_loads
+    if backend == JSON_BACKEND_LAZY:
+        return LazyJSONDecoder(paths)
+    raise ValidatorException("Unknown json_backend '%s', expected one of %s" % (backend, ', '.join(JSON_BACKENDS)))
+
+def build_path_tree(paths):
+    """
+    Builds a tree of the object keys found along the given dotted field paths. A key mapped to None is decoded with
+    everything below it. '.list' steps are transparent, since the elements of a list are walked with the same tree,
+    and indexed keys such as 'crumbData{0}' are reachable both literally and as 'crumbData'.
+    """
+    tree = {}
+    for path in paths:
+        _insert_path(tree, [key for key in path.split('.') if key != 'list'])
+    return tree
+
+def _insert_path(node, keys):
+    if not keys:
+        return
+    key = keys[0]
+    names = [key]
+    if '{' in key:
+        names.append(key[:key.index('{')])
+    for name in names:
+        if name in node and node[name] is None:
+            continue  # already decoded as a whole
+        if len(keys) == 1:
+            node[name] = None
+        else:
+            _insert_path(node.setdefault(name, {}), keys[1:])
+
+class LazyJSONDecoder:
+    """
+    Decodes a json record into a dict holding only the sub-trees the config references. Objects along the referenced
+    paths are walked key by key; referenced values are decoded by the json C scanner and unreferenced ones are
+    scanned past without being kept, up to the end of the record so that a malformed tail is still rejected.
+    Anything the walker does not handle, including malformed input, is handed to json.loads.
+    """
+    def __init__(self, paths):
+        self.tree = build_path_tree(paths)
+        self.scan_once = json.JSONDecoder().scan_once
+
+    def __call__(self, line):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        try:
+            idx = WHITESPACE.match(line, 0).end()
+            if line.startswith('{', idx):
+                return self._decode_top_level(line, idx + 1)
+        except (JSONDecodeError, StopIteration, IndexError):
+            pass
+        return json.loads(line)
+
+    def _decode_top_level(self, s, idx):
+        tree = self.tree
+        obj = {}
+        idx = WHITESPACE.match(s, idx).end()
+        if s[idx] == '}':
+            idx += 1
+        else:
+            while True:
+                key, idx = self._scan_key(s, idx)
+                if key in tree:
+                    obj[key], idx = self._decode_value(s, idx, tree[key])
+                else:
+                    idx = self.scan_once(s, idx)[1]
+                idx = WHITESPACE.match(s, idx).end()
+                separator = s[idx]
+                idx += 1
+                if separator == '}':
+                    break
+                if separator != ',':
+                    raise JSONDecodeError("Expecting ',' delimiter", s, idx - 1)
+                idx = WHITESPACE.match(s, idx).end()
+        if WHITESPACE.match(s, idx).end() != len(s):
+            raise JSONDecodeError("Extra data", s, idx)
+        return obj
+
+    def _scan_key(self, s, idx):
+        if s[idx] != '"':
+            raise JSONDecodeError("Expecting property name enclosed in double quotes", s, idx)
+        key, idx = scanstring(s, idx + 1)
+        idx = WHITESPACE.match(s, idx).end()
+        if s[idx] != ':':
+            raise JSONDecodeError("Expecting ':' delimiter", s, idx)
+        return key, WHITESPACE.match(s, idx + 1).end()
+
+    def _decode_value(self, s, idx, node):
+        if node is not None:
+            if s[idx] == '{':
+                return self._decode_object(s, idx + 1, node)
+            if s[idx] == '[':
+                return self._decode_array(s, idx + 1, node)
+        return self.scan_once(s, idx)
+
+    def _decode_object(self, s, idx, node):
+        obj = {}
+        idx = WHITESPACE.match(s, idx).end()
+        if s[idx] == '}':
+            return obj, idx + 1
+        while True:
+            key, idx = self._scan_key(s, idx)
+            if key in node:
+                obj[key], idx = self._decode_value(s, idx, node[key])
+            else:
+                idx = self.scan_once(s, idx)[1]
+            idx = WHITESPACE.match(s, idx).end()
+            separator = s[idx]
+            idx += 1
+            if separator == '}':
+                return obj, idx
+            if separator != ',':
+                raise JSONDecodeError("Expecting ',' delimiter", s, idx - 1)
+            idx = WHITESPACE.match(s, idx).end()
+
+    def _decode_array(self, s, idx, node):
+        values = []
+        idx = WHITESPACE.match(s, idx).end()
+        if s[idx] == ']':
+            return values, idx + 1
+        while True:
+            value, idx = self._decode_value(s, idx, node)
+            values.append(value)
+            idx = WHITESPACE.match(s, idx).end()
+            separator = s[idx]
+            idx += 1
+            if separator == ']':
+                return values, idx
+            if separator != ',':
+                raise JSONDecodeError("Expecting ',' delimiter", s, idx - 1)
+            idx = WHITESPACE.match(s, idx).end()
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import math
+from collections import OrderedDict
+from .result import ERROR_DUPLICATE_RECORD, ERROR_PROBABLE_DUPLICATE_RECORD, FieldValidationResult
+
+DUPLICATE_CHECK = "DuplicateCheck"
+# key of the payload digest in a slim record, see slim_record
+PAYLOAD_DIGEST = "payloadDigest"
+
+# records the Bloom filter is sized for, and its false positive rate at that many records
+DEFAULT_CAPACITY = 1000000
+DEFAULT_ERROR_RATE = 0.001
+# most recent keys kept exactly, a Bloom filter hit among them is a confirmed duplicate
+DEFAULT_WINDOW = 100000
+
+def payload_digest(payload):
+    return hashlib.blake2b(json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8'), digest_size=16).hexdigest()
+
+def slim_record(record, payload_hash=False, slim=None):
+    """
+    Returns what DuplicateDetector.key reads of a record, e.g. for a worker process to send back instead of the
+    record: its serialId and, with payload_hash, the digest of its payload. Added to `slim` when given.
+    """
+    if slim is None:
+        slim = {'metadata': {'serialId': record['metadata']['serialId']}}
+    if payload_hash and 'payload' in record:
+        slim[PAYLOAD_DIGEST] = payload_digest(record['payload'])
+    return slim
+
+class BloomFilter:
+    """
+    Fixed-size set membership filter: `capacity` keys (bytes) fit with a false positive rate of `error_rate`, and
+    memory stays the same however many keys are added. Never misses a key that was added.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hash_count = max(1, int(round(self.bit_count / capacity * math.log(2))))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # double hashing: the k positions are derived from the two halves of one digest
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        bit_count = self.bit_count
+        return [(first + i * second) % bit_count for i in range(self.hash_count)]
+
+    def add(self, key):
+        """
+        Adds a key and returns whether it was possibly added before.
+        """
+        bits = self.bits
+        present = True
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                present = False
+                bits[position >> 3] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def false_positive_rate(self):
+        """
+        Estimated false positive rate of the filter as it is filled now.
+        """
+        return (1 - math.exp(-self.hash_count * self.count / self.bit_count)) ** self.hash_count
+
+class DuplicateDetector:
+    """
+    Detects records seen before in a stream, keyed on metadata.serialId (streamId, bundleId, recordId, serialNumber)
+    and, with payload_hash, a digest of the record's payload. Keys go into a BloomFilter and an exact window of the
+    `window` most recent keys, so memory is fixed whatever the length of the stream. A repeat within the window is a
+    confirmed duplicate. A filter hit outside of it is a probable duplicate: an older repeat or a false positive,
+    counted, and only reported as a finding with report_probable.
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE, window=DEFAULT_WINDOW, payload_hash=False, report_probable=False):
+        self.filter = BloomFilter(capacity, error_rate)
+        self.window_size = window
+        self.window = OrderedDict()
+        self.payload_hash = payload_hash
+        self.report_probable = report_probable
+        self.record_count = 0
+        self.duplicate_count = 0
+        self.probable_count = 0
+
+    def key(self, record):
+        serial_id = record['metadata']['serialId']
+        key = (serial_id.get('streamId'), serial_id.get('bundleId'), serial_id.get('recordId'), serial_id.get('serialNumber'))
+        if self.payload_hash:
+            if PAYLOAD_DIGEST in record:
+                key += (record[PAYLOAD_DIGEST],)
+            elif 'payload' in record:
+                key += (payload_digest(record['payload']),)
+        return key
+
+    def add_record(self, record):
+        """
+        Adds a record and returns the findings about it: none, or a duplicate (or probable duplicate) finding.
+        """
+        self.record_count += 1
+        key = self.key(record)
+        window = self.window
+        if key in window:
+            window.move_to_end(key)
+            self.duplicate_count += 1
+            return [FieldValidationResult(False, field_path=DUPLICATE_CHECK, serial_id=record['metadata']['serialId'], code=ERROR_DUPLICATE_RECORD, args=key[:4])]
+
+        window[key] = None
+        if len(window) > self.window_size:
+            window.popitem(last=False)
+        if self.filter.add(repr(key).encode('utf-8')):
+            self.probable_count += 1
+            if self.report_probable:
+                return [FieldValidationResult(False, field_path=DUPLICATE_CHECK, serial_id=record['metadata']['serialId'], code=ERROR_PROBABLE_DUPLICATE_RECORD, args=key[:4])]
+        return []
+
+    def __str__(self):
+        return json.dumps(self.to_json())
+
+    def to_json(self):
+        return {"Records": self.record_count, "Duplicates": self.duplicate_count, "ProbableDuplicates": self.probable_count,
+            "FalsePositiveRate": self.filter.false_positive_rate(), "Capacity": self.filter.capacity, "Window": self.window_size}
@@ -0,0 +1,83 @@
+import gzip
+import mmap
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+GZIP_MAGIC = b'\x1f\x8b'
+
+class LineReader:
+    """
+    Iterates the data lines of a log file as stripped bytes, without reading the whole file into memory. Plain files
+    are memory-mapped (or read in buffered chunks with use_mmap=False) and gzip-compressed files are decompressed as
+    a stream. Blank lines and '#' comments are skipped. `offset` is the byte offset, in the uncompressed data, just
+    past the last line yielded. Reading starts at the `start` offset, e.g. the offset of a resumed run.
+    """
+    def __init__(self, path, use_mmap=True, buffer_size=DEFAULT_BUFFER_SIZE, start=0):
+        self.path = path
+        self.use_mmap = use_mmap
+        self.buffer_size = buffer_size
+        self.start = start
+        self.offset = start
+
+    def is_gzip(self):
+        with open(self.path, 'rb') as f:
+            return f.read(2) == GZIP_MAGIC
+
+    def __iter__(self):
+        self.offset = self.start
+        if self.is_gzip():
+            with gzip.open(self.path, 'rb') as f:
+                # gzip streams can't be entered midway, the skipped data is decompressed and dropped
+                f.seek(self.start)
+                yield from self._read_chunks(f)
+            return
+        with open(self.path, 'rb') as f:
+            if self.use_mmap:
+                try:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except (ValueError, OSError):
+                    mapped = None  # empty files and special files can't be mapped
+                if mapped is not None:
+                    with mapped:
+                        yield from self._read_mapped(mapped)
+                    return
+            f.seek(self.start)
+            yield from self._read_chunks(f)
+
+    def _read_mapped(self, mapped):
+        size = len(mapped)
+        position = self.start
+        while position < size:
+            end = mapped.find(b'\n', position)
+            end = size if end == -1 else end + 1
+            line = mapped[position:end].strip()
+            position = end
+            if line and not line.startswith(b'#'):
+                self.offset = position
+                yield line
+
+    def _read_chunks(self, f):
+        remainder = b''
+        position = self.start
+        while True:
+            chunk = f.read(self.buffer_size)
+            if not chunk:
+                break
+            lines = (remainder + chunk).split(b'\n')
+            remainder = lines.pop()
+            for line in lines:
+                position += len(line) + 1
+                line = line.strip()
+                if line and not line.startswith(b'#'):
+                    self.offset = position
+                    yield line
+        position += len(remainder)
+        remainder = remainder.strip()
+        if remainder and not remainder.startswith(b'#'):
+            self.offset = position
+            yield remainder
+
+def read_lines(path, use_mmap=True, buffer_size=DEFAULT_BUFFER_SIZE, start=0):
+    """
+    Returns an iterable of the data lines of a plain or gzip-compressed log file, see LineReader.
+    """
+    return LineReader(path, use_mmap, buffer_size, start)
@@ -0,0 +1,92 @@
+from collections import deque
+from itertools import islice
+from .profiling import PHASE_PARSE, ValidationProfiler
+from .result import ValidationSummary
+from .sequential import Sequential
+
+DEFAULT_CHUNK_SIZE = 500
+
+# the compiled TestCase of a worker process, built once by the pool initializer
+_worker_test_case = None
+
+def worker_args(test_case):
+    # what a worker needs to compile its own copy of test_case, all picklable
+    return (test_case.filepath, test_case.failures_only, test_case.retain_records, test_case.profiler is not None, test_case.json_backend,
+        test_case.duplicate_detection)
+
+def build_worker_test_case(filepath, failures_only, retain_records, profile, json_backend, duplicate_detection):
+    from .validator import TestCase
+    profiler = ValidationProfiler() if profile else None
+    return TestCase(filepath, failures_only=failures_only, retain_records=retain_records, profiler=profiler, json_backend=json_backend,
+        duplicate_detection=duplicate_detection)
+
+def _init_worker(*args):
+    global _worker_test_case
+    _worker_test_case = build_worker_test_case(*args)
+
+def _validate_chunk(lines):
+    return validate_chunk(_worker_test_case, lines)
+
+def validate_chunk(test_case, lines):
+    """
+    Validates a chunk of raw lines with a worker's own copy of a TestCase and returns the (record, field_validations)
+    pairs along with what has to be merged back into the original TestCase, see merge_chunk.
+    """
+    test_case.summary = ValidationSummary()
+    profiler = test_case.profiler
+    if profiler is not None:
+        # a new profiler per chunk, as the one returned may still be merged while the next chunk is validated
+        profiler = test_case.profiler = ValidationProfiler()
+    duplicate_settings = test_case.duplicate_detector_settings()
+    if duplicate_settings is not None:
+        from .duplicates import slim_record  # only imported when duplicate detection is on
+    validated_records = []
+    for line in lines:
+        if profiler is None:
+            record = test_case.record_parser[test_case.data_type](line)
+        else:
+            start = profiler.timer()
+            record = test_case.record_parser[test_case.data_type](line)
+            profiler.add_phase(PHASE_PARSE, profiler.timer() - start)
+        field_validations = test_case._validate(record)
+        if not test_case.retain_records:
+            # only send back what the sequential and duplicate checks need
+            slim = Sequential.slim_record(record) if test_case.SequentialValidation else None
+            if duplicate_settings is not None:
+                slim = slim_record(record, duplicate_settings.get('payload_hash', False), slim)
+            record = slim
+        validated_records.append((record, field_validations))
+    return validated_records, set(test_case.skip_sequential_checks), test_case.summary, profiler
+
+def validate_in_pool(test_case, lines, workers, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validates chunks of raw lines in a pool of worker processes, each holding its own compiled copy of the TestCase,
+    and yields (record, field_validations) pairs in input order. At most two chunks per worker are in flight, so
+    lines are consumed lazily. Sequential check skips, summary counters and profiler metrics of the workers are merged
+    into test_case.
+    """
+    from concurrent.futures import ProcessPoolExecutor  # only imported when a pool is used
+    lines = iter(lines)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=worker_args(test_case)) as executor:
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(islice(lines, chunk_size))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_validate_chunk, chunk))
+            if not pending:
+                return
+            yield from merge_chunk(test_case, pending.popleft().result())
+
+def merge_chunk(test_case, validated_chunk):
+    """
+    Merges the sequential check skips, summary counters and profiler metrics of a chunk validated by validate_chunk
+    into test_case and returns its (record, field_validations) pairs.
+    """
+    validated_records, skip_sequential_checks, summary, profiler = validated_chunk
+    test_case.skip_sequential_checks.update(skip_sequential_checks)
+    test_case.summary.merge(summary)
+    if profiler is not None:
+        test_case.profiler.merge(profiler)
+    return validated_records
@@ -0,0 +1,94 @@
+import json
+import time
+
+PHASE_PARSE = 'parse'
+PHASE_VALIDATE = 'validate'
+PHASE_SEQUENTIAL = 'sequential'
+
+class ValidationProfiler:
+    """
+    Opt-in instrumentation of a TestCase: cumulative time and call counts per config section, '.list' expansion
+    counts and time per template, and the time spent parsing records, validating them and running the sequential
+    checks. Hooks are called with the profiler at the end of every validation run, and every `report_every` records
+    when set, so the metrics can be pushed to an external collector.
+    """
+    def __init__(self, hooks=None, report_every=None, timer=time.perf_counter):
+        self.hooks = list(hooks) if hooks else []
+        self.report_every = report_every
+        self.timer = timer
+        self.reset()
+
+    def reset(self):
+        self.record_count = 0
+        # section -> [calls, seconds]
+        self.field_stats = {}
+        # list section -> [expansions, fields produced, seconds]
+        self.list_stats = {}
+        self.phase_seconds = {PHASE_PARSE: 0.0, PHASE_VALIDATE: 0.0, PHASE_SEQUENTIAL: 0.0}
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def add_field(self, section, seconds, calls=1):
+        stats = self.field_stats.get(section)
+        if stats is None:
+            stats = self.field_stats[section] = [0, 0.0]
+        stats[0] += calls
+        stats[1] += seconds
+
+    def add_list_expansion(self, section, field_count, seconds, expansions=1):
+        stats = self.list_stats.get(section)
+        if stats is None:
+            stats = self.list_stats[section] = [0, 0, 0.0]
+        stats[0] += expansions
+        stats[1] += field_count
+        stats[2] += seconds
+
+    def add_phase(self, phase, seconds):
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+
+    def add_record(self):
+        self.record_count += 1
+        if self.report_every and self.record_count % self.report_every == 0:
+            self.publish()
+
+    def merge(self, other):
+        self.record_count += other.record_count
+        for section, (calls, seconds) in other.field_stats.items():
+            self.add_field(section, seconds, calls)
+        for section, (expansions, field_count, seconds) in other.list_stats.items():
+            self.add_list_expansion(section, field_count, seconds, expansions)
+        for phase, seconds in other.phase_seconds.items():
+            self.add_phase(phase, seconds)
+
+    def publish(self):
+        for hook in self.hooks:
+            hook(self)
+
+    def top_sections(self, count=10):
+        """
+        Returns (section, seconds, calls) of the `count` most expensive config sections, where the cost of a '.list'
+        section includes expanding it.
+        """
+        sections = {section: [calls, seconds] for section, (calls, seconds) in self.field_stats.items()}
+        for section, (expansions, field_count, seconds) in self.list_stats.items():
+            sections.setdefault(section, [0, 0.0])[1] += seconds
+        ranked = sorted(sections.items(), key=lambda item: item[1][1], reverse=True)
+        return [(section, seconds, calls) for section, (calls, seconds) in ranked[:count]]
+
+    def __getstate__(self):
+        # hooks stay in the process that registered them, worker profilers are merged back into it
+        state = self.__dict__.copy()
+        state['hooks'] = []
+        return state
+
+    def __str__(self):
+        return json.dumps(self.to_json())
+
+    def to_json(self):
+        return {
+            "Records": self.record_count,
+            "Phases": dict(self.phase_seconds),
+            "Fields": {section: {"Calls": calls, "Seconds": seconds} for section, (calls, seconds) in self.field_stats.items()},
+            "Lists": {section: {"Expansions": expansions, "Fields": field_count, "Seconds": seconds} for section, (expansions, field_count, seconds) in self.list_stats.items()},
+        }
@@ -3,21 +3,113 @@ import json
 class ValidatorException(Exception):
     pass
 
+# error codes of failed FieldValidationResults and the messages they render to with the result's args
+ERROR_REQUIRED_FIELD_MISSING = 'RequiredFieldMissing'
+ERROR_VALUE_DOES_NOT_START_WITH = 'ValueDoesNotStartWith'
+ERROR_VALUE_NOT_EXPECTED = 'ValueNotExpected'
+ERROR_FIELD_MISSING = 'FieldMissing'
+ERROR_FIELD_EMPTY = 'FieldEmpty'
+ERROR_VALUE_NOT_IN_ENUM = 'ValueNotInEnum'
+ERROR_ABOVE_UPPER_LIMIT = 'AboveUpperLimit'
+ERROR_BELOW_LOWER_LIMIT = 'BelowLowerLimit'
+ERROR_DECIMAL_VALIDATION = 'DecimalValidationError'
+ERROR_BEFORE_EARLIEST_TIME = 'BeforeEarliestTime'
+ERROR_AFTER_LATEST_TIME = 'AfterLatestTime'
+ERROR_TIMESTAMP_VALIDATION = 'TimestampValidationError'
+ERROR_NO_CHOICES = 'NoChoices'
+ERROR_MULTIPLE_CHOICES = 'MultipleChoices'
+ERROR_CHOICE_VALIDATION = 'ChoiceValidationError'
+ERROR_REGEX_NO_MATCH = 'RegexNoMatch'
+ERROR_REGEX_PARTIAL_MATCH = 'RegexPartialMatch'
+ERROR_STRING_VALIDATION = 'StringValidationError'
+ERROR_RECORD_ID_INCREMENT = 'RecordIdIncrement'
+ERROR_SERIAL_NUMBER_INCREMENT = 'SerialNumberIncrement'
+ERROR_RECORD_GENERATED_AT_ORDER = 'RecordGeneratedAtOrder'
+ERROR_ODE_RECEIVED_AT_ORDER = 'OdeReceivedAtOrder'
+ERROR_BUNDLE_SIZE_RECORD_COUNT = 'BundleSizeRecordCount'
+ERROR_BUNDLE_SIZE_LAST_RECORD_ID = 'BundleSizeLastRecordId'
+ERROR_DUPLICATE_RECORD = 'DuplicateRecord'
+ERROR_PROBABLE_DUPLICATE_RECORD = 'ProbableDuplicateRecord'
+ERROR_UNROUTED = 'Unrouted'
+
+ERROR_MESSAGES = {
+    ERROR_REQUIRED_FIELD_MISSING: "Required Field is missing.",
+    ERROR_VALUE_DOES_NOT_START_WITH: "Value of Field ('%s') does not start with %s",
+    ERROR_VALUE_NOT_EXPECTED: "Value of Field ('%s') is not one of the expected values (%s)",
+    ERROR_FIELD_MISSING: "Field missing: %s",
+    ERROR_FIELD_EMPTY: "Field empty",
+    ERROR_VALUE_NOT_IN_ENUM: "Value '%s' not in list of known values: [%s]",
+    ERROR_ABOVE_UPPER_LIMIT: "Value '%d' is greater than upper limit '%d'",
+    ERROR_BELOW_LOWER_LIMIT: "Value '%d' is less than lower limit '%d'",
+    ERROR_DECIMAL_VALIDATION: "Failed to perform decimal validation, error: %s",
+    ERROR_BEFORE_EARLIEST_TIME: "Timestamp value '%s' occurs before earliest limit '%s'",
+    ERROR_AFTER_LATEST_TIME: "Timestamp value '%s' occurs after latest limit '%s'",
+    ERROR_TIMESTAMP_VALIDATION: "Failed to perform timestamp validation, error: %s",
+    ERROR_NO_CHOICES: "No choices found in '%s'",
+    ERROR_MULTIPLE_CHOICES: "Found '%d' choices in '%s'",
+    ERROR_CHOICE_VALIDATION: "Failed to perform choice validation, error: %s",
+    ERROR_REGEX_NO_MATCH: "Regular Expressions found no match in '%s'",
+    ERROR_REGEX_PARTIAL_MATCH: "Regular Expressions do not completely match in '%s'",
+    ERROR_STRING_VALIDATION: "failure to perform string validation, error: %s",
+    ERROR_RECORD_ID_INCREMENT: "Detected incorrectly incremented recordId. Expected recordId '%d' but got '%d'",
+    ERROR_SERIAL_NUMBER_INCREMENT: "Detected incorrectly incremented serialNumber. Expected serialNumber '%d' but got '%d'",
+    ERROR_RECORD_GENERATED_AT_ORDER: "Detected non-chronological recordGeneratedAt. Previous timestamp was '%s' but current timestamp is '%s'",
+    ERROR_ODE_RECEIVED_AT_ORDER: "Detected non-chronological odeReceivedAt. Previous timestamp was '%s' but current timestamp is '%s'",
+    ERROR_BUNDLE_SIZE_RECORD_COUNT: "bundleSize doesn't match number of records. Number of records: '%d' != bundlSize: '%d'",
+    ERROR_BUNDLE_SIZE_LAST_RECORD_ID: "bundleSize doesn't match last recordId. Last recordId: '%d' != (bundleSize-1: '%d')",
+    ERROR_DUPLICATE_RECORD: "Detected duplicate record of streamId '%s', bundleId '%s', recordId '%s', serialNumber '%s'",
+    ERROR_PROBABLE_DUPLICATE_RECORD: "Detected probable duplicate record of streamId '%s', bundleId '%s', recordId '%s', serialNumber '%s'",
+    ERROR_UNROUTED: "No configuration is routed for %s value '%s'",
+}
+
 class FieldValidationResult:
-    def __init__(self, valid = True, details = "", field_path = None, serial_id = None):
+    """
+    Outcome of one check. Failures raised by the validator carry an error `code` (one of ERROR_MESSAGES) and the
+    `args` of its message, which is only rendered when `details` is read, e.g. by __str__() or to_json(). Results
+    can be grouped and counted by code without any string formatting.
+    """
+    __slots__ = ('field_path', 'valid', '_details', 'serial_id', 'code', 'args')
+
+    def __init__(self, valid = True, details = "", field_path = None, serial_id = None, code = None, args = ()):
         self.field_path = field_path
         self.valid = valid
-        self.details = details
+        # with a code, the message is rendered on first use
+        self._details = details if code is None else None
         self.serial_id = serial_id
+        self.code = code
+        self.args = args
+
+    @property
+    def details(self):
+        details = self._details
+        if details is None:
+            details = self._details = ERROR_MESSAGES[self.code] % self.args
+        return details
+
+    @details.setter
+    def details(self, details):
+        self._details = details
 
     def __str__(self):
         return json.dumps(self.to_json())
 
     def to_json(self):
-        return {"Field": self.field_path, "Valid": self.valid, "Details": self.details, "SerialId": self.serial_id}
+        obj = {"Field": self.field_path, "Valid": self.valid, "Details": self.details, "SerialId": self.serial_id}
+        if self.code is not None:
+            obj["Code"] = self.code
+        return obj
+
+    @staticmethod
+    def from_json(obj):
+        result = FieldValidationResult(obj["Valid"], obj["Details"], obj["Field"], obj["SerialId"])
+        # the message is kept as rendered, its args may not survive json
+        result.code = obj.get("Code")
+        return result
 
 class RecordValidationResult:
-    def __init__(self, serial_id, field_validations, record):
+    __slots__ = ('serial_id', 'field_validations', 'record')
+
+    def __init__(self, serial_id, field_validations, record = None):
         self.serial_id = serial_id
         self.field_validations = field_validations
         self.record = record
@@ -30,3 +122,42 @@ class RecordValidationResult:
         for field_val in self.field_validations:
             json_field_validations.append(field_val.to_json())
         return {"SerialId": self.serial_id, "Validations": json_field_validations, "Record": self.record}
+
+class ValidationSummary:
+    """
+    Running counters of a validation run: the number of records and, per field path, how many checks passed and
+    failed. Used in failures-only mode, where valid fields are counted instead of producing a result each.
+    """
+    def __init__(self):
+        self.record_count = 0
+        self.field_counts = {}
+
+    def add_pass(self, field_path):
+        counts = self.field_counts.get(field_path)
+        if counts is None:
+            counts = self.field_counts[field_path] = [0, 0]
+        counts[0] += 1
+
+    def add_failure(self, field_path):
+        counts = self.field_counts.get(field_path)
+        if counts is None:
+            counts = self.field_counts[field_path] = [0, 0]
+        counts[1] += 1
+
+    def add_counts(self, field_path, passed, failed):
+        counts = self.field_counts.get(field_path)
+        if counts is None:
+            counts = self.field_counts[field_path] = [0, 0]
+        counts[0] += passed
+        counts[1] += failed
+
+    def merge(self, other):
+        self.record_count += other.record_count
+        for field_path, (passed, failed) in other.field_counts.items():
+            self.add_counts(field_path, passed, failed)
+
+    def __str__(self):
+        return json.dumps(self.to_json())
+
+    def to_json(self):
+        return {"Records": self.record_count, "Fields": {field_path: {"Passed": passed, "Failed": failed} for field_path, (passed, failed) in self.field_counts.items()}}
@@ -0,0 +1,120 @@
+import queue
+from .decoding import JSON_BACKEND_AUTO, JSON_BACKEND_LAZY, get_json_parser
+from .result import ERROR_UNROUTED, FieldValidationResult, RecordValidationResult, ValidatorException
+from .validator import TestCase, ValidationRun, get_accessor
+
+DEFAULT_DISCRIMINATOR = 'metadata.recordType'
+
+def _drain_queue(msg_queue):
+    while True:
+        try:
+            yield msg_queue.get_nowait()
+        except queue.Empty:
+            return
+
+class TestCaseRouter:
+    """
+    Validates a stream mixing several message families in one pass. Each record is parsed once and validated by the
+    TestCase its discriminator value is routed to: `routes` maps values of the discriminator, a field path or a
+    callable taking the record, to compiled json TestCases. Several values may share a TestCase. Records whose value
+    has no route go to `default`, or, without one, get a failed result for the discriminator field.
+
+    Every TestCase keeps its own run: sequential checks see only the records routed to it and its summary counts
+    them. Serial ids are the positions of the records in the routed stream.
+    """
+    def __init__(self, routes, discriminator=DEFAULT_DISCRIMINATOR, default=None, json_backend=JSON_BACKEND_AUTO, retain_records=True):
+        self.routes = dict(routes)
+        self.default = default
+        self.discriminator = discriminator
+        self.retain_records = retain_records
+        if callable(discriminator):
+            self.discriminator_path = getattr(discriminator, '__name__', str(discriminator))
+            self._route_value = discriminator
+        else:
+            self.discriminator_path = discriminator
+            self._route_value = get_accessor(discriminator).get
+        for test_case in self.test_cases():
+            if test_case.data_type != 'json':
+                raise ValidatorException("Only json configurations can be routed, '%s' has DataType '%s'" % (test_case.filepath, test_case.data_type))
+
+        paths = ()
+        if json_backend == JSON_BACKEND_LAZY:
+            # the union of what the routed test cases read, plus the discriminator
+            paths = [path for test_case in self.test_cases() for path in test_case.referenced_paths()]
+            if not callable(discriminator):
+                paths.append(discriminator)
+        self.parse = get_json_parser(json_backend, paths)
+        self.unrouted_count = 0
+
+    @staticmethod
+    def from_configs(config_routes, discriminator=DEFAULT_DISCRIMINATOR, default_config=None, json_backend=JSON_BACKEND_AUTO, **test_case_args):
+        """
+        Builds a router from a {discriminator value: config file path} mapping. A config file routed to by several
+        values is compiled once. test_case_args are passed to every TestCase.
+        """
+        compiled = {}
+        def compile_config(filepath):
+            if filepath not in compiled:
+                compiled[filepath] = TestCase(filepath, json_backend=json_backend, **test_case_args)
+            return compiled[filepath]
+        routes = {value: compile_config(filepath) for value, filepath in config_routes.items()}
+        default = compile_config(default_config) if default_config is not None else None
+        return TestCaseRouter(routes, discriminator, default, json_backend, test_case_args.get('retain_records', True))
+
+    def test_cases(self):
+        """
+        Returns the distinct routed TestCases, the default one included.
+        """
+        test_cases = {}
+        for test_case in list(self.routes.values()) + [self.default]:
+            if test_case is not None:
+                test_cases[id(test_case)] = test_case
+        return list(test_cases.values())
+
+    def route(self, record):
+        """
+        Returns the TestCase a parsed record is routed to, or None.
+        """
+        try:
+            return self.routes.get(self._route_value(record), self.default)
+        except TypeError:
+            return self.default  # an unhashable discriminator value matches no route
+
+    def validate_queue(self, msg_queue):
+        return list(self.validate_stream(_drain_queue(msg_queue)))
+
+    def validate_stream(self, lines):
+        """
+        Validates records from any iterable of lines (str or bytes) or already parsed dicts and yields a
+        RecordValidationResult per record as soon as it is produced, in input order. Blank lines and '#' comments
+        are skipped. Sequential check results are yielded as the bundles of a route close, those of the bundles still
+        open after the last record.
+        """
+        runs = {id(test_case): ValidationRun(test_case) for test_case in self.test_cases()}
+        self.unrouted_count = 0
+        serial_id = 0
+        for record in lines:
+            if isinstance(record, (str, bytes)):
+                if isinstance(record, bytes):
+                    record = record.decode('utf-8')
+                record = record.strip()
+                if not record or record.startswith('#'):
+                    continue
+                record = self.parse(record)
+            serial_id += 1
+            test_case = self.route(record)
+            if test_case is None:
+                self.unrouted_count += 1
+                yield self._unrouted_result(serial_id, record)
+                continue
+            yield from runs[id(test_case)].add(record, test_case._validate(record), serial_id)
+        for run in runs.values():
+            yield from run.close()
+
+    def _unrouted_result(self, serial_id, record):
+        try:
+            value = self._route_value(record)
+        except Exception as e:
+            value = e
+        validation = FieldValidationResult(False, field_path=self.discriminator_path, code=ERROR_UNROUTED, args=(self.discriminator_path, value))
+        return RecordValidationResult(serial_id, [validation], record if self.retain_records else None)
@@ -0,0 +1,134 @@
+import json
+import math
+import random
+import zlib
+from .result import ValidatorException
+
+DEFAULT_CONFIDENCE = 0.95
+
+def normal_quantile(probability):
+    """
+    Returns the quantile of the standard normal distribution at `probability`, found by bisection on its cdf
+    (statistics.NormalDist only exists from Python 3.8).
+    """
+    low, high = -40.0, 40.0
+    for i in range(100):
+        middle = (low + high) / 2
+        if (1 + math.erf(middle / math.sqrt(2))) / 2 < probability:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+def wilson_interval(failed, sampled, confidence=DEFAULT_CONFIDENCE):
+    """
+    Returns the (low, high) Wilson score interval of a failure rate observed as `failed` out of `sampled` checks. Unlike
+    the normal approximation, it stays within [0, 1] and is usable for rates close to 0 or 1 and small samples.
+    """
+    if sampled == 0:
+        return (0.0, 1.0)
+    z = normal_quantile(0.5 + confidence / 2)
+    rate = failed / sampled
+    denominator = 1 + z * z / sampled
+    center = (rate + z * z / (2 * sampled)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / sampled + z * z / (4 * sampled * sampled)) / denominator
+    # the bounds are exact at the ends, where rounding would leave them just off
+    low = 0.0 if failed == 0 else max(0.0, center - half_width)
+    high = 1.0 if failed == sampled else min(1.0, center + half_width)
+    return (low, high)
+
+class SamplingReport:
+    """
+    Outcome of a sampled run: the number of records seen and validated, and per field path the number of sampled
+    checks, failures, the estimated failure rate and its confidence interval.
+    """
+    def __init__(self, record_count, sampled_count, summary, confidence=DEFAULT_CONFIDENCE):
+        self.record_count = record_count
+        self.sampled_count = sampled_count
+        self.summary = summary
+        self.confidence = confidence
+
+    def failure_rates(self):
+        rates = {}
+        for field_path, (passed, failed) in self.summary.field_counts.items():
+            sampled = passed + failed
+            low, high = wilson_interval(failed, sampled, self.confidence)
+            rates[field_path] = {"Sampled": sampled, "Failed": failed, "FailureRate": failed / sampled if sampled else 0.0, "Low": low, "High": high}
+        return rates
+
+    def __str__(self):
+        return json.dumps(self.to_json())
+
+    def to_json(self):
+        return {"Records": self.record_count, "Sampled": self.sampled_count, "Confidence": self.confidence, "Fields": self.failure_rates()}
+
+class HashSampler:
+    """
+    Deterministic sampling: a record is validated when the crc32 of its raw line falls within `rate` of the hash
+    range, so the same records are picked by every run and host. Sampled records are validated as they arrive.
+    """
+    def __init__(self, rate, confidence=DEFAULT_CONFIDENCE):
+        if not 0 < rate <= 1:
+            raise ValidatorException("Sampling rate must be within (0, 1], got '%s'" % rate)
+        self.rate = rate
+        self.confidence = confidence
+        self.threshold = int(rate * (1 << 32))
+        self.report = None
+
+    def begin(self):
+        pass
+
+    def offer(self, line, serial_id):
+        """
+        Returns whether the record of the line is validated right away.
+        """
+        return zlib.crc32(line.encode('utf-8')) < self.threshold
+
+    def drain(self):
+        return ()
+
+class ReservoirSampler:
+    """
+    Uniform sample of `size` records of a stream of unknown length (algorithm R). The sample is only known once the
+    stream ends, so its records are validated after the last one, in stream order. `seed` makes the sample repeatable.
+    """
+    def __init__(self, size, seed=None, confidence=DEFAULT_CONFIDENCE):
+        if size < 1:
+            raise ValidatorException("Reservoir size must be at least 1, got '%s'" % size)
+        self.size = size
+        self.confidence = confidence
+        self.random = random.Random(seed)
+        self.reservoir = []
+        self.seen_count = 0
+        self.report = None
+
+    def begin(self):
+        self.reservoir = []
+        self.seen_count = 0
+
+    def offer(self, line, serial_id):
+        self.seen_count += 1
+        if len(self.reservoir) < self.size:
+            self.reservoir.append((serial_id, line))
+        else:
+            position = self.random.randrange(self.seen_count)
+            if position < self.size:
+                self.reservoir[position] = (serial_id, line)
+        return False
+
+    def drain(self):
+        """
+        Returns the (serial_id, line) pairs of the sample in stream order and empties the reservoir.
+        """
+        sample = sorted(self.reservoir, key=lambda item: item[0])
+        self.reservoir = []
+        return sample
+
+def count_validations(summary, field_validations):
+    # sampled records of a run that reports every field are counted from their results
+    summary.record_count += 1
+    for field in field_validations:
+        if field.valid:
+            summary.add_pass(field.field_path)
+        else:
+            summary.add_failure(field.field_path)
@@ -1,15 +1,76 @@
 import json
-import dateutil.parser
 import copy
+import heapq
+from collections import OrderedDict
 from .result import FieldValidationResult, RecordValidationResult
+from .result import (ERROR_RECORD_ID_INCREMENT, ERROR_SERIAL_NUMBER_INCREMENT, ERROR_RECORD_GENERATED_AT_ORDER,
+    ERROR_ODE_RECEIVED_AT_ORDER, ERROR_BUNDLE_SIZE_RECORD_COUNT, ERROR_BUNDLE_SIZE_LAST_RECORD_ID)
+from .timestamps import TimestampCache
 
 SEQUENTIAL_CHECK = "SequentialCheck"
+# metadata fields read by the sequential checks, anything else in a record can be released once it is validated
+SEQUENTIAL_METADATA_FIELDS = ('serialId', 'recordGeneratedAt', 'odeReceivedAt', 'logFileName')
+
+# path of the check behind each finding, as listed in skip_validations
+CHECK_PATHS = {
+    ERROR_RECORD_ID_INCREMENT: 'metadata.serialId.recordId',
+    ERROR_SERIAL_NUMBER_INCREMENT: 'metadata.serialId.serialNumber',
+    ERROR_RECORD_GENERATED_AT_ORDER: 'metadata.recordGeneratedAt',
+    ERROR_ODE_RECEIVED_AT_ORDER: 'metadata.odeReceivedAt',
+    ERROR_BUNDLE_SIZE_RECORD_COUNT: 'metadata.serialId.bundleSize',
+    ERROR_BUNDLE_SIZE_LAST_RECORD_ID: 'metadata.serialId.bundleSize',
+}
+
+# incremental mode defaults: records buffered per bundle before they are checked, and bundles kept open at once
+DEFAULT_REORDER_WINDOW = 64
+DEFAULT_MAX_OPEN_BUNDLES = 256
+
+class SequentialBundle:
+    """
+    Running state of one streamId/bundleId bundle in incremental mode. Records wait in a small heap so that records
+    arriving out of order within the reorder window are still checked in serialNumber order.
+    """
+    def __init__(self, key, bundle_size):
+        self.key = key
+        self.bundle_size = bundle_size
+        self.heap = []
+        self.received = 0
+        self.previous_state = None
+        self.first_record_id = None
+        self.first_bundle_size = None
+        self.last_record_id = None
+        self.last_serial_id = None
+        self.record_count = 0
+        # runs of consecutive (bundleSize, has logFileName) values, all validate_bundle_size needs from the records
+        self.bundle_sizes = []
+
+    def is_complete(self):
+        return self.received >= self.bundle_size
 
 class Sequential:
-    def __init__(self, skip_validations=[]):
+    """
+    skip_validations fills up as records are validated. In incremental mode, findings of the checks in
+    deferred_skips, the paths the config may still skip, are held until close() and only reported if their check
+    is not skipped by then, so the findings don't depend on when a bundle closes.
+    """
+    def __init__(self, skip_validations=[], reorder_window=DEFAULT_REORDER_WINDOW, max_open_bundles=DEFAULT_MAX_OPEN_BUNDLES, timestamp_cache=None, deferred_skips=()):
         self.skip_validations = skip_validations
+        self.deferred_skips = frozenset(deferred_skips)
+        self.deferred_results = []
+        self.timestamp_cache = timestamp_cache if timestamp_cache is not None else TimestampCache()
+        self.reorder_window = reorder_window
+        self.max_open_bundles = max_open_bundles
+        # incremental mode state, least recently updated bundle first
+        self.open_bundles = OrderedDict()
+        self.arrival_count = 0
+        self.bundle_count = 0
         return
 
+    @staticmethod
+    def slim_record(record):
+        metadata = record['metadata']
+        return {'metadata': {key: metadata[key] for key in SEQUENTIAL_METADATA_FIELDS if key in metadata}}
+
     ### Iterate messages and check that sequential items are sequential
     def perform_sequential_validations(self, sorted_record_list):
         bundles = self.collect_bundles(sorted_record_list)
@@ -24,64 +85,158 @@ class Sequential:
 
         return [RecordValidationResult(serial_id = None, field_validations = validation_results, record = None)]
 
+    ### Incremental mode: accept records one at a time, returns the findings of any bundles closed by this record
+    def add_record(self, record):
+        serial_id = record['metadata']['serialId']
+        stream_id = serial_id.get('streamId')
+        key = (stream_id, serial_id['bundleId'])
+
+        validation_results = []
+        bundle = self.open_bundles.get(key)
+        if bundle is None:
+            # the stream moved on to a new bundle, so its complete bundles can be checked and evicted
+            for open_key, open_bundle in list(self.open_bundles.items()):
+                if open_key[0] == stream_id and open_bundle.is_complete():
+                    validation_results.extend(self._close_bundle(open_key))
+            while len(self.open_bundles) >= self.max_open_bundles:
+                validation_results.extend(self._close_bundle(next(iter(self.open_bundles))))
+            bundle = SequentialBundle(key, int(serial_id['bundleSize']))
+            self.open_bundles[key] = bundle
+            self.bundle_count += 1
+        else:
+            self.open_bundles.move_to_end(key)
+
+        heapq.heappush(bundle.heap, (int(serial_id['serialNumber']), self.arrival_count, record))
+        self.arrival_count += 1
+        bundle.received += 1
+        if len(bundle.heap) > self.reorder_window:
+            validation_results.extend(self._advance_bundle(bundle, heapq.heappop(bundle.heap)[2]))
+
+        return self._defer(validation_results)
+
+    ### Incremental mode: check and evict every bundle still open, returns their findings
+    def close(self):
+        validation_results = []
+        while self.open_bundles:
+            validation_results.extend(self._close_bundle(next(iter(self.open_bundles))))
+        validation_results = self._defer(validation_results)
+        # the skips are final now
+        validation_results.extend(result for result in self.deferred_results if CHECK_PATHS[result.code] not in self.skip_validations)
+        self.deferred_results = []
+        return validation_results
+
+    def _defer(self, validation_results):
+        if not self.deferred_skips or not validation_results:
+            return validation_results
+        reported = []
+        for result in validation_results:
+            if CHECK_PATHS[result.code] in self.deferred_skips:
+                self.deferred_results.append(result)
+            else:
+                reported.append(result)
+        return reported
+
+    def _close_bundle(self, key):
+        bundle = self.open_bundles.pop(key)
+        validation_results = []
+        while bundle.heap:
+            validation_results.extend(self._advance_bundle(bundle, heapq.heappop(bundle.heap)[2]))
+
+        if 'metadata.serialId.bundleSize' not in self.skip_validations:
+            validation_results.extend(self._check_bundle_size(bundle.first_record_id, bundle.first_bundle_size, bundle.last_record_id, bundle.last_serial_id, bundle.bundle_sizes, bundle.record_count))
+
+        return validation_results
+
+    def _advance_bundle(self, bundle, record):
+        new_state = self._record_state(record)
+        serial_id = record['metadata']['serialId']
+        if bundle.previous_state is None:
+            validation_results = []
+            bundle.first_record_id = new_state[0]
+            bundle.first_bundle_size = int(serial_id['bundleSize'])
+        else:
+            validation_results = self._compare_records(bundle.previous_state, new_state, record)
+
+        bundle.previous_state = new_state
+        bundle.last_record_id = new_state[0]
+        bundle.last_serial_id = serial_id
+        bundle.record_count += 1
+        bundle_size = (int(serial_id['bundleSize']), 'logFileName' in record['metadata'])
+        if not bundle.bundle_sizes or bundle.bundle_sizes[-1] != bundle_size:
+            bundle.bundle_sizes.append(bundle_size)
+
+        return validation_results
+
     ### Iterate messages and check that sequential items are sequential
     def validate_bundle(self, sorted_bundle):
-        first_record = sorted_bundle[0]
-        old_record_id = int(first_record['metadata']['serialId']['recordId'])
-        old_serial_number = int(first_record['metadata']['serialId']['serialNumber'])
-        old_record_generated_at = dateutil.parser.parse(first_record['metadata']['recordGeneratedAt']).replace(microsecond=0)
-        old_ode_received_at = dateutil.parser.parse(first_record['metadata']['odeReceivedAt']).replace(microsecond=0)
+        old_state = self._record_state(sorted_bundle[0])
 
         validation_results = []
         for record in sorted_bundle[1:]:
-            new_record_id = int(record['metadata']['serialId']['recordId'])
-            new_serial_number = int(record['metadata']['serialId']['serialNumber'])
-            new_record_generated_at = dateutil.parser.parse(record['metadata']['recordGeneratedAt']).replace(microsecond=0)
-            new_ode_received_at = dateutil.parser.parse(record['metadata']['odeReceivedAt']).replace(microsecond=0)
-
-            if 'metadata.serialId.recordId' not in self.skip_validations and record['metadata']['serialId']['bundleSize'] > 1 and new_record_id != old_record_id+1:
-                validation_results.append(FieldValidationResult(False, "Detected incorrectly incremented recordId. Expected recordId '%d' but got '%d'" % (old_record_id+1, new_record_id), serial_id = record['metadata']['serialId']))
-            if 'metadata.serialId.serialNumber' not in self.skip_validations and new_serial_number != old_serial_number+1:
-                validation_results.append(FieldValidationResult(False, "Detected incorrectly incremented serialNumber. Expected serialNumber '%d' but got '%d'" % (old_serial_number+1, new_serial_number), serial_id = record['metadata']['serialId']))
-            if 'metadata.recordGeneratedAt' not in self.skip_validations and new_record_generated_at < old_record_generated_at:
-                validation_results.append(FieldValidationResult(False, "Detected non-chronological recordGeneratedAt. Previous timestamp was '%s' but current timestamp is '%s'" % (old_record_generated_at, new_record_generated_at), serial_id = record['metadata']['serialId']))
-            if 'metadata.odeReceivedAt' not in self.skip_validations and new_ode_received_at < old_ode_received_at:
-                validation_results.append(FieldValidationResult(False, "Detected non-chronological odeReceivedAt. Previous timestamp was '%s' but current timestamp is '%s'" % (old_ode_received_at, new_ode_received_at), serial_id = record['metadata']['serialId']))
-
-            old_record_id = new_record_id
-            old_serial_number = new_serial_number
-            old_record_generated_at = new_record_generated_at
-            old_ode_received_at = new_ode_received_at
+            new_state = self._record_state(record)
+            validation_results.extend(self._compare_records(old_state, new_state, record))
+            old_state = new_state
 
         if 'metadata.serialId.bundleSize' not in self.skip_validations:
             validation_results.extend(self.validate_bundle_size(sorted_bundle))
 
         return validation_results
 
+    def _record_state(self, record):
+        return (int(record['metadata']['serialId']['recordId']),
+            int(record['metadata']['serialId']['serialNumber']),
+            self.timestamp_cache.parse(record['metadata']['recordGeneratedAt']).replace(microsecond=0),
+            self.timestamp_cache.parse(record['metadata']['odeReceivedAt']).replace(microsecond=0))
+
+    def _compare_records(self, old_state, new_state, record):
+        old_record_id, old_serial_number, old_record_generated_at, old_ode_received_at = old_state
+        new_record_id, new_serial_number, new_record_generated_at, new_ode_received_at = new_state
+
+        validation_results = []
+        if 'metadata.serialId.recordId' not in self.skip_validations and record['metadata']['serialId']['bundleSize'] > 1 and new_record_id != old_record_id+1:
+            validation_results.append(FieldValidationResult(False, code = ERROR_RECORD_ID_INCREMENT, args = (old_record_id+1, new_record_id), serial_id = record['metadata']['serialId']))
+        if 'metadata.serialId.serialNumber' not in self.skip_validations and new_serial_number != old_serial_number+1:
+            validation_results.append(FieldValidationResult(False, code = ERROR_SERIAL_NUMBER_INCREMENT, args = (old_serial_number+1, new_serial_number), serial_id = record['metadata']['serialId']))
+        if 'metadata.recordGeneratedAt' not in self.skip_validations and new_record_generated_at < old_record_generated_at:
+            validation_results.append(FieldValidationResult(False, code = ERROR_RECORD_GENERATED_AT_ORDER, args = (old_record_generated_at, new_record_generated_at), serial_id = record['metadata']['serialId']))
+        if 'metadata.odeReceivedAt' not in self.skip_validations and new_ode_received_at < old_ode_received_at:
+            validation_results.append(FieldValidationResult(False, code = ERROR_ODE_RECEIVED_AT_ORDER, args = (old_ode_received_at, new_ode_received_at), serial_id = record['metadata']['serialId']))
+
+        return validation_results
+
     def validate_bundle_size(self, sorted_bundle):
-        first_record_id = int(sorted_bundle[0]['metadata']['serialId']['recordId'])
-        last_record_id = int(sorted_bundle[-1]['metadata']['serialId']['recordId'])
-        cur_bundle_size = int(sorted_bundle[0]['metadata']['serialId']['bundleSize'])
+        bundle_sizes = []
+        for record in sorted_bundle:
+            bundle_size = (int(record['metadata']['serialId']['bundleSize']), 'logFileName' in record['metadata'])
+            if not bundle_sizes or bundle_sizes[-1] != bundle_size:
+                bundle_sizes.append(bundle_size)
+
+        return self._check_bundle_size(int(sorted_bundle[0]['metadata']['serialId']['recordId']),
+            int(sorted_bundle[0]['metadata']['serialId']['bundleSize']),
+            int(sorted_bundle[-1]['metadata']['serialId']['recordId']),
+            sorted_bundle[-1]['metadata']['serialId'],
+            bundle_sizes,
+            len(sorted_bundle))
+
+    def _check_bundle_size(self, first_record_id, first_bundle_size, last_record_id, last_serial_id, bundle_sizes, record_count):
         prev_bundle_size = None
 
         validation_results = []
         # partial or full list?
         if first_record_id == 0:
             # head of a partial list?
-            if last_record_id == cur_bundle_size - 1:
+            if last_record_id == first_bundle_size - 1:
                 # full list
-                for record in sorted_bundle:
-                    cur_bundle_size = int(record['metadata']['serialId']['bundleSize'])
-                    if prev_bundle_size != cur_bundle_size and 'logFileName' in record['metadata'] and len(sorted_bundle) != cur_bundle_size:
+                for cur_bundle_size, has_log_file_name in bundle_sizes:
+                    if prev_bundle_size != cur_bundle_size and has_log_file_name and record_count != cur_bundle_size:
                         prev_bundle_size = cur_bundle_size
-                        validation_results.append(FieldValidationResult(False, "bundleSize doesn't match number of records. Number of records: '%d' != bundlSize: '%d'" % (len(sorted_bundle), cur_bundle_size), serial_id = sorted_bundle[-1]['metadata']['serialId']))
+                        validation_results.append(FieldValidationResult(False, code = ERROR_BUNDLE_SIZE_RECORD_COUNT, args = (record_count, cur_bundle_size), serial_id = last_serial_id))
         else:
             # tail of a partial list
-            for record in sorted_bundle:
-                cur_bundle_size = int(record['metadata']['serialId']['bundleSize'])
+            for cur_bundle_size, has_log_file_name in bundle_sizes:
                 if prev_bundle_size != cur_bundle_size and last_record_id != cur_bundle_size-1:
                     prev_bundle_size = cur_bundle_size
-                    validation_results.append(FieldValidationResult(False, "bundleSize doesn't match last recordId. Last recordId: '%d' != (bundleSize-1: '%d')" % (last_record_id, cur_bundle_size-1), serial_id = sorted_bundle[-1]['metadata']['serialId']))
+                    validation_results.append(FieldValidationResult(False, code = ERROR_BUNDLE_SIZE_LAST_RECORD_ID, args = (last_record_id, cur_bundle_size-1), serial_id = last_serial_id))
 
         return validation_results
 
@@ -0,0 +1,244 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from .parallel import _init_worker, _validate_chunk, build_worker_test_case, merge_chunk, validate_chunk, worker_args
+from .validator import ValidationRun
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_PENDING_BATCHES = 4
+# seconds a partial batch waits for more messages before it is validated anyway
+DEFAULT_BATCH_LINGER = 0.1
+
+# marks the end of the consumed messages in the service's read-ahead queue
+_END = object()
+
+def message_value(message):
+    # raw lines or consumer records holding the line in .value, like the records of Kafka clients
+    return getattr(message, 'value', message)
+
+class InMemoryMessage:
+    __slots__ = ('topic', 'offset', 'value')
+
+    def __init__(self, topic, offset, value):
+        self.topic = topic
+        self.offset = offset
+        self.value = value
+
+class InMemoryTopic:
+    def __init__(self):
+        self.messages = []
+        self.closed = False
+        self.changed = asyncio.Condition()
+
+class InMemoryBroker:
+    """
+    Stand-in for a Kafka cluster in tests and local runs. Topics are in-memory logs that any number of consumers read
+    from their own offset. Consumers wait for new messages until the topic is closed.
+    """
+    def __init__(self):
+        self.topics = {}
+
+    def topic(self, name):
+        topic = self.topics.get(name)
+        if topic is None:
+            topic = self.topics[name] = InMemoryTopic()
+        return topic
+
+    async def produce(self, name, value):
+        topic = self.topic(name)
+        async with topic.changed:
+            topic.messages.append(InMemoryMessage(name, len(topic.messages), value))
+            topic.changed.notify_all()
+
+    async def close_topic(self, name):
+        topic = self.topic(name)
+        async with topic.changed:
+            topic.closed = True
+            topic.changed.notify_all()
+
+    def consumer(self, name, offset=0):
+        return InMemoryConsumer(self.topic(name), offset)
+
+    def values(self, name):
+        return [message.value for message in self.topic(name).messages]
+
+class InMemoryConsumer:
+    """
+    Consumer of an InMemoryBroker topic. Like a Kafka consumer it is an async iterator of messages and records the
+    offset after the last message committed.
+    """
+    def __init__(self, topic, offset=0):
+        self.topic = topic
+        self.offset = offset
+        self.committed = offset
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        topic = self.topic
+        async with topic.changed:
+            await topic.changed.wait_for(lambda: self.offset < len(topic.messages) or topic.closed)
+            if self.offset >= len(topic.messages):
+                raise StopAsyncIteration
+            message = topic.messages[self.offset]
+        self.offset += 1
+        return message
+
+    async def commit(self, message):
+        self.committed = message.offset + 1
+
+class InMemorySink:
+    """
+    Async sink keeping every result it is sent.
+    """
+    def __init__(self):
+        self.results = []
+
+    async def send(self, result):
+        self.results.append(result)
+
+    async def close(self):
+        pass
+
+class WriterSink:
+    """
+    Async sink writing results through one of the result writers of odevalidator.writers.
+    """
+    def __init__(self, writer):
+        self.writer = writer
+
+    async def send(self, result):
+        self.writer.write(result)
+
+    async def close(self):
+        self.writer.close()
+
+class TopicSink:
+    """
+    Async sink publishing every result as json to a topic of an InMemoryBroker, or of any broker with the same
+    produce() coroutine.
+    """
+    def __init__(self, broker, topic):
+        self.broker = broker
+        self.topic = topic
+
+    async def send(self, result):
+        await self.broker.produce(self.topic, str(result))
+
+    async def close(self):
+        pass
+
+class ValidationService:
+    """
+    Validates messages from an async consumer and sends the results to an async sink, e.g. to continuously validate
+    the ODE output topics. Any async iterator of lines, or of records holding the line in .value, can be consumed;
+    each message is one record. Messages are validated in batches handed to an executor, a worker thread or, with
+    workers > 1, a process pool, while the event loop keeps reading. At most max_pending_batches batches are in
+    flight, after which reading pauses until results have been sent. Results are sent in consumer order, sequential
+    checks run as in TestCase.validate_stream, and consumers with a commit(message) coroutine are committed after
+    the results of each batch have been sent.
+    """
+    def __init__(self, test_case, sink, batch_size=DEFAULT_BATCH_SIZE, max_pending_batches=DEFAULT_MAX_PENDING_BATCHES, batch_linger=DEFAULT_BATCH_LINGER, workers=None):
+        self.test_case = test_case
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches
+        self.batch_linger = batch_linger
+        self.workers = workers
+
+    async def run(self, consumer):
+        """
+        Validates messages until the consumer is exhausted and returns the summary of the run. The sink is not closed.
+        """
+        loop = asyncio.get_running_loop()
+        if self.workers and self.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=worker_args(self.test_case))
+            validate = _validate_chunk
+        else:
+            # the worker thread validates with its own copy, the test case itself is only used on the event loop
+            executor = ThreadPoolExecutor(max_workers=1)
+            validate = partial(validate_chunk, build_worker_test_case(*worker_args(self.test_case)))
+
+        messages = asyncio.Queue(maxsize=self.batch_size * self.max_pending_batches)
+        batches = asyncio.Queue(maxsize=self.max_pending_batches)
+        reader = asyncio.ensure_future(self._read(consumer, messages))
+        publisher = asyncio.ensure_future(self._publish(consumer, batches, ValidationRun(self.test_case)))
+        # batches handed to the executor and not validated yet, cancelled if the run ends early
+        pending = []
+        completed = False
+        try:
+            done = False
+            while not done:
+                batch, done = await self._next_batch(messages)
+                if batch:
+                    lines = list(self.test_case._iter_records(message_value(message) for message in batch))
+                    future = loop.run_in_executor(executor, validate, lines)
+                    pending = [other for other in pending if not other.done()]
+                    pending.append(future)
+                    await self._put(batches, (future, batch[-1]), publisher)
+            await self._put(batches, None, publisher)
+            await publisher
+            await reader
+            # every batch is validated by now, waiting joins the workers so none is left behind at interpreter exit
+            executor.shutdown(wait=True)
+            completed = True
+            return self.test_case.summary
+        finally:
+            reader.cancel()
+            publisher.cancel()
+            if not completed:
+                # cancelling the asyncio futures cancels the executor's, shutdown(cancel_futures=True) needs Python 3.9
+                for future in pending:
+                    future.cancel()
+                executor.shutdown(wait=False)
+
+    async def _read(self, consumer, messages):
+        try:
+            async for message in consumer:
+                await messages.put(message)
+        finally:
+            await messages.put(_END)
+
+    async def _next_batch(self, messages):
+        loop = asyncio.get_running_loop()
+        message = await messages.get()
+        if message is _END:
+            return [], True
+        batch = [message]
+        deadline = loop.time() + self.batch_linger
+        while len(batch) < self.batch_size:
+            try:
+                if messages.empty():
+                    message = await asyncio.wait_for(messages.get(), max(deadline - loop.time(), 0))
+                else:
+                    message = messages.get_nowait()
+            except asyncio.TimeoutError:
+                break
+            if message is _END:
+                return batch, True
+            batch.append(message)
+        return batch, False
+
+    async def _put(self, batches, item, publisher):
+        # a failing sink stops the publisher, which must not leave the producing side waiting for room forever
+        put = asyncio.ensure_future(batches.put(item))
+        await asyncio.wait([put, publisher], return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            publisher.result()
+
+    async def _publish(self, consumer, batches, run):
+        commit = getattr(consumer, 'commit', None)
+        while True:
+            item = await batches.get()
+            if item is None:
+                break
+            future, last_message = item
+            for current_msg, field_validations in merge_chunk(self.test_case, await future):
+                for result in run.add(current_msg, field_validations):
+                    await self.sink.send(result)
+            if commit is not None:
+                await commit(last_message)
+        for result in run.close():
+            await self.sink.send(result)
@@ -0,0 +1,281 @@
+import json
+import os
+import zlib
+from collections import deque
+from .result import FieldValidationResult
+from .sequential import CHECK_PATHS, Sequential
+
+SHARD_FILE_FORMAT = 'shard-%05d.ndjson'
+# records of a shard handed to its Sequential at once, and batches a worker process may have queued
+DEFAULT_SHARD_BATCH_SIZE = 1000
+MAX_PENDING_SHARD_BATCHES = 2
+
+def bundle_key(record):
+    serial_id = record['metadata']['serialId']
+    return (serial_id.get('streamId'), serial_id['bundleId'])
+
+def shard_of(key, shards):
+    """
+    Returns the shard of a streamId/bundleId key. The hash is stable across processes and hosts, so records
+    partitioned on different nodes land in the same shard.
+    """
+    return zlib.crc32(('%s\0%s' % key).encode('utf-8')) % shards
+
+def _sort_key(key):
+    stream_id, bundle_id = key
+    return (str(stream_id), (0, bundle_id, '') if isinstance(bundle_id, int) else (1, 0, str(bundle_id)))
+
+class ShardResult:
+    """
+    Partial result of the sequential checks of one or more shards: the number of records and bundles checked and the
+    findings. Partial results of any shards, from any process or host, combine with merge(); to_json() and
+    from_json() move them between hosts.
+    """
+    def __init__(self, record_count=0, bundle_count=0, findings=None):
+        self.record_count = record_count
+        self.bundle_count = bundle_count
+        self.findings = findings if findings is not None else []
+
+    def merge(self, other):
+        self.record_count += other.record_count
+        self.bundle_count += other.bundle_count
+        self.findings.extend(other.findings)
+        return self
+
+    def sorted_findings(self, bundle_order=None):
+        """
+        Returns the findings grouped by bundle, in bundle_order (a {key: position} dict) or else by streamId and
+        bundleId. The findings of a bundle keep the order they were found in.
+        """
+        if bundle_order is not None:
+            return sorted(self.findings, key=lambda finding: bundle_order.get(bundle_key({'metadata': {'serialId': finding.serial_id}}), len(bundle_order)))
+        return sorted(self.findings, key=lambda finding: _sort_key(bundle_key({'metadata': {'serialId': finding.serial_id}})))
+
+    def __str__(self):
+        return json.dumps(self.to_json())
+
+    def to_json(self):
+        return {"Records": self.record_count, "Bundles": self.bundle_count, "Findings": [finding.to_json() for finding in self.findings]}
+
+    @staticmethod
+    def from_json(obj):
+        findings = [FieldValidationResult.from_json(finding) for finding in obj["Findings"]]
+        return ShardResult(obj["Records"], obj["Bundles"], findings)
+
+def combine_shard_results(results):
+    """
+    Combines partial ShardResults, e.g. the results of validate_shard_files on several hosts, into one.
+    """
+    combined = ShardResult()
+    for result in results:
+        combined.merge(result)
+    return combined
+
+def validate_shard(records, skip_validations=()):
+    """
+    Runs the incremental sequential checks over the records of a shard, in arrival order, and returns a ShardResult.
+    """
+    seq = Sequential(skip_validations)
+    findings = []
+    keys = set()
+    record_count = 0
+    for record in records:
+        record_count += 1
+        keys.add(bundle_key(record))
+        findings.extend(seq.add_record(record))
+    findings.extend(seq.close())
+    return ShardResult(record_count, len(keys), findings)
+
+def read_shard_file(path):
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def validate_shard_files(shard_paths, skip_validations=(), workers=None):
+    """
+    Runs the sequential checks of pre-partitioned shard files, as written by ShardWriter, and returns the combined
+    ShardResult. Each entry of shard_paths is a shard: a path, or a list of paths holding the parts of the same shard
+    written on several hosts, read one after the other. With workers > 1, shards are checked in a process pool.
+    """
+    shards = [[paths] if isinstance(paths, (str, bytes, os.PathLike)) else list(paths) for paths in shard_paths]
+    return combine_shard_results(_map(_validate_shard_paths, [(paths, frozenset(skip_validations)) for paths in shards], workers))
+
+def _validate_shard_paths(paths, skip_validations):
+    # records are read as they are checked, a shard is never held in memory
+    return validate_shard((record for path in paths for record in read_shard_file(path)), skip_validations)
+
+def _map(function, args, workers):
+    if not workers or workers <= 1 or len(args) <= 1:
+        return [function(*arg) for arg in args]
+    from concurrent.futures import ProcessPoolExecutor  # only imported when a pool is used
+    with ProcessPoolExecutor(max_workers=min(workers, len(args))) as executor:
+        return [future.result() for future in [executor.submit(function, *arg) for arg in args]]
+
+class ShardWriter:
+    """
+    Partitions records by streamId/bundleId into shard files of a directory, keeping only the metadata the
+    sequential checks read. Each host of a multi-node run writes its own directory; the files with the same name
+    across directories are the parts of the same shard, see validate_shard_files.
+    """
+    def __init__(self, directory, shards):
+        self.directory = directory
+        self.shards = shards
+        self.files = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, shard):
+        return os.path.join(self.directory, SHARD_FILE_FORMAT % shard)
+
+    def write(self, record):
+        shard = shard_of(bundle_key(record), self.shards)
+        f = self.files.get(shard)
+        if f is None:
+            f = self.files[shard] = open(self.path(shard), 'a')
+        f.write(json.dumps(Sequential.slim_record(record)) + '\n')
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+        self.files = {}
+        return [self.path(shard) for shard in range(self.shards) if os.path.exists(self.path(shard))]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class ShardedSequential:
+    """
+    Sequential checks partitioned by streamId/bundleId. Bundles are checked independently of each other, so records
+    are routed to one of `shards` partitions as they arrive, each checked incrementally by its own Sequential. Records
+    are handed over in batches of batch_size, to worker processes when workers > 1 (a shard always goes to the same
+    worker), and released as their bundles close, so memory stays bounded. Drop-in replacement of the incremental
+    Sequential in a validation run: add_record() only routes the record and close() returns every finding, grouped by
+    streamId and bundleId. The skip_validations set is read on close(), once every record has been validated.
+    """
+    def __init__(self, skip_validations=(), shards=1, workers=None, batch_size=DEFAULT_SHARD_BATCH_SIZE):
+        self.skip_validations = skip_validations
+        self.shards = shards
+        self.workers = min(workers or 1, shards)
+        self.batch_size = batch_size
+        self.batches = [[] for shard in range(shards)]
+        # shard -> Sequential, for the shards checked in this process
+        self.sequentials = {}
+        self.findings = []
+        self.record_count = 0
+        # a single process executor per worker, and the futures of the batches it has not returned yet
+        self.executors = None
+        self.pending = None
+        self.result = None
+
+    def add_record(self, record):
+        shard = shard_of(bundle_key(record), self.shards)
+        batch = self.batches[shard]
+        batch.append(record)
+        self.record_count += 1
+        if len(batch) >= self.batch_size:
+            self._flush(shard)
+        return []
+
+    def close(self):
+        for shard in range(self.shards):
+            self._flush(shard)
+        findings = self.findings
+        bundle_count = 0
+        if self.executors is not None:
+            self._drain(0)
+            for executor in self.executors:
+                worker_findings, worker_bundle_count = executor.submit(_close_shard_worker).result()
+                findings.extend(worker_findings)
+                bundle_count += worker_bundle_count
+                executor.shutdown()
+        for seq in self.sequentials.values():
+            findings.extend(seq.close())
+            bundle_count += seq.bundle_count
+        findings = [finding for finding in findings if CHECK_PATHS[finding.code] not in self.skip_validations]
+        self.result = ShardResult(self.record_count, bundle_count, findings)
+        self.sequentials = {}
+        self.findings = []
+        self.record_count = 0
+        self.executors = None
+        self.pending = None
+        return self.result.sorted_findings()
+
+    def _flush(self, shard):
+        records = self.batches[shard]
+        if not records:
+            return
+        self.batches[shard] = []
+        if self.workers <= 1:
+            seq = self.sequentials.get(shard)
+            if seq is None:
+                seq = self.sequentials[shard] = _shard_sequential()
+            for record in records:
+                self.findings.extend(seq.add_record(record))
+            return
+        if self.executors is None:
+            self._start_workers()
+        worker = shard % self.workers
+        self.pending[worker].append(self.executors[worker].submit(_add_shard_records, shard, records))
+        self._drain(MAX_PENDING_SHARD_BATCHES, worker)
+
+    def _start_workers(self):
+        from concurrent.futures import ProcessPoolExecutor  # only imported when a pool is used
+        # the shards of a restored run continue from their checks' state
+        self.executors = [ProcessPoolExecutor(max_workers=1, initializer=_init_shard_worker,
+            initargs=({shard: seq for shard, seq in self.sequentials.items() if shard % self.workers == worker},)) for worker in range(self.workers)]
+        self.pending = [deque() for worker in range(self.workers)]
+        self.sequentials = {}
+
+    def _drain(self, max_pending, worker=None):
+        for pending in self.pending if worker is None else [self.pending[worker]]:
+            while len(pending) > max_pending:
+                self.findings.extend(pending.popleft().result())
+
+    def __getstate__(self):
+        # e.g. for a checkpoint: executors can't be pickled, the checks of the worker processes are fetched instead
+        if self.executors is not None:
+            self._drain(0)
+            sequentials = {}
+            for executor in self.executors:
+                sequentials.update(executor.submit(_shard_worker_state).result())
+        else:
+            sequentials = self.sequentials
+        state = dict(vars(self))
+        state.update(sequentials=sequentials, executors=None, pending=None)
+        return state
+
+def _shard_sequential():
+    # skips are applied to the findings on close, the checks run in full
+    return Sequential(set())
+
+# the Sequentials of the shards of a worker process
+_worker_sequentials = {}
+
+def _init_shard_worker(sequentials):
+    _worker_sequentials.clear()
+    _worker_sequentials.update(sequentials)
+
+def _add_shard_records(shard, records):
+    seq = _worker_sequentials.get(shard)
+    if seq is None:
+        seq = _worker_sequentials[shard] = _shard_sequential()
+    findings = []
+    for record in records:
+        findings.extend(seq.add_record(record))
+    return findings
+
+def _close_shard_worker():
+    findings = []
+    bundle_count = 0
+    for seq in _worker_sequentials.values():
+        findings.extend(seq.close())
+        bundle_count += seq.bundle_count
+    _worker_sequentials.clear()
+    return findings, bundle_count
+
+def _shard_worker_state():
+    return _worker_sequentials
@@ -0,0 +1,62 @@
+import re
+from datetime import datetime, timezone, timedelta
+
+# strict ISO-8601/RFC3339 shapes emitted by the ODE, e.g. '2019-03-14T14:54:21.596Z' or '2019-03-14T14:54:21+00:00'
+ISO_TIMESTAMP_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:?\d{2})?')
+
+DEFAULT_CACHE_SIZE = 8192
+
+def parse_timestamp(value):
+    """
+    Parses a timestamp string, using a precompiled pattern for the ISO-8601 shapes the ODE emits and falling back to
+    dateutil for anything else. Results and errors match dateutil.parser.parse.
+    """
+    match = ISO_TIMESTAMP_PATTERN.fullmatch(value)
+    if match is None:
+        return _dateutil_parse(value)
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    microsecond = int(fraction[:6].ljust(6, '0')) if fraction else 0
+    if offset is None:
+        tzinfo = None
+    elif offset == 'Z':
+        tzinfo = timezone.utc
+    else:
+        offset_minutes = int(offset[1:3]) * 60 + int(offset[-2:])
+        if offset_minutes == 0:
+            tzinfo = timezone.utc
+        else:
+            tzinfo = timezone(timedelta(minutes=offset_minutes if offset[0] == '+' else -offset_minutes))
+    try:
+        return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second), microsecond, tzinfo)
+    except ValueError:
+        # out of range values, let dateutil report them
+        return _dateutil_parse(value)
+
+def _dateutil_parse(value):
+    # dateutil is slow to import and only needed for timestamps off the fast path
+    import dateutil.parser
+    return dateutil.parser.parse(value)
+
+class TimestampCache:
+    """
+    Memo of parsed timestamps shared by the field and sequential checks of a validation run, so that a timestamp
+    validated as a field is not parsed again when its record is checked sequentially. The memo is bounded and simply
+    starts over when it fills up.
+    """
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.values = {}
+
+    def __getstate__(self):
+        # the memo is rebuilt as needed, e.g. by a run resumed from a checkpoint
+        return {'max_size': self.max_size, 'values': {}}
+
+    def parse(self, value):
+        parsed = self.values.get(value)
+        if parsed is None:
+            parsed = parse_timestamp(value)
+            if len(self.values) >= self.max_size:
+                self.values.clear()
+            self.values[value] = parsed
+        return parsed
@@ -1,18 +1,34 @@
-from configparser import ConfigParser, ExtendedInterpolation
-import dateutil.parser
 from datetime import datetime, timezone, timedelta
 import json
 import logging
-import pkg_resources
+import os
 import queue
 import re
-import copy
 
+from collections import deque
 from collections.abc import Iterable
+from itertools import chain
 from decimal import Decimal
 from pathlib import Path
-from .result import FieldValidationResult, RecordValidationResult, ValidatorException
-from .sequential import Sequential, SEQUENTIAL_CHECK
+from .result import FieldValidationResult, RecordValidationResult, ValidationSummary, ValidatorException
+from .result import (ERROR_REQUIRED_FIELD_MISSING, ERROR_VALUE_DOES_NOT_START_WITH, ERROR_VALUE_NOT_EXPECTED,
+    ERROR_FIELD_MISSING, ERROR_FIELD_EMPTY, ERROR_VALUE_NOT_IN_ENUM, ERROR_ABOVE_UPPER_LIMIT,
+    ERROR_BELOW_LOWER_LIMIT, ERROR_DECIMAL_VALIDATION, ERROR_BEFORE_EARLIEST_TIME, ERROR_AFTER_LATEST_TIME,
+    ERROR_TIMESTAMP_VALIDATION, ERROR_NO_CHOICES, ERROR_MULTIPLE_CHOICES, ERROR_CHOICE_VALIDATION,
+    ERROR_REGEX_NO_MATCH, ERROR_REGEX_PARTIAL_MATCH, ERROR_STRING_VALIDATION)
+from .sequential import Sequential, SEQUENTIAL_CHECK, SEQUENTIAL_METADATA_FIELDS
+from .sharding import ShardedSequential
+from .timestamps import TimestampCache, parse_timestamp
+from .parallel import DEFAULT_CHUNK_SIZE, validate_in_pool
+from .columnar import DEFAULT_CHUNK_ROWS, ColumnarCSVValidator
+from .profiling import PHASE_PARSE, PHASE_SEQUENTIAL, PHASE_VALIDATE
+from .decoding import JSON_BACKEND_AUTO, JSON_BACKEND_LAZY, get_json_parser, orjson, orjson_loads
+from .config_cache import CompiledConfigCache, default_cache_dir
+from .conditions import ConditionIndex, RecordLookups
+from .ingest import LineReader
+
+# shipped with the package, see package_data in setup.py
+DEFAULT_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'configs', 'config.ini')
 
 TYPE_DECIMAL = 'decimal'
 TYPE_ENUM = 'enum'
@@ -20,15 +36,139 @@ TYPE_CHOICE = 'choice'
 TYPE_TIMESTAMP = 'timestamp'
 TYPE_STRING = 'string'
 
+# record shapes whose list field paths are kept compiled into a PathTrie
+MAX_BOUND_TRIES = 256
+
+# Compiled accessors are shared by every Field (and every list expansion) that references the same path
+_accessor_cache = {}
+
+
+def get_accessor(path_str):
+    accessor = _accessor_cache.get(path_str)
+    if accessor is None:
+        accessor = PathAccessor(path_str)
+        _accessor_cache[path_str] = accessor
+    return accessor
+
+
+class PathAccessor:
+    """
+    Pre-parsed form of a dotted field path. Each step is a (key, list_key, index) tuple where list_key and index
+    are only set for keys using the '{n}' list index syntax, so resolving a record does no string parsing.
+    """
+    def __init__(self, path_str):
+        self.path = path_str
+        steps = []
+        for key in path_str.split("."):
+            list_key = None
+            index = None
+            if key.count('{') == 1:
+                index_begin = key.index('{')
+                index_end = key.index('}')
+                try:
+                    index = int(key[(index_begin + 1):index_end])
+                    list_key = key[:index_begin]
+                except ValueError:
+                    index = None
+            steps.append((key, list_key, index))
+        self.steps = tuple(steps)
+
+    def get(self, data):
+        value = data
+        for key, list_key, index in self.steps:
+            if key in value:
+                value = value.get(key)
+            elif list_key is not None:
+                try:
+                    if value.get(list_key):
+                        value = value[list_key][index]  # access list element of dictionary value
+                    else:
+                        return None
+                except Exception as e:
+                    return None
+            else:
+                return None
+        if value is None:
+            value = ''
+        return value
+
+
+class PathTrie:
+    """
+    Prefix tree of the paths read by the fields of a test case. resolve() walks a record once, reading every shared
+    prefix once, and stores the value PathAccessor.get would return for each path. Everything under a missing key is
+    set to None at once. Paths whose walk raises (e.g. a key looked up in a number) are left out, so that reading them
+    with their own accessor raises where the field is validated.
+    """
+    def __init__(self, paths):
+        root = {}
+        for path in dict.fromkeys(paths):
+            node = root
+            for step in PathAccessor(path).steps:
+                node = node.setdefault(step, {})
+            node.setdefault(None, []).append(path)
+        self.root = self._compile(root)
+
+    def _compile(self, node):
+        # (paths ending here, ((key, list_key, index, child, {path: None} of the child's subtree), ...))
+        children = []
+        for step, child in node.items():
+            if step is not None:
+                compiled = self._compile(child)
+                key, list_key, index = step
+                children.append((key, list_key, index, compiled, dict.fromkeys(self._subtree_paths(compiled))))
+        return (tuple(node.get(None, ())), tuple(children))
+
+    def _subtree_paths(self, node):
+        paths = list(node[0])
+        for key, list_key, index, child, missing in node[1]:
+            paths.extend(missing)
+        return paths
+
+    def resolve(self, data, values):
+        self._walk(data, self.root, values)
+        return values
+
+    def _walk(self, value, node, values):
+        paths, children = node
+        if paths:
+            leaf_value = '' if value is None else value
+            for path in paths:
+                values[path] = leaf_value
+        for key, list_key, index, child, missing in children:
+            try:
+                if key in value:
+                    self._walk(value.get(key), child, values)
+                    continue
+            except Exception:
+                continue  # resolved by the fields' own accessors
+            if list_key is not None:
+                try:
+                    if value.get(list_key):
+                        element = value[list_key][index]  # access list element of dictionary value
+                    else:
+                        values.update(missing)
+                        continue
+                except Exception:
+                    values.update(missing)
+                    continue
+                self._walk(element, child, values)
+            else:
+                values.update(missing)
+
 
 class Field:
     def __init__(self, key, field_config=None, test_case=None):
         # extract required settings
         self.path = key
+        # config section the field comes from, list fields are bound from a '.list' section
+        self.section = key
 
         if not self.path:
             raise ValidatorException("Invalid configuration property definition for field %s=%s" % (key, field_config))
 
+        self.accessor = get_accessor(self.path)
+
         if field_config is None:
             return
 
@@ -50,208 +190,222 @@ class Field:
         lower_limit = field_config.get('LowerLimit')
         if lower_limit is not None:
             self.lower_limit = Decimal(lower_limit)
+        self.has_limits = upper_limit is not None or lower_limit is not None
         values = field_config.get('Values')
         if values is not None:
             self.values = json.loads(values)
+            # enum membership is checked case-insensitively
+            self.enum_values = frozenset(str(x).lower() for x in self.values)
+            self.values_str = ', '.join(map(str, self.values))
         choices = field_config.get('Choices')
         if choices is not None:
             self.choices = json.loads(choices)
+            self.choice_accessors = [get_accessor(self.path + '.' + choice) for choice in self.choices]
         equals_value = field_config.get('EqualsValue')
         if equals_value is not None:
             self.equals_value = json.loads(str(equals_value))
+            self.conditions = self._compile_conditions(self.equals_value)
+            self.condition_index = ConditionIndex(self.conditions) if self.conditions is not None else None
         earliest_time = field_config.get('EarliestTime')
         if earliest_time is not None:
             try:
-                self.earliest_time = dateutil.parser.parse(earliest_time).replace(microsecond=0)
+                self.earliest_time = parse_timestamp(earliest_time).replace(microsecond=0)
             except Exception as e:
                 raise ValidatorException("Unable to parse configuration file timestamp EarliestTime for field %s=%s, error: %s" % (key, field_config, str(e)))
         latest_time = field_config.get('LatestTime')
         if latest_time is not None:
             if latest_time == 'NOW':
                 self.latest_time = datetime.now(timezone.utc)
+                self.latest_time_is_now = True
             else:
                 try:
-                    self.latest_time = dateutil.parser.parse(latest_time).replace(microsecond=0)
+                    self.latest_time = parse_timestamp(latest_time).replace(microsecond=0)
                 except Exception as e:
                     raise ValidatorException("Unable to parse configuration file timestamp LatestTime for field %s=%s, error: %s" % (key, field_config, str(e)))
         
+        self.regex_pattern = None
         regex = field_config.get('RegularExpression')
         if regex is not None:
             self.regex = regex
+            try:
+                self.regex_pattern = re.compile(regex)
+            except re.error as e:
+                raise ValidatorException("Unable to compile configuration file RegularExpression for field %s=%s, error: %s" % (key, field_config, str(e)))
         
         self.allow_empty = False
         allow_empty = field_config.get('AllowEmpty')
         if allow_empty is not None:
             self.allow_empty = True if allow_empty == "True" else False
 
-    def validate(self, data):
-        field_value = self._get_field_value(self.path, data)
-        """if hasattr(self, 'list')
-            validation = self.check_list(field_value, data)
-        """
-        if hasattr(self, 'equals_value'):
-            validation = self._check_value(field_value, data)
-        else:
-            validation = self._check_unconditional(field_value, data)
+    def __getstate__(self):
+        # fields are pickled by the compiled config cache, the test case is linked again when they are loaded
+        state = self.__dict__.copy()
+        state.pop('test_case', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.accessor = get_accessor(self.path)
+        if getattr(self, 'latest_time_is_now', False):
+            self.latest_time = datetime.now(timezone.utc)
 
+    def _compile_conditions(self, equals_value):
+        # pre-resolve the accessors of every referenced field so that condition checks do no path parsing
+        if not isinstance(equals_value, Iterable) or 'conditions' not in equals_value:
+            return None
+        conditions = []
+        for cond in equals_value['conditions']:
+            if_part = cond['ifPart']
+            then_part = cond['thenPart'] if 'thenPart' in cond else None
+            sw_accessor = None
+            if then_part and 'startsWithField' in then_part:
+                sw_accessor = get_accessor(then_part['startsWithField'])
+            match_values = None
+            if then_part and 'matchAgainst' in then_part and isinstance(then_part['matchAgainst'], list):
+                try:
+                    match_values = frozenset(then_part['matchAgainst'])
+                except TypeError:
+                    match_values = None  # unhashable entries, fall back to the list
+            conditions.append((get_accessor(if_part['fieldName']), if_part['fieldValues'] if 'fieldValues' in if_part else None, then_part, sw_accessor, match_values))
+        return conditions
+
+    def validate(self, data, values=None):
+        validation = self.check(data, values)
         return validation if validation else FieldValidationResult(True, "", self.path)
 
+    def check(self, data, values=None):
+        # returns the failed FieldValidationResult, or None when the field is valid
+        # values holds the field values already read from the record, see PathTrie
+        path = self.path
+        if values is not None and path in values:
+            field_value = values[path]
+        else:
+            field_value = self.accessor.get(data)
+        if hasattr(self, 'equals_value'):
+            return self._check_value(field_value, data)
+        return self._check_unconditional(field_value, data)
+
     def _check_value(self, data_field_value, data):
+        condition_index = self.condition_index
+        if condition_index is None:
+            # conditions are only compiled from an iterable EqualsValue
+            return self._check_unconditional(data_field_value, data) if isinstance(self.equals_value, Iterable) else None
+
         validation = None
+        field_validation_condition_met = False
+        test_case = self.test_case
+        skip_sequential = condition_index.skip_sequential
+        for position in condition_index.matches(data, data_field_value, test_case.record_lookups if test_case else None):
+            if test_case and skip_sequential[position]:
+                # For skipSequentialValidation, we don't need to do any field validation. We just save this field path for sequential check to use.
+                test_case.skip_sequential_checks.add(self.path)
+            elif not field_validation_condition_met:
+                # It's a field validation condition is met, now if there is a non-'optional' then_part,
+                # check the value against it. Otherwise, carry on without a validation error
+                if_accessor, expected_field_values, then_part, sw_accessor, match_values = self.conditions[position]
+                validation = self._check_conditional(then_part, data_field_value, data, sw_accessor, match_values)
 
-        if isinstance(self.equals_value, Iterable):
-            if 'conditions' in self.equals_value:
-                conditions = self.equals_value['conditions']
-                field_validation_condition_met = False
-                for cond in conditions:
-                    if_part = cond['ifPart']
-                    referenced_field_value = self._get_field_value(if_part['fieldName'], data)
-                    expected_field_values = if_part['fieldValues'] if 'fieldValues' in if_part else None
-                    then_part = cond['thenPart'] if 'thenPart' in cond else None
-
-                    if self._is_condition_met(referenced_field_value, expected_field_values, data_field_value):
-                        if self.test_case and then_part and 'skipSequentialValidation' in then_part and then_part['skipSequentialValidation']:
-                            # For skipSequentialValidation, we don't need to do any field validation. We just save this field path for sequential check to use.
-                            self.test_case.skip_sequential_checks.add(self.path)
-                        elif not field_validation_condition_met:
-                            # It's a field validation condition is met, now if there is a non-'optional' then_part,
-                            # check the value against it. Otherwise, carry on without a validation error
-                            validation = self._check_conditional(then_part, data_field_value, data)
-
-                            # This is NOT a skipSequentialValidation condition and
-                            # therefore a field validation condition is met. If it is skipSequentialValidation
-                            # we don't consider it a condition for field validation. Also,
-                            field_validation_condition_met = True
-
-                if not field_validation_condition_met:
-                    validation = self._check_unconditional(data_field_value, data)
-            else:
-                validation = self._check_unconditional(data_field_value, data)
+                # This is NOT a skipSequentialValidation condition and
+                # therefore a field validation condition is met. If it is skipSequentialValidation
+                # we don't consider it a condition for field validation. Also,
+                field_validation_condition_met = True
 
+        if not field_validation_condition_met:
+            validation = self._check_unconditional(data_field_value, data)
         return validation
 
-    def _is_condition_met(self, referenced_field_value, expected_field_values, data_field_value):
-        condition_met = False
-        if expected_field_values is None:
-            # a None for expected_field_values means that referenced field ('fieldName') may or may not exist
-            # If it does not exist, condition is met. If id does exist, condition is not met and value must be checked.
-            if not referenced_field_value and not data_field_value:
-                condition_met = True
-        else:
-            # expected_field_values exist so referenced_field_value must be cheched to decide if condition is met
-            if referenced_field_value in expected_field_values:
-                # a None for expected_field_values means that referenced field ('fieldName') must merely exist
-                # condition is met, so now we can check the value
-                condition_met = True
-        # if expected_field_values == [] and not referenced_field_value:
-        #    condition_met = True
-
-        return condition_met
-
-    def _check_conditional(self, then_part, data_field_value, data):
+    def _check_conditional(self, then_part, data_field_value, data, sw_accessor=None, match_values=None):
         validation = None
         if then_part:
             # then_part is not blank, missing nor 'optional'
             if data_field_value == None:
                 # required field is missing
-                validation = FieldValidationResult(False, "Required Field is missing.", self.path)
+                validation = FieldValidationResult(False, field_path=self.path, code=ERROR_REQUIRED_FIELD_MISSING)
             elif 'startsWithField' in then_part:
                 # data_field_value must starts with the value of the given data field
-                sw_field_name = then_part['startsWithField']
-                sw_field_value = self._get_field_value(sw_field_name, data)
+                if sw_accessor is None:
+                    sw_accessor = get_accessor(then_part['startsWithField'])
+                sw_field_value = sw_accessor.get(data)
                 if sw_field_value and not data_field_value.startswith(sw_field_value):
-                    validation = FieldValidationResult(False, "Value of Field ('%s') does not start with %s" % (data_field_value, sw_field_value), self.path)
+                    validation = FieldValidationResult(False, field_path=self.path, code=ERROR_VALUE_DOES_NOT_START_WITH, args=(data_field_value, sw_field_value))
             elif 'matchAgainst' in then_part and isinstance(then_part['matchAgainst'], list):
                 # then_part is expected to be an array of strings, one of which should match the data_field_value
-                if data_field_value not in then_part['matchAgainst']:
+                try:
+                    matched = data_field_value in (match_values if match_values is not None else then_part['matchAgainst'])
+                except TypeError:
+                    matched = data_field_value in then_part['matchAgainst']
+                if not matched:
                     # the existing field value is not among the expected values
-                    validation = FieldValidationResult(False, "Value of Field ('%s') is not one of the expected values (%s)" % (data_field_value, then_part['matchAgainst']), self.path)
+                    validation = FieldValidationResult(False, field_path=self.path, code=ERROR_VALUE_NOT_EXPECTED, args=(data_field_value, then_part['matchAgainst']))
 
         return validation
 
     def _get_field_value(self, path_str, data):
-        path_keys = path_str.split(".")
-        value = data
-        for key in path_keys:
-            if key in value:
-                value = value.get(key)
-            elif key.count('{') == 1:
-                index_begin = key.index('{')
-                index_end = key.index('}')
-                index = int(key[(index_begin + 1):index_end])
-                try:
-                    if value.get(key[:index_begin]):
-                        value = value[key[:index_begin]][index]  # access list element of dictionary value
-                    else:
-                        return None
-                except Exception as e:
-                    return None
-            else:
-                return None
-        if value is None:
-            value = ''
-        return value
+        return get_accessor(path_str).get(data)
 
     def _check_unconditional(self, data_field_value, data):
         if data_field_value is None:
-            return FieldValidationResult(False, ("Field missing: " + self.path), self.path)
+            return FieldValidationResult(False, field_path=self.path, code=ERROR_FIELD_MISSING, args=(self.path,))
         else:
             data_field_value = str(data_field_value).strip('"')
             if data_field_value == "":
                 if self.allow_empty:
                     return None
                 else:
-                    return FieldValidationResult(False, "Field empty", self.path)
+                    return FieldValidationResult(False, field_path=self.path, code=ERROR_FIELD_EMPTY)
             else:
-                if self.type == TYPE_ENUM and str(data_field_value).lower() not in [x.lower() for x in self.values]:
-                    return FieldValidationResult(False, "Value '%s' not in list of known values: [%s]" % (str(data_field_value), ', '.join(map(str, self.values))), self.path)
+                if self.type == TYPE_ENUM and data_field_value.lower() not in self.enum_values:
+                    return FieldValidationResult(False, field_path=self.path, code=ERROR_VALUE_NOT_IN_ENUM, args=(data_field_value, self.values_str))
                 elif self.type == TYPE_DECIMAL:
                     try:
-                        if hasattr(self, 'upper_limit') and Decimal(str(data_field_value).strip(' %')) > self.upper_limit:
-                            return FieldValidationResult(False, "Value '%d' is greater than upper limit '%d'" % (Decimal(str(data_field_value).strip(' %')), self.upper_limit), self.path)
-                        if hasattr(self, 'lower_limit') and Decimal(str(data_field_value).strip(' %')) < self.lower_limit:
-                            return FieldValidationResult(False, "Value '%d' is less than lower limit '%d'" % (Decimal(str(data_field_value).strip(' %')), self.lower_limit), self.path)
+                        if self.has_limits:
+                            decimal_value = Decimal(data_field_value.strip(' %'))
+                            if hasattr(self, 'upper_limit') and decimal_value > self.upper_limit:
+                                return FieldValidationResult(False, field_path=self.path, code=ERROR_ABOVE_UPPER_LIMIT, args=(decimal_value, self.upper_limit))
+                            if hasattr(self, 'lower_limit') and decimal_value < self.lower_limit:
+                                return FieldValidationResult(False, field_path=self.path, code=ERROR_BELOW_LOWER_LIMIT, args=(decimal_value, self.lower_limit))
                     except Exception as e:
                         if (self.alt != data_field_value):
-                            return FieldValidationResult(False, "Failed to perform decimal validation, error: %s" % (str(e)), self.path)
+                            return FieldValidationResult(False, field_path=self.path, code=ERROR_DECIMAL_VALIDATION, args=(str(e),))
                 elif self.type == TYPE_TIMESTAMP:
                     try:
                         if not self.date_format:
-                            time_value = dateutil.parser.parse(data_field_value)
+                            if self.test_case:
+                                time_value = self.test_case.timestamp_cache.parse(data_field_value)
+                            else:
+                                time_value = parse_timestamp(data_field_value)
                         else:
                             time_value = datetime.strptime(data_field_value, self.date_format)
 
                         if hasattr(self, 'earliest_time') and time_value < self.earliest_time:
-                            return FieldValidationResult(False, "Timestamp value '%s' occurs before earliest limit '%s'" % (time_value, self.earliest_time), self.path)
+                            return FieldValidationResult(False, field_path=self.path, code=ERROR_BEFORE_EARLIEST_TIME, args=(time_value, self.earliest_time))
 
                         if hasattr(self, 'latest_time') and time_value > (self.latest_time + timedelta(minutes=1)):
-                            return FieldValidationResult(False, "Timestamp value '%s' occurs after latest limit '%s'" % (time_value, self.latest_time), self.path)
+                            return FieldValidationResult(False, field_path=self.path, code=ERROR_AFTER_LATEST_TIME, args=(time_value, self.latest_time))
                     except Exception as e:
                         if (self.alt != data_field_value):
-                            return FieldValidationResult(False, "Failed to perform timestamp validation, error: %s" % (str(e)), self.path)
+                            return FieldValidationResult(False, field_path=self.path, code=ERROR_TIMESTAMP_VALIDATION, args=(str(e),))
                 elif self.type == TYPE_CHOICE:
                     try:
                         count = 0
-                        for choice in self.choices:
-                            value = self._get_field_value(self.path + '.' + choice, data)
+                        for choice_accessor in self.choice_accessors:
+                            value = choice_accessor.get(data)
                             if value is not None:
                                 count += 1
                         if count == 0:
-                            return FieldValidationResult(False, "No choices found in '%s'" % self.path)
+                            return FieldValidationResult(False, code=ERROR_NO_CHOICES, args=(self.path,))
                         if count > 1:
-                            return FieldValidationResult(False, "Found '%d' choices in '%s'" % count, self.path)
+                            return FieldValidationResult(False, field_path=self.path, code=ERROR_MULTIPLE_CHOICES, args=(count, self.path))
                     except Exception as e:
-                        return FieldValidationResult(False, "Failed to perform choice validation, error: %s" % (str(e)), self.path)
+                        return FieldValidationResult(False, field_path=self.path, code=ERROR_CHOICE_VALIDATION, args=(str(e),))
                 elif self.type == TYPE_STRING:
                     try:
-                        if hasattr(self, 'regex'):
-                            match = re.match(self.regex, data_field_value)
-                            if match is None:
-                                return FieldValidationResult(False, "Regular Expressions found no match in '%s'" % self.path) 
-                            elif not(match.group() == data_field_value):
-                                return FieldValidationResult(False, "Regular Expressions do not completely match in '%s'" % self.path)
+                        if self.regex_pattern is not None and self.regex_pattern.fullmatch(data_field_value) is None:
+                            if self.regex_pattern.match(data_field_value) is None:
+                                return FieldValidationResult(False, code=ERROR_REGEX_NO_MATCH, args=(self.path,))
+                            return FieldValidationResult(False, code=ERROR_REGEX_PARTIAL_MATCH, args=(self.path,))
                     except Exception as e:
-                        return FieldValidationResult(False, "failure to perform string validation, error: %s" % (str(e)), self.path)
+                        return FieldValidationResult(False, field_path=self.path, code=ERROR_STRING_VALIDATION, args=(str(e),))
 
     def __str__(self):
         return json.dumps(self.to_json())
@@ -270,15 +424,298 @@ class Field:
             'AllowEmpty': self.allow_empty if hasattr(self, 'allow_empty') else None}
 
 
+class SectionSnapshot(dict):
+    """
+    ConfigParser-free copy of a config section. Lookups are case-insensitive like a ConfigParser section proxy.
+    """
+    def __init__(self, section):
+        super().__init__((option.lower(), section[option]) for option in section)
+
+    def get(self, key, default=None):
+        return super().get(key.lower(), default)
+
+
+class ListFieldTemplate:
+    """
+    Compiled form of a '.list' config section. The section is parsed once; per record, the template only walks the
+    list lengths present in the data and binds pre-built Field validators to the concrete list indexes.
+    """
+    def __init__(self, path_init, field_config, test_case=None):
+        self.path_init = path_init
+        self.test_case = test_case
+        self.field_config = SectionSnapshot(field_config)
+        steps = []
+        for key in path_init.split("."):
+            accessor_step = PathAccessor(key).steps[0]
+            steps.append(accessor_step)
+        self.steps = tuple(steps)
+        self.key_count = len(self.steps)
+
+        # the part of the section path that EqualsValue references, its '.list' keys are bound to concrete indexes
+        self.equals_value = self.field_config.get('EqualsValue')
+        self.embedded_path = None
+        if self.equals_value is not None:
+            keys = path_init.split('.')
+            embedded_path = keys[0]
+            for key in keys[1:]:
+                if embedded_path + '.' + key in self.equals_value:
+                    embedded_path += '.' + key
+                else:
+                    break
+            self.embedded_path = embedded_path
+
+        self.bound_fields = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('test_case', None)
+        state['bound_fields'] = {}
+        return state
+
+    def populate_list_validations(self, data, field_list):  # list indexes. This works on any number of nested lists.
+        self._expand(0, data, '', (), field_list)
+
+    def _expand(self, pos, data, path, indexes, field_list):
+        if pos >= self.key_count:
+            field_list.append(self._bind(path, indexes))
+            return
+
+        key, list_key, index = self.steps[pos]
+        if key == 'list':  # List found
+            if data == '':
+                # a missing list yields both an indexed and an unindexed expansion
+                path = path + '{0}'
+                self._expand(pos + 1, data, path, indexes + ('{0}',), field_list)
+                self._expand(min(pos + 2, self.key_count), data, path, indexes + ('{0}', ''), field_list)
+            elif type(data) != list:
+                self._expand(pos + 1, data, path, indexes + ('',), field_list)
+            else:
+                for i in range(len(data)):
+                    list_index = '{' + str(i) + '}'
+                    self._expand(pos + 1, data[i], path + list_index, indexes + (list_index,), field_list)
+        elif key in data:
+            try:
+                data = data.get(key)
+            except Exception as e:
+                print('Non-dictionary encountered with value of: ' + str(data))
+                raise e
+            self._expand(pos + 1, data, self._set_path(path, key), indexes, field_list)
+        elif list_key is not None:  # Index of list hardcoded
+            if list_key not in data:
+                self._expand(pos + 1, '', self._set_path(path, key), indexes, field_list)
+            elif type(data[list_key]) != list:
+                data = data[list_key] if data.get(list_key) else ''
+                self._expand(pos + 1, data, self._set_path(path, list_key), indexes, field_list)
+            else:
+                if data.get(list_key):
+                    try:
+                        data = data[list_key][index]
+                    except:
+                        data = ''
+                self._expand(pos + 1, data, self._set_path(path, key), indexes, field_list)
+        else:  # key not found in data
+            self._expand(pos + 1, '', self._set_path(path, key), indexes, field_list)
+
+    def _set_path(self, path, key):
+        if not path:
+            return key
+        return path + '.' + key
+
+    def _bind(self, path, indexes):
+        field = self.bound_fields.get((path, indexes))
+        if field is None:
+            field_config = self.field_config
+            if self.equals_value is not None:
+                field_config = SectionSnapshot(field_config)
+                field_config['equalsvalue'] = self._bind_equals_value(list(indexes))
+            field = Field(path, field_config, self.test_case)
+            field.section = self.path_init
+            self.bound_fields[(path, indexes)] = field
+        return field
+
+    def _bind_equals_value(self, indexes):
+        new_path = self.embedded_path
+        while '.list' in new_path:
+            i = new_path.find('.list')
+            new_path = new_path[:i] + indexes.pop(0) + new_path[(i + 5):]
+        return self.equals_value.replace(self.embedded_path, new_path)
+
+
+class ValidationRun:
+    """
+    State of one validation run of a TestCase: the serial ids handed out so far and the incremental sequential
+    checks. Validated records are added in input order and turned into results; close() ends the run.
+    Starting a run resets the summary and timestamp memo of the test case.
+    """
+    def __init__(self, test_case):
+        self.test_case = test_case
+        test_case.summary = ValidationSummary()
+        # timestamps parsed by the field checks are reused by the sequential checks of the same run
+        test_case.timestamp_cache = TimestampCache()
+        self.seq = None
+        if test_case.SequentialValidation:
+            if test_case.sequential_shards:
+                # the shards are checked on close, by a process each
+                shards = test_case.sequential_shards
+                self.seq = ShardedSequential(test_case.skip_sequential_checks, shards, workers=min(shards, os.cpu_count() or 1))
+            else:
+                self.seq = Sequential(test_case.skip_sequential_checks, timestamp_cache=test_case.timestamp_cache, deferred_skips=test_case.skippable_sequential_checks())
+        self.duplicates = test_case.duplicate_detector = test_case.new_duplicate_detector()
+        self.msg_count = 1
+        self.sequential_failed = False
+        # raw csv lines passed to validate_batch start with the header
+        self.header_pending = test_case.has_header
+
+    def add(self, current_msg, field_validations, serial_id=None):
+        test_case = self.test_case
+        # if json data log, serial_id is set to data log's serial_id
+        # otherwise, serial_id is set to the log number due to potential lack of actual serial_id
+        # (a run fed by a router is given the position of the record in the routed stream)
+        if serial_id is None:
+            serial_id = self.msg_count
+        self.msg_count += 1
+        # if self.data_type == "json":
+        # serial_id = str(current_msg['metadata']['serialId'])
+
+        results = [RecordValidationResult(serial_id, field_validations, current_msg if test_case.retain_records else None)]
+
+        if self.seq is not None:
+            self._add_sequential(current_msg, results)
+        if self.duplicates is not None:
+            self._add_duplicate_check(current_msg, results)
+        return results
+
+    def add_unvalidated(self, current_msg):
+        """
+        Hands out the serial id of a record whose fields are not validated, e.g. one left out of a sample, and only
+        checks it sequentially. Returns the results of the sequential checks it completed.
+        """
+        self.msg_count += 1
+        results = []
+        if current_msg is None:
+            return results  # not decoded, no check reads it
+        if self.seq is not None:
+            self._add_sequential(current_msg, results)
+        if self.duplicates is not None:
+            self._add_duplicate_check(current_msg, results)
+        return results
+
+    def _add_sequential(self, current_msg, results):
+        test_case = self.test_case
+        if test_case.profiler is None:
+            sequential_validations = self.seq.add_record(Sequential.slim_record(current_msg))
+        else:
+            start = test_case.profiler.timer()
+            sequential_validations = self.seq.add_record(Sequential.slim_record(current_msg))
+            test_case.profiler.add_phase(PHASE_SEQUENTIAL, test_case.profiler.timer() - start)
+        if sequential_validations:
+            self.sequential_failed = True
+            results.append(test_case._sequential_result(sequential_validations))
+
+    def _add_duplicate_check(self, current_msg, results):
+        duplicate_validations = self.duplicates.add_record(current_msg)
+        if duplicate_validations:
+            results.append(self.test_case._sequential_result(duplicate_validations))
+
+    def get_state(self):
+        """
+        Returns the picklable state a run resumed from a checkpoint continues from: the serial id counter, the
+        sequential check state and the summary and sequential check skips of the test case. Pickled together, the
+        sequential checks keep sharing the skips and timestamp memo of the test case.
+        """
+        test_case = self.test_case
+        return {'msg_count': self.msg_count, 'sequential_failed': self.sequential_failed, 'header_pending': self.header_pending,
+            'seq': self.seq, 'duplicates': self.duplicates, 'summary': test_case.summary, 'skip_sequential_checks': test_case.skip_sequential_checks,
+            'timestamp_cache': test_case.timestamp_cache}
+
+    def set_state(self, state):
+        test_case = self.test_case
+        self.msg_count = state['msg_count']
+        self.sequential_failed = state['sequential_failed']
+        self.header_pending = state['header_pending']
+        self.seq = state['seq']
+        self.duplicates = test_case.duplicate_detector = state['duplicates']
+        test_case.summary = state['summary']
+        test_case.skip_sequential_checks = state['skip_sequential_checks']
+        test_case.timestamp_cache = state['timestamp_cache']
+
+    def close(self):
+        test_case = self.test_case
+        results = []
+        if self.seq is not None and self.msg_count > 1:
+            start = test_case.profiler.timer() if test_case.profiler is not None else None
+            sequential_validations = self.seq.close()
+            if test_case.profiler is not None:
+                test_case.profiler.add_phase(PHASE_SEQUENTIAL, test_case.profiler.timer() - start)
+            if sequential_validations:
+                results.append(test_case._sequential_result(sequential_validations))
+            elif not self.sequential_failed and not test_case.failures_only:
+                results.append(RecordValidationResult(None, [FieldValidationResult(True, "", SEQUENTIAL_CHECK)], None))
+
+        if test_case.profiler is not None:
+            test_case.profiler.publish()
+        return results
+
+
 class TestCase:
-    def __init__(self, filepath=pkg_resources.resource_filename('odevalidator', 'configs/config.ini')):
-        self.config = ConfigParser(interpolation=ExtendedInterpolation())
+    def __init__(self, filepath=DEFAULT_CONFIG_FILE, failures_only=False, retain_records=True, profiler=None, json_backend=JSON_BACKEND_AUTO, cache_dir=None, sequential_shards=None, duplicate_detection=None):
+        self.filepath = filepath
+        # failures-only mode keeps only invalid field results and counts valid ones in self.summary
+        self.failures_only = failures_only
+        self.retain_records = retain_records
+        self.json_backend = json_backend
+        self.sequential_shards = sequential_shards
+        # None follows the DuplicateDetection setting of the config
+        self.duplicate_detection = duplicate_detection
+        # detector of the last run, with its counts
+        self.duplicate_detector = None
+        self.summary = ValidationSummary()
+        self._config = None
         self.record_parser = {"json": json.loads, "csv": self.parse_csv}
+        # instrumentation is opt-in, without a profiler the plain validation methods run untouched
+        self.profiler = profiler
+        if profiler is not None:
+            self._validate = self._validate_profiled
+            self._validate_lines = self._validate_lines_profiled
 
         if not Path(filepath).is_file():
             raise ValidatorException("Custom configuration file '%s' could not be found" % filepath)
-        self.config.read(filepath)
 
+        self.skip_sequential_checks = set()
+        self.timestamp_cache = TimestampCache()
+        # field values read once per record and shared by every field
+        self.record_lookups = RecordLookups()
+        # fields bound to the list indexes of the record being validated
+        self.field_list_temp = []
+        # run of the records passed to validate_batch, until close_batches()
+        self.batch_run = None
+        cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        cache = CompiledConfigCache(cache_dir) if cache_dir else None
+        compiled = cache.load(filepath) if cache is not None else None
+        if compiled is None:
+            self._compile_config()
+            if cache is not None:
+                cache.save(filepath, self._compiled_config())
+        else:
+            self._load_compiled_config(compiled)
+
+        self.record_lookups.trie = PathTrie(self.trie_paths())
+        # records of the same shape bind the same list fields, their paths are resolved by a trie per shape
+        self.bound_tries = {}
+
+        # the lazy backend only decodes what the compiled fields read
+        self.record_parser["json"] = get_json_parser(json_backend, self.referenced_paths() if json_backend == JSON_BACKEND_LAZY else ())
+
+    @property
+    def config(self):
+        # parsed on first use only, a test case loaded from the compiled config cache never reads the INI file
+        if self._config is None:
+            from configparser import ConfigParser, ExtendedInterpolation
+            self._config = ConfigParser(interpolation=ExtendedInterpolation())
+            self._config.read(self.filepath)
+        return self._config
+
+    def _compile_config(self):
         if self.config.has_section("_settings"):
             self.data_type = self.config.get("_settings", "DataType")
             self.SequentialValidation = self.config.getboolean("_settings", "Sequential")
@@ -286,169 +723,412 @@ class TestCase:
                 self.has_header = self.config.getboolean("_settings", "HasHeader")
             else:
                 self.has_header = False
+            self.duplicate_settings = self._duplicate_settings(self.config["_settings"])
         else:
             raise ValidatorException("Invalid config ini file, '_settings' field not defined.")
 
         self.field_list = []
-        self.skip_sequential_checks = set()
+        self.list_templates = []
         for key in self.config.sections():  # Iterate through config file sections
-            if key != "_settings" and key.count('.list') == 0:
+            if key == "_settings":
+                continue
+            if key.count('.list') == 0:
                 self.field_list.append(Field(key, self.config[key], self))  # Adds field name and parameters to field_list
+            else:
+                self.list_templates.append(ListFieldTemplate(key, self.config[key], self))  # Compiled once, expanded per record
+
+    def skippable_sequential_checks(self):
+        """
+        Returns the paths of the fields with a skipSequentialValidation condition, whose sequential checks records
+        may turn off.
+        """
+        return frozenset(field.path for field in self.field_list if getattr(field, 'condition_index', None) is not None and any(field.condition_index.skip_sequential))
+
+    def _duplicate_settings(self, settings):
+        # DuplicateDetector arguments of the config, or None when it doesn't enable duplicate detection
+        if not settings.getboolean("DuplicateDetection", False):
+            return None
+        duplicate_settings = {"payload_hash": settings.getboolean("DuplicatePayloadHash", False)}
+        if "DuplicateCapacity" in settings:
+            duplicate_settings["capacity"] = settings.getint("DuplicateCapacity")
+        if "DuplicateWindow" in settings:
+            duplicate_settings["window"] = settings.getint("DuplicateWindow")
+        return duplicate_settings
+
+    def duplicate_detector_settings(self):
+        """
+        Returns the DuplicateDetector arguments of a run: as set up by the duplicate_detection argument (True, False
+        or a dict of DuplicateDetector arguments), or else by the config's DuplicateDetection settings. None when
+        duplicate detection is off, which it always is for csv data.
+        """
+        if self.data_type != "json":
+            return None
+        duplicate_settings = self.duplicate_detection
+        if duplicate_settings is None:
+            duplicate_settings = self.duplicate_settings
+        elif duplicate_settings is True:
+            duplicate_settings = self.duplicate_settings or {}
+        if duplicate_settings is None or duplicate_settings is False:
+            return None
+        return duplicate_settings
+
+    def new_duplicate_detector(self):
+        """
+        Returns the DuplicateDetector of a new run, see duplicate_detector_settings(), or None.
+        """
+        duplicate_settings = self.duplicate_detector_settings()
+        if duplicate_settings is None:
+            return None
+        from .duplicates import DuplicateDetector  # only imported when duplicate detection is on
+        return DuplicateDetector(**duplicate_settings)
+
+    def _compiled_config(self):
+        return {
+            "data_type": self.data_type,
+            "SequentialValidation": self.SequentialValidation,
+            "has_header": self.has_header,
+            "duplicate_settings": self.duplicate_settings,
+            "field_list": self.field_list,
+            "list_templates": self.list_templates,
+        }
+
+    def _load_compiled_config(self, compiled):
+        self.data_type = compiled["data_type"]
+        self.SequentialValidation = compiled["SequentialValidation"]
+        self.has_header = compiled["has_header"]
+        self.duplicate_settings = compiled["duplicate_settings"]
+        self.field_list = compiled["field_list"]
+        self.list_templates = compiled["list_templates"]
+        # compiled fields are stored without their test case
+        for field in self.field_list:
+            field.test_case = self
+        for template in self.list_templates:
+            template.test_case = self
+
+    def trie_paths(self, fields=None):
+        """
+        Returns the paths resolved by the PathTrie walk of a record: the fields (by default the compiled field list)
+        and the fields their conditions and choices refer to.
+        """
+        paths = []
+        for field in self.field_list if fields is None else fields:
+            paths.append(field.path)
+            paths.extend(accessor.path for accessor in getattr(field, 'choice_accessors', ()))
+            for if_accessor, expected_field_values, then_part, sw_accessor, match_values in getattr(field, 'conditions', None) or ():
+                paths.append(if_accessor.path)
+                if sw_accessor is not None:
+                    paths.append(sw_accessor.path)
+        return paths
+
+    def referenced_paths(self):
+        """
+        Returns every path a record is read at: field and '.list' section paths, the fields their conditions and
+        choices refer to and, with sequential validation, the metadata used by the sequential checks.
+        """
+        fields = self.field_list + [Field(template.path_init, template.field_config) for template in self.list_templates]
+        paths = []
+        for field in fields:
+            paths.append(field.path)
+            paths.extend(accessor.path for accessor in getattr(field, 'choice_accessors', ()))
+            for if_accessor, expected_field_values, then_part, sw_accessor, match_values in getattr(field, 'conditions', None) or ():
+                paths.append(if_accessor.path)
+                if sw_accessor is not None:
+                    paths.append(sw_accessor.path)
+        if self.SequentialValidation:
+            paths.extend('metadata.' + key for key in SEQUENTIAL_METADATA_FIELDS)
+        return paths
 
     def _validate(self, data):
         validations = []
-        self.field_list_temp = []
-        self.populate_field_list(data)
-        field_list = self.field_list + self.field_list_temp
-        for field in field_list:
-            result = field.validate(data)
-            validations.append(result)
+        values = self.record_lookups.begin(data)
+        # the list of bound fields is scratch space reused by every record
+        bound_fields = self.field_list_temp
+        bound_fields.clear()
+        for template in self.list_templates:
+            template.populate_list_validations(data, bound_fields)
+        if bound_fields:
+            self._resolve_bound_fields(data, values)
+        field_list = chain(self.field_list, bound_fields)
+        if self.failures_only:
+            summary = self.summary
+            summary.record_count += 1
+            for field in field_list:
+                result = field.check(data, values)
+                if result is None:
+                    summary.add_pass(field.path)
+                else:
+                    summary.add_failure(field.path)
+                    validations.append(result)
+        else:
+            for field in field_list:
+                result = field.validate(data, values)
+                validations.append(result)
+        self.record_lookups.clear()
+        return validations
+
+    def _validate_profiled(self, data):
+        profiler = self.profiler
+        timer = profiler.timer
+        start = timer()
+        values = self.record_lookups.begin(data)
+        self.field_list_temp.clear()
+        for template in self.list_templates:
+            template_start = timer()
+            field_count = len(self.field_list_temp)
+            template.populate_list_validations(data, self.field_list_temp)
+            profiler.add_list_expansion(template.path_init, len(self.field_list_temp) - field_count, timer() - template_start)
+
+        if self.field_list_temp:
+            self._resolve_bound_fields(data, values)
+        validations = []
+        if self.failures_only:
+            self.summary.record_count += 1
+        for field in chain(self.field_list, self.field_list_temp):
+            field_start = timer()
+            if self.failures_only:
+                result = field.check(data, values)
+                if result is None:
+                    self.summary.add_pass(field.path)
+                else:
+                    self.summary.add_failure(field.path)
+                    validations.append(result)
+            else:
+                validations.append(field.validate(data, values))
+            profiler.add_field(field.section, timer() - field_start)
+        self.record_lookups.clear()
+
+        profiler.add_phase(PHASE_VALIDATE, timer() - start)
+        profiler.add_record()
         return validations
 
-    def populate_field_list(self, data):  # iniates recurcive function
+    def _resolve_bound_fields(self, data, values):
+        shape = tuple([field.path for field in self.field_list_temp])
+        trie = self.bound_tries.get(shape)
+        if trie is None:
+            if len(self.bound_tries) >= MAX_BOUND_TRIES:
+                self.bound_tries.clear()
+            trie = self.bound_tries[shape] = PathTrie(self.trie_paths(self.field_list_temp))
+        trie.resolve(data, values)
+
+    def populate_field_list(self, data):
         field_list = []
-        for path in self.config.sections():  # Iterate through config file sections
-            if path.count('.list') != 0:
-                keys = path.split(".")
-                indexes = []
-                self.populate_list_validations(keys, data, '', path, indexes)
+        for template in self.list_templates:
+            template.populate_list_validations(data, field_list)
         return field_list
 
-    def populate_list_validations(self, keys, data, path, path_init, indexes):  # Recurcive function to loop through data and populate
-        # list indexes. This works on any number of nested lists.
-        if not keys:
-            equals_value, new_config = self.set_config_equals_value(path_init, path, indexes)
-            self.field_list_temp.append(Field(path, new_config, self))  # Adds field name and parameters to field_list
-            if equals_value:
-                self.config[path_init]['EqualsValue'] = str(equals_value)
-            return
+    def validate_queue(self, msg_queue, workers=None):
+        return list(self.validate_stream(self._drain_queue(msg_queue), workers=workers))
 
-        if keys[0] == 'list':  # List found
-            length = len(data)
-            if data == '':
-                path = path + '{0}'
-                keys = self.set_keys(keys)
-                indexes.append('{0}')
-                self.populate_list_validations(keys, data, path, path_init, copy.deepcopy(indexes))
-            if type(data) != list:
-                keys = self.set_keys(keys)
-                indexes.append('')
-                self.populate_list_validations(keys, data, path, path_init, copy.deepcopy(indexes))
-            else:
-                for i in (range(length)):
-                    path_temp = path + '{' + str(i) + '}'
-                    keys_temp = keys[1:]
-                    data_temp = data[i]
-                    indexes.append('{' + str(i) + '}')
-                    self.populate_list_validations(keys_temp, data_temp, path_temp, path_init, copy.deepcopy(indexes))  # Recurcive functionality
-                    indexes = indexes[:-1]
-        elif keys[0] in data:
+    def _drain_queue(self, msg_queue):
+        while True:
             try:
-                data = data.get(keys[0])
-            except Exception as e:
-                    print('Non-dictionary encountered with value of: ' + str(data))
-                    raise e
-            path = self.set_path(path, keys[0])
-            keys = self.set_keys(keys)
-            self.populate_list_validations(keys, data, path, path_init, copy.deepcopy(indexes))
-        elif keys[0].count('{') == 1:  # Index of list hardcoded
-            index_begin = keys[0].index('{')
-            index_end = keys[0].index('}')
-            index = int(keys[0][(index_begin + 1):index_end])
-            if keys[0][:index_begin] not in data:
-                path = self.set_path(path, keys[0])
-                keys = self.set_keys(keys)
-                self.populate_list_validations(keys, '', path, path_init, copy.deepcopy(indexes))
-            elif type(data[keys[0][:index_begin]]) != list:
-                if data.get(keys[0][:index_begin]):
-                    data = data[keys[0][:index_begin]]
-                else:
-                    data = ''
-                path = self.set_path(path, keys[0][:index_begin])
-                keys = self.set_keys(keys)
-                self.populate_list_validations(keys, data, path, path_init, copy.deepcopy(indexes))
-            else:
-                if data.get(keys[0][:index_begin]):
-                    try:
-                        data = data[keys[0][:index_begin]][index]
-                    except:
-                        data = ''
-                path = self.set_path(path, keys[0])
-                keys = self.set_keys(keys)
-                self.populate_list_validations(keys, data, path, path_init, copy.deepcopy(indexes))
-        else:  # key not found in data
-            path = self.set_path(path, keys[0])
-            keys = self.set_keys(keys)
-            self.populate_list_validations(keys, '', path, path_init, copy.deepcopy(indexes))
+                yield msg_queue.get_nowait()
+            except queue.Empty:
+                return
 
-    def set_path(self, path, key):
-        if not path:
-            path = key
+    def validate_stream(self, lines, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Validates records from any iterable of lines (a list, a generator or an open file) and yields a
+        RecordValidationResult per record as soon as it is produced. Blank lines and '#' comments are skipped.
+        Sequential checks run incrementally, their findings are yielded as soon as a bundle closes.
+        With workers > 1, field validation runs on chunks of lines in a process pool and results keep input order.
+        """
+        run = ValidationRun(self)
+        lines = self._iter_records(lines)
+        # if header, skip over it
+        if self.has_header:
+            header = next(lines, None)
+            if header is not None:
+                self.check_headers(header)
+
+        if workers and workers > 1:
+            validated_records = validate_in_pool(self, lines, workers, chunk_size)
         else:
-            path = path + '.' + key
-        return path
+            validated_records = self._validate_lines(lines)
 
-    def set_keys(self, keys):
-        if len(keys) != 1:
-            keys = keys[1:]
+        for current_msg, field_validations in validated_records:
+            yield from run.add(current_msg, field_validations)
+        yield from run.close()
+
+    def validate_file(self, path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, checkpointer=None, checkpoint=None):
+        """
+        Validates a plain or gzip-compressed data file like validate_stream. With a Checkpointer, the input offset
+        and run state are saved every checkpointer.interval records, once the results of the records before the
+        offset have been consumed. Passing the Checkpoint it last saved, see Checkpointer.load(), resumes the run
+        after the checkpoint's offset: serial ids, summary and sequential checks continue where they were.
+        """
+        run = ValidationRun(self)
+        if checkpoint is not None:
+            checkpoint.check(path, self.filepath)
+            run.set_state(checkpoint.run_state)
+        reader = LineReader(path, start=checkpoint.offset if checkpoint is not None else 0)
+        # offset after each line read, in order, popped as its record is added to the run
+        offsets = deque()
+        def tracked_lines():
+            for line in reader:
+                offsets.append(reader.offset)
+                yield line
+        lines = self._iter_records(tracked_lines())
+        if self.has_header and checkpoint is None:
+            header = next(lines, None)
+            if header is not None:
+                offsets.popleft()
+                self.check_headers(header)
+
+        # the pool merges the summary and sequential check skips of its workers per chunk, so a checkpoint is only
+        # consistent at the end of a chunk
+        checkpoint_step = 1
+        if workers and workers > 1:
+            validated_records = validate_in_pool(self, lines, workers, chunk_size)
+            checkpoint_step = chunk_size
         else:
-            keys = []
-        return keys
+            validated_records = self._validate_lines(lines)
 
-    def set_config_equals_value(self, path_init, path, indexes):
-        config = self.config[path_init]
-        equals_value = config.get('EqualsValue')
-        if equals_value is not None:
-            keys = path_init.split('.')
-            embedded_path = keys[0]
-            keys = keys[1:]
-            for key in keys:
-                if embedded_path + '.' + key in equals_value:
-                    embedded_path += '.' + key
-                else:
-                    break
-            new_path = embedded_path
-            i = 0
-            while '.list' in new_path:
-                i = new_path.find('.list')
-                new_path = new_path[:i] + indexes.pop(0)  + new_path[(i+5):]
-            new_equals_value = equals_value.replace(embedded_path, new_path)
-            config['EqualsValue'] = new_equals_value
-        return equals_value, config
-
-    def validate_queue(self, msg_queue):
-        results = []
-        msg_list = []
-        msg_count = 1
-        # if header, skip over it
-        if self.has_header:
-            header = msg_queue.get()
-            self.check_headers(header)
+        record_count = 0
+        unsaved_count = 0
+        for current_msg, field_validations in validated_records:
+            yield from run.add(current_msg, field_validations)
+            offset = offsets.popleft()
+            record_count += 1
+            unsaved_count += 1
+            if checkpointer is not None and unsaved_count >= checkpointer.interval and record_count % checkpoint_step == 0:
+                checkpointer.save(path, self.filepath, offset, run.get_state())
+                unsaved_count = 0
+        yield from run.close()
+        if checkpointer is not None:
+            checkpointer.remove()
 
-        while not msg_queue.empty():
-            line = msg_queue.get().strip()
-            current_msg = self.record_parser[self.data_type](line)
-            msg_list.append(current_msg)
+    def validate_sample(self, lines, sampler):
+        """
+        Validates a sample of the records from an iterable of lines, chosen by a HashSampler or ReservoirSampler, and
+        yields their RecordValidationResults. Sequential checks still run on the metadata of every record and serial
+        ids are the positions of the records in the stream. Once the generator is exhausted, sampler.report holds the
+        SamplingReport with the failure rate estimates per field.
+        """
+        from .sampling import SamplingReport, count_validations  # only imported by sampled runs
+        run = ValidationRun(self)
+        lines = self._iter_records(lines)
+        if self.has_header:
+            header = next(lines, None)
+            if header is not None:
+                self.check_headers(header)
 
-            # if json data log, serial_id is set to data log's serial_id
-            # otherwise, serial_id is set to the log number due to potential lack of actual serial_id
-            serial_id = msg_count
-            msg_count += 1
-            # if self.data_type == "json":
-            # serial_id = str(current_msg['metadata']['serialId'])
+        parse = self.record_parser[self.data_type]
+        # records left out of the sample are only decoded as far as the sequential and duplicate checks read
+        sequential_parse = None
+        if run.seq is not None or run.duplicates is not None:
+            if orjson is not None:
+                sequential_parse = orjson_loads
+            else:
+                paths = ['metadata.' + field for field in SEQUENTIAL_METADATA_FIELDS]
+                if run.duplicates is not None and run.duplicates.payload_hash:
+                    # keys of unsampled records need the payload digest as well
+                    paths.append('payload')
+                sequential_parse = get_json_parser(JSON_BACKEND_LAZY, paths)
+        # a failures-only run counts the fields of the validated records in its summary already
+        summary = self.summary if self.failures_only else ValidationSummary()
+        sampler.begin()
+        for line in lines:
+            if sampler.offer(line, run.msg_count):
+                current_msg = parse(line)
+                field_validations = self._validate(current_msg)
+                if not self.failures_only:
+                    count_validations(summary, field_validations)
+                yield from run.add(current_msg, field_validations)
+            else:
+                yield from run.add_unvalidated(sequential_parse(line) if sequential_parse is not None else None)
 
+        for serial_id, line in sampler.drain():
+            current_msg = parse(line)
             field_validations = self._validate(current_msg)
-            results.append(RecordValidationResult(serial_id, field_validations, current_msg))
+            if not self.failures_only:
+                count_validations(summary, field_validations)
+            yield RecordValidationResult(serial_id, field_validations, current_msg if self.retain_records else None)
+        yield from run.close()
+        sampler.report = SamplingReport(run.msg_count - 1, summary.record_count, summary, sampler.confidence)
 
-        if self.SequentialValidation:
-            seq = Sequential(self.skip_sequential_checks)
-            sorted_list = sorted(msg_list, key=lambda msg: msg['metadata']['serialId']['serialNumber'])
+    def validate_batch(self, records):
+        """
+        Validates a batch of records and returns their RecordValidationResults. Records are already parsed dicts or
+        raw lines (str or bytes); blank lines and '#' comments are skipped. Successive batches form one run: serial
+        ids keep counting, the summary accumulates and sequential checks span batch boundaries, their findings are
+        returned with the batch that closes a bundle. close_batches() ends the run.
+        """
+        run = self.batch_run
+        if run is None:
+            run = self.batch_run = ValidationRun(self)
+        results = []
+        for current_msg in self._parse_batch(records, run):
+            results.extend(run.add(current_msg, self._validate(current_msg)))
+        return results
 
-            sequential_validation = seq.perform_sequential_validations(sorted_list)
+    def close_batches(self):
+        """
+        Ends the run of validate_batch and returns the results of the last sequential checks. The next batch starts
+        a new run.
+        """
+        run = self.batch_run
+        self.batch_run = None
+        return run.close() if run is not None else []
 
-            results.extend(sequential_validation)
+    def _parse_batch(self, records, run):
+        parse = self.record_parser[self.data_type]
+        profiler = self.profiler
+        for record in records:
+            if isinstance(record, (str, bytes)):
+                if isinstance(record, bytes):
+                    record = record.decode('utf-8')
+                record = record.strip()
+                if not record or record.startswith('#'):
+                    continue
+                if run.header_pending:
+                    run.header_pending = False
+                    self.check_headers(record)
+                    continue
+                if profiler is None:
+                    record = parse(record)
+                else:
+                    start = profiler.timer()
+                    record = parse(record)
+                    profiler.add_phase(PHASE_PARSE, profiler.timer() - start)
+            # a run of parsed records has no header line
+            run.header_pending = False
+            yield record
 
-        return results
+    def validate_columnar(self, lines, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Validates a flat CSV file column by column in chunks of rows, yielding the same per-row results as
+        validate_stream. Only available for csv configs without conditional, list or sequential checks.
+        """
+        return ColumnarCSVValidator(self, chunk_rows).validate(lines)
+
+    def _sequential_result(self, sequential_validations):
+        if self.failures_only:
+            for validation in sequential_validations:
+                self.summary.add_failure(validation.field_path or SEQUENTIAL_CHECK)
+        return RecordValidationResult(None, sequential_validations, None)
+
+    def _validate_lines(self, lines):
+        for line in lines:
+            current_msg = self.record_parser[self.data_type](line)
+            yield current_msg, self._validate(current_msg)
+
+    def _validate_lines_profiled(self, lines):
+        profiler = self.profiler
+        parse = self.record_parser[self.data_type]
+        for line in lines:
+            start = profiler.timer()
+            current_msg = parse(line)
+            profiler.add_phase(PHASE_PARSE, profiler.timer() - start)
+            yield current_msg, self._validate(current_msg)
+
+    def _iter_records(self, lines):
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
 
     def parse_csv(self, line):
         csv_dict = {}
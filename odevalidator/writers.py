@@ -0,0 +1,184 @@
+import json
+import sys
+from .decoding import orjson
+from .result import ERROR_MESSAGES, ValidatorException
+from .sequential import SEQUENTIAL_CHECK
+
+OUTPUT_TEXT = 'text'
+OUTPUT_NDJSON = 'ndjson'
+OUTPUT_FAILURES = 'failures'
+OUTPUT_SUMMARY = 'summary'
+OUTPUT_FORMATS = (OUTPUT_TEXT, OUTPUT_NDJSON, OUTPUT_FAILURES, OUTPUT_SUMMARY)
+
+# distinct errors (code and arguments) counted per field by the summary writer, further ones are counted together
+MAX_MESSAGES_PER_FIELD = 100
+OTHER_MESSAGES = '(other messages)'
+# code of the failures counted without one
+UNCODED = '(uncoded)'
+
+def _dumps(obj):
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except TypeError:
+            pass  # e.g. integers over 64 bits, json handles them
+    return json.dumps(obj, separators=(',', ':'))
+
+class ResultWriter:
+    """
+    Base of the streaming result sinks. Results are written one at a time as validation produces them; close() writes
+    whatever the format reports at the end and flushes the stream. `success` tells whether every field was valid.
+    """
+    def __init__(self, stream=None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.success = True
+
+    def write(self, result):
+        raise NotImplementedError
+
+    def write_all(self, results):
+        for result in results:
+            self.write(result)
+        return self
+
+    def close(self):
+        self.stream.flush()
+
+    def get_state(self):
+        """
+        Returns the picklable counts and flags of the writer, e.g. to save them with a checkpoint, see set_state().
+        """
+        return {name: value for name, value in vars(self).items() if name not in ('stream', 'test_case')}
+
+    def set_state(self, state):
+        vars(self).update(state)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class TextWriter(ResultWriter):
+    """
+    Human readable output of the command line: a line per invalid field and a final success flag.
+    """
+    def write(self, result):
+        for field in result.field_validations:
+            if not field.valid:
+                self.stream.write("Invalid field '" + str(field.field_path) + "' due to " + field.details + " at log id: " + str(result.serial_id) + "\n")
+                self.success = False
+
+    def close(self):
+        print("\nSuccess: ", self.success, "\n", file=self.stream)
+        super().close()
+
+class NDJSONWriter(ResultWriter):
+    """
+    One json object per RecordValidationResult and line, in the to_json() layout. With include_records=False the
+    validated record is left out, which keeps the output small and avoids serializing every payload again.
+    """
+    def __init__(self, stream=None, include_records=True):
+        super().__init__(stream)
+        self.include_records = include_records
+
+    def write(self, result):
+        validations = []
+        for field in result.field_validations:
+            if not field.valid:
+                self.success = False
+            validations.append(field.to_json())
+        self._write_line(result, validations)
+
+    def _write_line(self, result, validations):
+        line = {"SerialId": result.serial_id, "Validations": validations}
+        if self.include_records:
+            line["Record"] = result.record
+        self.stream.write(_dumps(line) + "\n")
+
+class FailuresWriter(NDJSONWriter):
+    """
+    NDJSON output of the invalid fields only, records without any invalid field are not written.
+    """
+    def write(self, result):
+        validations = [field.to_json() for field in result.field_validations if not field.valid]
+        if validations:
+            self.success = False
+            self._write_line(result, validations)
+
+class SummaryWriter(ResultWriter):
+    """
+    Aggregates results into counts per field path and, for invalid fields, per error code and per error message, and
+    writes them as one json document on close(). Errors are counted by code and arguments, messages are only rendered
+    by to_json(). When the results come from a failures-only TestCase, pass it as test_case so that the
+    valid fields it counted instead of reporting are included.
+    """
+    def __init__(self, stream=None, test_case=None):
+        super().__init__(stream)
+        self.test_case = test_case
+        self.record_count = 0
+        # field path -> [passed, failed, {error: count}, {code: count}], an error is a (code, args) tuple or a message
+        self.field_counts = {}
+
+    def write(self, result):
+        if result.serial_id is not None:
+            self.record_count += 1
+        for field in result.field_validations:
+            if field.valid and field.field_path == SEQUENTIAL_CHECK:
+                continue  # the 'all sequential checks passed' marker, not produced in failures-only mode
+            # sequential check findings carry no field path
+            field_path = field.field_path if field.field_path is not None else SEQUENTIAL_CHECK
+            counts = self.field_counts.get(field_path)
+            if counts is None:
+                counts = self.field_counts[field_path] = [0, 0, {}, {}]
+            if field.valid:
+                counts[0] += 1
+                continue
+            self.success = False
+            counts[1] += 1
+            errors = counts[2]
+            error = field.details if field.code is None else (field.code, field.args)
+            try:
+                hash(error)
+            except TypeError:
+                error = field.details  # unhashable arguments, e.g. a matchAgainst list, count the message
+            if error not in errors and len(errors) >= MAX_MESSAGES_PER_FIELD:
+                error = OTHER_MESSAGES
+            errors[error] = errors.get(error, 0) + 1
+            codes = counts[3]
+            codes[field.code] = codes.get(field.code, 0) + 1
+
+    def to_json(self):
+        record_count = self.record_count
+        passed_counts = {}
+        if self.test_case is not None and self.test_case.failures_only:
+            record_count = self.test_case.summary.record_count
+            passed_counts = {field_path: passed for field_path, (passed, failed) in self.test_case.summary.field_counts.items()}
+        fields = {}
+        for field_path in list(self.field_counts) + [field_path for field_path in passed_counts if field_path not in self.field_counts]:
+            passed, failed, errors, codes = self.field_counts.get(field_path, (0, 0, {}, {}))
+            messages = {}
+            for error, count in errors.items():
+                message = ERROR_MESSAGES[error[0]] % error[1] if isinstance(error, tuple) else error
+                messages[message] = messages.get(message, 0) + count
+            fields[field_path] = {"Passed": passed + passed_counts.get(field_path, 0), "Failed": failed, "Errors": messages,
+                "Codes": {code if code is not None else UNCODED: count for code, count in codes.items()}}
+        return {"Success": self.success, "Records": record_count, "Fields": fields}
+
+    def close(self):
+        self.stream.write(json.dumps(self.to_json(), indent=2) + "\n")
+        super().close()
+
+def get_writer(output_format, stream=None, test_case=None):
+    """
+    Returns the result writer of one of OUTPUT_FORMATS, writing to stream (stdout by default).
+    """
+    if output_format == OUTPUT_TEXT:
+        return TextWriter(stream)
+    if output_format == OUTPUT_NDJSON:
+        return NDJSONWriter(stream, include_records=test_case is None or test_case.retain_records)
+    if output_format == OUTPUT_FAILURES:
+        return FailuresWriter(stream, include_records=test_case is None or test_case.retain_records)
+    if output_format == OUTPUT_SUMMARY:
+        return SummaryWriter(stream, test_case)
+    raise ValidatorException("Unknown output format '%s', expected one of %s" % (output_format, ', '.join(OUTPUT_FORMATS)))
@@ -4,8 +4,9 @@ setup(
     name="odevalidator",
     version="0.0.5",
     description="ODE Data Validation Library",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     package_data={'odevalidator': ['configs/config.ini']},
     include_package_data=True,
+    extras_require={'fast': ['orjson']},
     test_suite="tests",
 )
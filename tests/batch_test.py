@@ -0,0 +1,51 @@
+import json
+import unittest
+from odevalidator import TestCase
+
+class ValidateBatchTest(unittest.TestCase):
+
+    def _lines(self, data_file):
+        with open(data_file) as f:
+            return [line for line in f if line.strip() and not line.startswith('#')]
+
+    def _stream_results(self, config_file, lines):
+        return [str(result) for result in TestCase(config_file).validate_stream(lines)]
+
+    def test_batches_match_validate_stream(self):
+        for data_file in ['tests/testfiles/good.json', 'tests/testfiles/bad.json']:
+            lines = self._lines(data_file)
+            expected = self._stream_results('odevalidator/configs/config.ini', lines)
+            # parsed dicts, str and bytes mixed, split at arbitrary batch boundaries
+            records = [json.loads(line) if i % 3 == 0 else line.encode('utf-8') if i % 3 == 1 else line for i, line in enumerate(lines)]
+            test_case = TestCase('odevalidator/configs/config.ini')
+            results = []
+            for start, end in [(0, 1), (1, 4), (4, 4), (4, 11), (11, len(records))]:
+                results.extend(test_case.validate_batch(iter(records[start:end])))
+            results.extend(test_case.close_batches())
+            self.assertEqual(expected, [str(result) for result in results], data_file)
+
+    def test_close_batches_starts_a_new_run(self):
+        lines = self._lines('tests/testfiles/good.json')
+        test_case = TestCase('odevalidator/configs/config.ini', failures_only=True)
+        test_case.validate_batch(lines[:3])
+        test_case.validate_batch(lines[3:])
+        test_case.close_batches()
+        self.assertEqual(len(lines), test_case.summary.record_count)
+        self.assertEqual([], test_case.close_batches())
+        test_case.validate_batch(lines[:2])
+        self.assertEqual(2, test_case.summary.record_count)
+
+    def test_csv_batches_skip_the_header_once(self):
+        lines = self._lines('tests/testfiles/good_vsl.csv')
+        expected = self._stream_results('odevalidator/configs/csvconfig.ini', lines)
+        test_case = TestCase('odevalidator/configs/csvconfig.ini')
+        results = test_case.validate_batch(lines[:2]) + test_case.validate_batch(lines[2:]) + test_case.close_batches()
+        self.assertEqual(expected, [str(result) for result in results])
+
+    def test_scratch_structures_are_reused(self):
+        test_case = TestCase('odevalidator/configs/config_bsm.ini')
+        bound_fields = test_case.field_list_temp
+        values = test_case.record_lookups.values
+        test_case.validate_batch(self._lines('tests/testfiles/good_bsmTx.json'))
+        self.assertIs(bound_fields, test_case.field_list_temp)
+        self.assertIs(values, test_case.record_lookups.values)
@@ -0,0 +1,27 @@
+import json
+import unittest
+from benchmarks.corpus import generate_corpus
+from benchmarks.suite import compare, run_benchmark
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_json_corpus_is_renumbered_into_bundles(self):
+        corpus = generate_corpus('good.json', 25, bundle_size=10)
+        self.assertEqual(25, len(corpus))
+        serial_ids = [json.loads(line)['metadata']['serialId'] for line in corpus]
+        self.assertEqual(list(range(25)), [serial_id['serialNumber'] for serial_id in serial_ids])
+        self.assertEqual([index % 10 for index in range(25)], [serial_id['recordId'] for serial_id in serial_ids])
+        self.assertEqual([index // 10 for index in range(25)], [serial_id['bundleId'] for serial_id in serial_ids])
+
+    def test_csv_corpus_keeps_header(self):
+        corpus = generate_corpus('good_vsl.csv', 100)
+        self.assertEqual(101, len(corpus))
+        self.assertTrue(corpus[0].startswith('DEVICEID'))
+
+    def test_generated_corpora_are_valid(self):
+        for config_name in ['config.ini', 'csvconfig.ini']:
+            result = run_benchmark(config_name, size=30, sample=10)
+            self.assertEqual(0, result['failures'])
+            self.assertEqual(10, result['sample'])
+            self.assertTrue(result['fields'])
+            self.assertEqual([(config_name, 1.0, 2.0, 2.0)], compare({"benchmarks": [dict(result, records_per_sec=1.0)]}, {"benchmarks": [dict(result, records_per_sec=2.0)]}))
@@ -0,0 +1,74 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from odevalidator import TestCase, ValidatorException
+from odevalidator.checkpoint import Checkpointer
+
+CONFIG_FILE = 'odevalidator/configs/config.ini'
+
+class CheckpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint_path = os.path.join(self.directory, 'run.checkpoint')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _interrupted_run(self, data_file, stop_after, workers=None, failures_only=False):
+        # consumes the results of a checkpointed run until it is killed after stop_after results
+        consumed = []
+        checkpointer = Checkpointer(self.checkpoint_path, interval=10, extra_state=lambda: len(consumed))
+        results = TestCase(CONFIG_FILE, failures_only=failures_only).validate_file(data_file, workers=workers, chunk_size=5, checkpointer=checkpointer)
+        for result in results:
+            consumed.append(str(result))
+            if len(consumed) == stop_after:
+                break
+        results.close()
+        self.assertTrue(checkpointer.saved_count > 0)
+        return consumed
+
+    def test_resumed_run_matches_an_uninterrupted_run(self):
+        for data_file, workers, failures_only in [('tests/testfiles/good.json', None, False), ('tests/testfiles/bad.json', None, True), ('tests/testfiles/bad.json', 2, False)]:
+            expected_case = TestCase(CONFIG_FILE, failures_only=failures_only)
+            with open(data_file) as f:
+                expected = [str(result) for result in expected_case.validate_stream(f)]
+            consumed = self._interrupted_run(data_file, 70, workers, failures_only)
+
+            checkpointer = Checkpointer(self.checkpoint_path, interval=10)
+            checkpoint = checkpointer.load()
+            self.assertEqual(consumed[:checkpoint.extra], expected[:checkpoint.extra])
+            test_case = TestCase(CONFIG_FILE, failures_only=failures_only)
+            resumed = [str(result) for result in test_case.validate_file(data_file, workers=workers, checkpointer=checkpointer, checkpoint=checkpoint)]
+            self.assertEqual(expected, consumed[:checkpoint.extra] + resumed, data_file)
+            self.assertEqual(str(expected_case.summary), str(test_case.summary))
+            # a completed run leaves no checkpoint behind
+            self.assertIsNone(checkpointer.load())
+
+    def test_checkpoint_of_another_file_is_rejected(self):
+        self._interrupted_run('tests/testfiles/good.json', 30)
+        checkpoint = Checkpointer(self.checkpoint_path).load()
+        with self.assertRaises(ValidatorException):
+            list(TestCase(CONFIG_FILE).validate_file('tests/testfiles/bad.json', checkpoint=checkpoint))
+
+    def test_resume_to_another_output_is_rejected(self):
+        output_path = os.path.join(self.directory, 'results.ndjson')
+        with open(output_path, 'w') as f:
+            f.write('kept\n')
+        # the interrupted run wrote its results to stdout
+        consumed = []
+        checkpointer = Checkpointer(self.checkpoint_path, interval=10, extra_state=lambda: {"writer": None, "output_path": None, "output_offset": None})
+        for result in TestCase(CONFIG_FILE).validate_file('tests/testfiles/good.json', checkpointer=checkpointer):
+            consumed.append(result)
+            if len(consumed) == 30:
+                break
+        process = subprocess.run([sys.executable, '-m', 'odevalidator', '--config-file', CONFIG_FILE, '--data-file', 'tests/testfiles/good.json',
+            '--checkpoint', self.checkpoint_path, '--resume', '--output', output_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+        self.assertEqual(2, process.returncode)
+        self.assertIn("resume it with the same --output", process.stderr)
+        with open(output_path) as f:
+            self.assertEqual('kept\n', f.read())
+        self.assertIsNotNone(Checkpointer(self.checkpoint_path).load())
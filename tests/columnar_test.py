@@ -0,0 +1,28 @@
+import unittest
+from odevalidator import TestCase, ValidatorException
+from tests import assert_results
+
+class ColumnarValidatorTest(unittest.TestCase):
+
+    def test_columnar_results_match_row_results(self):
+        for data_file, config_file in [('bad_vsl.csv', 'csvconfig.ini'), ('good_vsl_timestamp.csv', 'csv_timestamp_config.ini'), ('bad_regex.csv', 'regex_config.ini')]:
+            with open('tests/testfiles/' + data_file) as f:
+                lines = f.readlines()
+            row_results = list(TestCase('odevalidator/configs/' + config_file).validate_stream(lines))
+            columnar_results = list(TestCase('odevalidator/configs/' + config_file).validate_columnar(lines, chunk_rows=2))
+            self.assertEqual([str(r) for r in row_results], [str(r) for r in columnar_results])
+
+    def test_columnar_failures_only(self):
+        validator = TestCase('odevalidator/configs/csvconfig.ini', failures_only=True)
+        with open('tests/testfiles/bad_vsl.csv') as f:
+            results = list(validator.validate_columnar(f))
+        assert_results(self, results, 4)
+        self.assertEqual(len(results), validator.summary.record_count)
+        self.assertEqual([2, 2], validator.summary.field_counts['deviceid'])
+
+    def test_columnar_requires_flat_csv_config(self):
+        try:
+            TestCase('odevalidator/configs/config.ini').validate_columnar([])
+            self.fail("Expected ValidatorException")
+        except ValidatorException as e:
+            self.assertEqual("Columnar validation requires a csv configuration, got DataType 'json'", str(e))
@@ -0,0 +1,76 @@
+import unittest
+from odevalidator import TestCase
+from odevalidator.conditions import ConditionIndex, RecordLookups
+from odevalidator.validator import PathAccessor
+
+class CountingAccessor(PathAccessor):
+    def __init__(self, path_str):
+        super().__init__(path_str)
+        self.reads = 0
+
+    def get(self, data):
+        self.reads += 1
+        return super().get(data)
+
+def condition(field_name, field_values=None, then_part=None):
+    return (CountingAccessor(field_name), field_values, then_part, None, None)
+
+def linear_matches(conditions, data, data_field_value):
+    # the scan the index replaces: every condition in config order
+    positions = []
+    for position, (if_accessor, expected_field_values, then_part, sw_accessor, match_values) in enumerate(conditions):
+        referenced_field_value = if_accessor.get(data)
+        if expected_field_values is None:
+            if not referenced_field_value and not data_field_value:
+                positions.append(position)
+        elif referenced_field_value in expected_field_values:
+            positions.append(position)
+    return positions
+
+class ConditionIndexTest(unittest.TestCase):
+
+    def test_matches_equal_a_scan_of_every_condition(self):
+        conditions = [
+            condition('a', ['x', 'y'], {'matchAgainst': ['1']}),
+            condition('b', [1, 2]),
+            condition('a', ['y', 'z', 'y'], {'skipSequentialValidation': 'true'}),
+            condition('c'),
+            condition('b', [[1], 2]),
+            condition('a', ['z']),
+        ]
+        index = ConditionIndex(conditions)
+        records = [{}, {'a': 'x'}, {'a': 'y', 'b': 2}, {'a': 'z', 'b': [1]}, {'a': 'xy', 'c': 'c'}, {'a': {'k': 1}, 'b': 1.0}, {'b': True}]
+        for data in records:
+            for data_field_value in [None, '', 'value']:
+                self.assertEqual(linear_matches(conditions, data, data_field_value), list(index.matches(data, data_field_value)), (data, data_field_value))
+        self.assertEqual((False, False, True, False, False, False), index.skip_sequential)
+
+    def test_string_field_values_keep_substring_matching(self):
+        index = ConditionIndex([condition('a', 'xyz')])
+        self.assertEqual([0], list(index.matches({'a': 'xy'}, 'value')))
+        self.assertEqual([], list(index.matches({'a': 'yx'}, 'value')))
+
+    def test_referenced_fields_are_read_once_per_record(self):
+        accessor = CountingAccessor('metadata.recordType')
+        first = ConditionIndex([(accessor, ['bsmTx'], None, None, None), (accessor, ['rxMsg'], None, None, None)])
+        second = ConditionIndex([(accessor, ['bsmTx', 'rxMsg'], None, None, None)])
+        lookups = RecordLookups()
+        data = {'metadata': {'recordType': 'rxMsg'}}
+        lookups.begin(data)
+        self.assertEqual([1], list(first.matches(data, 'value', lookups)))
+        self.assertEqual([0], list(second.matches(data, 'value', lookups)))
+        self.assertEqual(1, accessor.reads)
+        # other data is read directly and leaves the cached values alone
+        self.assertEqual([0], list(first.matches({'metadata': {'recordType': 'bsmTx'}}, 'value', lookups)))
+        self.assertEqual(2, accessor.reads)
+        lookups.clear()
+        self.assertEqual([1], list(first.matches(data, 'value', lookups)))
+        self.assertEqual(3, accessor.reads)
+
+    def test_test_case_results_and_sequential_skips_are_unchanged(self):
+        test_case = TestCase('odevalidator/configs/config.ini')
+        with open('tests/testfiles/good.json') as f:
+            results = list(test_case.validate_stream(f))
+        invalid = [field for result in results for field in result.field_validations if not field.valid]
+        self.assertEqual([], [str(field) for field in invalid if field.field_path in ('metadata.bsmSource', 'metadata.payloadType')])
+        self.assertEqual(None, test_case.record_lookups.data)
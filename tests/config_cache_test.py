@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+import unittest
+from odevalidator import TestCase
+from odevalidator.config_cache import CompiledConfigCache
+
+class CompiledConfigCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.directory, 'config.ini')
+        shutil.copyfile('odevalidator/configs/config.ini', self.config_file)
+        self.cache_dir = os.path.join(self.directory, 'cache')
+        with open('tests/testfiles/good.json') as f:
+            self.lines = f.readlines()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _results(self, test_case):
+        return [str(result) for result in test_case.validate_stream(self.lines)]
+
+    def test_cached_config_is_loaded_without_parsing_the_ini_file(self):
+        compiled = TestCase(self.config_file, cache_dir=self.cache_dir)
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+        cached = TestCase(self.config_file, cache_dir=self.cache_dir)
+        self.assertIsNone(cached._config)
+        self.assertEqual([field.path for field in compiled.field_list], [field.path for field in cached.field_list])
+        self.assertTrue(all(field.test_case is cached for field in cached.field_list))
+        self.assertTrue(all(template.test_case is cached for template in cached.list_templates))
+        self.assertEqual(self._results(TestCase(self.config_file)), self._results(cached))
+
+    def test_latest_time_now_is_refreshed_on_load(self):
+        compiled = TestCase(self.config_file, cache_dir=self.cache_dir)
+        cached = TestCase(self.config_file, cache_dir=self.cache_dir)
+        now_fields = [(before, after) for before, after in zip(compiled.field_list, cached.field_list) if getattr(before, 'latest_time_is_now', False)]
+        self.assertTrue(now_fields)
+        for before, after in now_fields:
+            self.assertGreaterEqual(after.latest_time, before.latest_time)
+
+    def test_editing_the_config_misses_the_cache(self):
+        TestCase(self.config_file, cache_dir=self.cache_dir)
+        with open(self.config_file, 'a') as f:
+            f.write('\n[extraField]\nType = string\n')
+        edited = TestCase(self.config_file, cache_dir=self.cache_dir)
+        self.assertIsNotNone(edited._config)
+        self.assertIn('extraField', [field.path for field in edited.field_list])
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+
+    def test_corrupt_entry_falls_back_to_the_ini_file(self):
+        TestCase(self.config_file, cache_dir=self.cache_dir)
+        with open(self.config_file, 'rb') as f:
+            entry_path = CompiledConfigCache(self.cache_dir).entry_path(self.config_file, f.read())
+        with open(entry_path, 'wb') as f:
+            f.write(b'not a pickle')
+        test_case = TestCase(self.config_file, cache_dir=self.cache_dir)
+        self.assertIsNotNone(test_case._config)
+        self.assertEqual(self._results(TestCase(self.config_file)), self._results(test_case))
+
+    def test_no_cache_without_cache_dir(self):
+        os.environ.pop('ODEVALIDATOR_CACHE_DIR', None)
+        TestCase(self.config_file)
+        self.assertFalse(os.path.exists(self.cache_dir))
@@ -0,0 +1,51 @@
+import json
+import unittest
+from odevalidator import TestCase, ValidatorException
+from odevalidator.decoding import LazyJSONDecoder, build_path_tree, get_json_parser, orjson
+
+class JSONDecodingTest(unittest.TestCase):
+
+    def test_backend_selection(self):
+        self.assertIs(json.loads, get_json_parser('json'))
+        self.assertIs(len, get_json_parser(len))
+        if orjson is None:
+            self.assertIs(json.loads, get_json_parser('auto'))
+        with self.assertRaises(ValidatorException):
+            get_json_parser('simdjson')
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_falls_back_to_json(self):
+        loads = get_json_parser('orjson')
+        self.assertEqual({"a": [1, "b"]}, loads('{"a": [1, "b"]}'))
+        self.assertNotEqual(loads('{"a": NaN}')["a"], loads('{"a": NaN}')["a"])
+        self.assertEqual(2 ** 70, loads('{"a": %d}' % 2 ** 70)["a"])
+        with self.assertRaises(json.JSONDecodeError):
+            loads('{"a": ')
+
+    def test_path_tree(self):
+        tree = build_path_tree(['metadata.serialId', 'metadata', 'payload.data.partII.list.id', 'payload.data.crumbData{0}.latOffset'])
+        self.assertEqual({'metadata': None, 'payload': {'data': {'partII': {'id': None}, 'crumbData{0}': {'latOffset': None}, 'crumbData': {'latOffset': None}}}}, tree)
+
+    def test_lazy_decoder_keeps_only_referenced_sub_trees(self):
+        decode = LazyJSONDecoder(['a.b', 'a.l.list.c', 'd'])
+        line = '{"a": {"b": {"x": [1, 2]}, "l": [{"c": 1, "e": 2}, {"e": 3}], "f": "g"}, "d": null, "h": {"i": 1}}'
+        self.assertEqual({'a': {'b': {'x': [1, 2]}, 'l': [{'c': 1}, {}]}, 'd': None}, decode(line))
+        self.assertEqual({'a': 1}, LazyJSONDecoder(['a'])(b' {"a" : 1 , "b" : 2} '))
+
+    def test_lazy_decoder_errors_match_json(self):
+        decode = LazyJSONDecoder(['a'])
+        for line in ['{"b": 1,}', '{"b": tru, "a": 1}', '[1, 2', '{"b": 1} x', '{"a": 1, "extra": oops}', '{"a": 1, "b": 2']:
+            with self.assertRaises(json.JSONDecodeError) as expected:
+                json.loads(line)
+            with self.assertRaises(json.JSONDecodeError) as actual:
+                decode(line)
+            self.assertEqual(str(expected.exception), str(actual.exception))
+        self.assertEqual([1, 2], decode('[1, 2]'))
+
+    def test_lazy_backend_validates_like_json_backend(self):
+        for data_file, config_file in [('good_broadcast_tim.json', 'config_tim.ini'), ('bad.json', 'config.ini'), ('good_bsmTx.json', 'config_bsm.ini')]:
+            with open('tests/testfiles/' + data_file) as f:
+                lines = f.readlines()
+            expected = list(TestCase('odevalidator/configs/' + config_file, json_backend='json').validate_stream(lines))
+            actual = list(TestCase('odevalidator/configs/' + config_file, json_backend='lazy').validate_stream(lines))
+            self.assertEqual([[str(v) for v in r.field_validations] for r in expected], [[str(v) for v in r.field_validations] for r in actual])
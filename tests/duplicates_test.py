@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from odevalidator import TestCase, decoding
+from odevalidator.duplicates import DUPLICATE_CHECK, BloomFilter, DuplicateDetector
+from odevalidator.sampling import HashSampler
+from odevalidator.result import ERROR_DUPLICATE_RECORD, ERROR_PROBABLE_DUPLICATE_RECORD
+
+def record(serial_number, payload='x'):
+    return {'metadata': {'serialId': {'streamId': 's', 'bundleId': 0, 'recordId': serial_number, 'serialNumber': serial_number}}, 'payload': {'data': payload}}
+
+class DuplicateDetectionTest(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/testfiles/good.json') as f:
+            self.lines = [line for line in f if line.strip() and not line.startswith('#')]
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [b'key%d' % i for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in keys))
+        false_positives = sum(b'other%d' % i in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+        self.assertAlmostEqual(0.01, bloom.false_positive_rate(), delta=0.005)
+
+    def test_duplicates_in_and_out_of_the_window(self):
+        detector = DuplicateDetector(capacity=1000, window=3)
+        self.assertEqual([], detector.add_record(record(1)))
+        findings = detector.add_record(record(1))
+        self.assertEqual([ERROR_DUPLICATE_RECORD], [finding.code for finding in findings])
+        self.assertEqual(DUPLICATE_CHECK, findings[0].field_path)
+        self.assertEqual("Detected duplicate record of streamId 's', bundleId '0', recordId '1', serialNumber '1'", findings[0].details)
+        for serial_number in range(2, 6):
+            detector.add_record(record(serial_number))
+        # out of the window, only the filter remembers it
+        self.assertEqual([], detector.add_record(record(1)))
+        self.assertEqual((7, 1, 1), (detector.record_count, detector.duplicate_count, detector.probable_count))
+
+        detector = DuplicateDetector(capacity=1000, window=1, report_probable=True)
+        detector.add_record(record(1))
+        detector.add_record(record(2))
+        self.assertEqual([ERROR_PROBABLE_DUPLICATE_RECORD], [finding.code for finding in detector.add_record(record(1))])
+
+    def test_payload_hash(self):
+        detector = DuplicateDetector(capacity=1000, payload_hash=True)
+        detector.add_record(record(1))
+        self.assertEqual([], detector.add_record(record(1, payload='y')))
+        self.assertEqual(1, len(detector.add_record(record(1, payload='y'))))
+
+    def test_test_case_reports_duplicated_records(self):
+        lines = self.lines[:10] + self.lines[5:6] + self.lines[10:]
+        results = list(TestCase('odevalidator/configs/config.ini', duplicate_detection=True).validate_stream(lines))
+        duplicates = [field for result in results for field in result.field_validations if field.field_path == DUPLICATE_CHECK]
+        self.assertEqual(1, len(duplicates))
+        # without a duplicate, or by default, nothing is reported
+        test_case = TestCase('odevalidator/configs/config.ini', failures_only=True, duplicate_detection=True)
+        list(test_case.validate_stream(self.lines))
+        self.assertEqual(0, test_case.duplicate_detector.duplicate_count)
+        self.assertNotIn(DUPLICATE_CHECK, test_case.summary.field_counts)
+        test_case = TestCase('odevalidator/configs/config.ini')
+        list(test_case.validate_stream(lines))
+        self.assertIsNone(test_case.duplicate_detector)
+
+    def test_settings_enable_duplicate_detection(self):
+        directory = tempfile.mkdtemp()
+        try:
+            config_path = os.path.join(directory, 'config.ini')
+            with open('odevalidator/configs/config.ini') as f:
+                config = f.read().replace('Sequential = True', 'Sequential = True\nDuplicateDetection = True\nDuplicateWindow = 10', 1)
+            with open(config_path, 'w') as f:
+                f.write(config)
+            test_case = TestCase(config_path, failures_only=True)
+            list(test_case.validate_stream(self.lines + self.lines[:1]))
+            self.assertEqual(10, test_case.duplicate_detector.window_size)
+            self.assertEqual(1, test_case.duplicate_detector.probable_count)
+            test_case = TestCase(config_path, duplicate_detection=False)
+            list(test_case.validate_stream(self.lines[:1]))
+            self.assertIsNone(test_case.duplicate_detector)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_sampled_run_of_a_non_sequential_config(self):
+        with open('tests/testfiles/good_bsmTx.json') as f:
+            lines = [line for line in f if line.strip() and not line.startswith('#')]
+        lines = lines + lines[1:2]
+        keys = []
+        # unsampled records are decoded by the lazy parser when orjson is missing, their keys carry the payload digest too
+        for backend in [None, decoding.orjson]:
+            with mock.patch('odevalidator.validator.orjson', backend):
+                for rate in [1e-9, 1]:
+                    test_case = TestCase('odevalidator/configs/config_bsm.ini', duplicate_detection={'payload_hash': True, 'window': 10})
+                    results = list(test_case.validate_sample(lines, HashSampler(rate)))
+                    self.assertEqual(1, len([field for result in results for field in result.field_validations if field.field_path == DUPLICATE_CHECK]))
+                    keys.append(list(test_case.duplicate_detector.window))
+        self.assertEqual(5, len(keys[0][0]))
+        self.assertTrue(all(key == keys[0] for key in keys))
+
+    def test_workers_send_back_what_the_duplicate_check_reads(self):
+        for config, data_file in [('odevalidator/configs/config.ini', 'tests/testfiles/good.json'), ('odevalidator/configs/config_bsm.ini', 'tests/testfiles/good_bsmTx.json')]:
+            with open(data_file) as f:
+                lines = [line for line in f if line.strip() and not line.startswith('#')]
+            # a copy of a record, and a record with the same serialId but another payload
+            changed = json.loads(lines[2])
+            changed['payload']['changed'] = True
+            lines = lines + lines[1:2] + [json.dumps(changed)]
+            for payload_hash, expected in [(False, 2), (True, 1)]:
+                counts = []
+                for workers in [None, 2]:
+                    test_case = TestCase(config, retain_records=False, duplicate_detection={'payload_hash': payload_hash})
+                    results = list(test_case.validate_stream(lines, workers=workers, chunk_size=5))
+                    counts.append(len([field for result in results for field in result.field_validations if field.field_path == DUPLICATE_CHECK]))
+                self.assertEqual([expected, expected], counts, (config, payload_hash))
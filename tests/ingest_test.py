@@ -0,0 +1,56 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from odevalidator import TestCase
+from odevalidator.ingest import LineReader, read_lines
+
+class LineReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, content, compress=False):
+        path = os.path.join(self.directory, name)
+        with (gzip.open(path, 'wb') if compress else open(path, 'wb')) as f:
+            f.write(content)
+        return path
+
+    def test_plain_chunked_and_gzip_files_yield_the_same_lines(self):
+        content = b'# comment\n{"a": 1}\r\n\n   \n{"b": 2}\n#{"c": 3}\n{"d": 4}'
+        expected = [b'{"a": 1}', b'{"b": 2}', b'{"d": 4}']
+        plain = self._write('data.json', content)
+        compressed = self._write('data.json.gz', content, compress=True)
+        self.assertEqual(expected, list(read_lines(plain)))
+        self.assertEqual(expected, list(read_lines(plain, use_mmap=False, buffer_size=3)))
+        self.assertEqual(expected, list(read_lines(compressed, buffer_size=5)))
+
+    def test_offset_is_past_the_last_line_yielded(self):
+        content = b'{"a": 1}\n# comment\n{"b": 2}\n\n'
+        path = self._write('data.json', content)
+        for reader in [LineReader(path), LineReader(path, use_mmap=False, buffer_size=4)]:
+            offsets = [reader.offset for line in reader]
+            self.assertEqual([9, 28], offsets)
+            self.assertEqual(b'{"b": 2}', content[offsets[0]:offsets[1]].split(b'\n')[1])
+
+    def test_reading_starts_at_an_offset(self):
+        content = b'{"a": 1}\n# comment\n{"b": 2}\n\n{"c": 3}\n'
+        plain = self._write('data.json', content)
+        compressed = self._write('data.json.gz', content, compress=True)
+        for reader in [LineReader(plain, start=9), LineReader(plain, use_mmap=False, buffer_size=4, start=9), LineReader(compressed, start=9)]:
+            self.assertEqual([(b'{"b": 2}', 28), (b'{"c": 3}', 38)], [(line, reader.offset) for line in reader])
+
+    def test_empty_file(self):
+        self.assertEqual([], list(read_lines(self._write('empty.json', b''))))
+
+    def test_validate_stream_from_reader(self):
+        with open('tests/testfiles/bad.json', 'rb') as f:
+            path = self._write('bad.json.gz', f.read(), compress=True)
+        with open('tests/testfiles/bad.json') as f:
+            expected = list(TestCase('odevalidator/configs/config.ini').validate_stream(f))
+        actual = list(TestCase('odevalidator/configs/config.ini').validate_stream(read_lines(path)))
+        self.assertEqual([str(r) for r in expected], [str(r) for r in actual])
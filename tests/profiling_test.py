@@ -0,0 +1,50 @@
+import unittest
+from odevalidator import TestCase, ValidationProfiler
+from odevalidator.profiling import PHASE_PARSE, PHASE_SEQUENTIAL, PHASE_VALIDATE
+
+class ValidationProfilerTest(unittest.TestCase):
+
+    def test_profiled_results_match_plain_results(self):
+        with open('tests/testfiles/bad.json') as f:
+            lines = f.readlines()
+        plain_results = list(TestCase('odevalidator/configs/config.ini').validate_stream(lines))
+        profiled_results = list(TestCase('odevalidator/configs/config.ini', profiler=ValidationProfiler()).validate_stream(lines))
+        self.assertEqual([str(r) for r in plain_results], [str(r) for r in profiled_results])
+
+    def test_sections_lists_and_phases_are_measured(self):
+        profiler = ValidationProfiler()
+        validator = TestCase('odevalidator/configs/config_bsm.ini', profiler=profiler)
+        with open('tests/testfiles/good_bsmTx.json') as f:
+            results = list(validator.validate_stream(f))
+        self.assertEqual(5, profiler.record_count)
+        self.assertEqual(5, profiler.field_stats['metadata.recordGeneratedAt'][0])
+        list_section = 'payload.data.partII{0}.value.pathHistory.crumbData.list.latOffset'
+        expansions, field_count, seconds = profiler.list_stats[list_section]
+        self.assertEqual(5, expansions)
+        self.assertEqual(field_count, profiler.field_stats[list_section][0])
+        field_validation_count = sum(len(r.field_validations) for r in results if r.serial_id is not None)
+        self.assertEqual(field_validation_count, sum(calls for calls, seconds in profiler.field_stats.values()))
+        for phase in (PHASE_PARSE, PHASE_VALIDATE):
+            self.assertTrue(profiler.phase_seconds[phase] > 0)
+        self.assertEqual(3, len(profiler.top_sections(3)))
+
+    def test_hooks_are_called_per_run_and_every_n_records(self):
+        published = []
+        profiler = ValidationProfiler(hooks=[lambda p: published.append(p.record_count)], report_every=2)
+        validator = TestCase('odevalidator/configs/config_bsm.ini', profiler=profiler)
+        with open('tests/testfiles/good_bsmTx.json') as f:
+            list(validator.validate_stream(f))
+        self.assertEqual([2, 4, 5], published)
+
+    def test_worker_metrics_are_merged(self):
+        with open('tests/testfiles/good.json') as f:
+            lines = f.readlines()
+        serial_profiler = ValidationProfiler()
+        list(TestCase('odevalidator/configs/config.ini', profiler=serial_profiler).validate_stream(lines))
+        parallel_profiler = ValidationProfiler()
+        list(TestCase('odevalidator/configs/config.ini', profiler=parallel_profiler).validate_stream(lines, workers=2, chunk_size=10))
+        self.assertEqual(serial_profiler.record_count, parallel_profiler.record_count)
+        self.assertTrue(serial_profiler.phase_seconds[PHASE_SEQUENTIAL] > 0)
+        self.assertTrue(parallel_profiler.phase_seconds[PHASE_PARSE] > 0)
+        self.assertEqual({section: calls for section, (calls, seconds) in serial_profiler.field_stats.items()},
+            {section: calls for section, (calls, seconds) in parallel_profiler.field_stats.items()})
@@ -1,6 +1,9 @@
 import json
+import pickle
 import unittest
-from odevalidator import FieldValidationResult, RecordValidationResult
+from decimal import Decimal
+from odevalidator import FieldValidationResult, RecordValidationResult, ValidationSummary
+from odevalidator.result import ERROR_ABOVE_UPPER_LIMIT, ERROR_FIELD_EMPTY
 
 class ResultTest(unittest.TestCase):
 
@@ -12,9 +15,40 @@ class ResultTest(unittest.TestCase):
         self.assertEqual('{"Field": null, "Valid": true, "Details": "", "SerialId": null}', json.dumps(f.to_json()))
         self.assertEqual('{"Field": null, "Valid": true, "Details": "", "SerialId": null}', str(f))
 
+    def testFieldValidationResultRendersItsCodeLazily(self):
+        f = FieldValidationResult(False, field_path="a.b", code=ERROR_ABOVE_UPPER_LIMIT, args=(Decimal('12.5'), Decimal(10)))
+        self.assertEqual(ERROR_ABOVE_UPPER_LIMIT, f.code)
+        self.assertIsNone(f._details)
+        self.assertEqual('{"Field": "a.b", "Valid": false, "Details": "Value \'12\' is greater than upper limit \'10\'", "SerialId": null, "Code": "AboveUpperLimit"}', str(f))
+        self.assertEqual("Value '12' is greater than upper limit '10'", f._details)
+        g = pickle.loads(pickle.dumps(FieldValidationResult(False, field_path="a.b", code=ERROR_FIELD_EMPTY)))
+        self.assertEqual((ERROR_FIELD_EMPTY, ()), (g.code, g.args))
+        self.assertEqual("Field empty", g.details)
+        self.assertIsNone(FieldValidationResult(False, "message").code)
+        h = FieldValidationResult.from_json(json.loads(str(f)))
+        self.assertEqual((ERROR_ABOVE_UPPER_LIMIT, "a.b", "Value '12' is greater than upper limit '10'"), (h.code, h.field_path, h.details))
+        self.assertEqual(str(f), str(h))
+
     def testRecordValidationResult(self):
         f = RecordValidationResult("serial_id", [FieldValidationResult()], "record")
         self.assertEqual("serial_id", f.serial_id)
         self.assertEqual("record", f.record)
         self.assertEqual('{"SerialId": "serial_id", "Validations": [{"Field": null, "Valid": true, "Details": "", "SerialId": null}], "Record": "record"}', json.dumps(f.to_json()))
         self.assertEqual('{"SerialId": "serial_id", "Validations": [{"Field": null, "Valid": true, "Details": "", "SerialId": null}], "Record": "record"}', str(f))
+
+    def testResultsHaveNoInstanceDict(self):
+        self.assertFalse(hasattr(FieldValidationResult(), '__dict__'))
+        self.assertFalse(hasattr(RecordValidationResult("serial_id", []), '__dict__'))
+        self.assertIsNone(RecordValidationResult("serial_id", []).record)
+
+    def testValidationSummary(self):
+        summary = ValidationSummary()
+        summary.record_count = 2
+        summary.add_pass("a.b")
+        summary.add_pass("a.b")
+        summary.add_failure("a.c")
+        other = ValidationSummary()
+        other.record_count = 1
+        other.add_failure("a.b")
+        summary.merge(other)
+        self.assertEqual('{"Records": 3, "Fields": {"a.b": {"Passed": 2, "Failed": 1}, "a.c": {"Passed": 0, "Failed": 1}}}', str(summary))
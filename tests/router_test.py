@@ -0,0 +1,69 @@
+import json
+import queue
+import unittest
+from odevalidator import TestCase, ValidatorException
+from odevalidator.router import TestCaseRouter
+
+BSM_PAYLOAD = 'us.dot.its.jpo.ode.model.OdeBsmPayload'
+TIM_PAYLOAD = 'us.dot.its.jpo.ode.model.OdeTimPayload'
+
+def read_lines(data_file):
+    with open(data_file) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+class TestCaseRouterTest(unittest.TestCase):
+
+    def setUp(self):
+        bsm = read_lines('tests/testfiles/good_bsmTx.json')
+        tim = read_lines('tests/testfiles/good_broadcast_tim.json')
+        mixed = read_lines('tests/testfiles/good.json')
+        # interleave the families like a shared output topic would
+        self.lines = []
+        for index in range(max(len(bsm), len(tim), len(mixed))):
+            for lines in (bsm, tim, mixed):
+                if index < len(lines):
+                    self.lines.append(lines[index])
+        self.configs = {BSM_PAYLOAD: 'odevalidator/configs/config_bsm.ini', TIM_PAYLOAD: 'odevalidator/configs/config_tim.ini'}
+
+    def _expected(self, config_file, lines):
+        # field results of a test case validating only its own records
+        return [[str(field) for field in result.field_validations] for result in TestCase(config_file).validate_stream(lines) if result.serial_id is not None]
+
+    def test_records_are_validated_by_their_route(self):
+        router = TestCaseRouter.from_configs(self.configs, discriminator='metadata.payloadType', default_config='odevalidator/configs/config.ini')
+        results = list(router.validate_stream(self.lines))
+        record_results = [result for result in results if result.serial_id is not None]
+        self.assertEqual(list(range(1, len(self.lines) + 1)), [result.serial_id for result in record_results])
+
+        payload_types = [json.loads(line)['metadata']['payloadType'] for line in self.lines]
+        for payload_type, config_file in list(self.configs.items()) + [(None, 'odevalidator/configs/config.ini')]:
+            routed = [index for index, value in enumerate(payload_types) if value == payload_type or (payload_type is None and value not in self.configs)]
+            expected = self._expected(config_file, [self.lines[index] for index in routed])
+            self.assertEqual(expected, [[str(field) for field in record_results[index].field_validations] for index in routed], config_file)
+        self.assertEqual(0, router.unrouted_count)
+        self.assertEqual(3, len(router.test_cases()))
+
+    def test_sequential_state_is_kept_per_route(self):
+        router = TestCaseRouter.from_configs(self.configs, discriminator='metadata.payloadType', default_config='odevalidator/configs/config.ini', failures_only=True)
+        records = [json.loads(line) for line in self.lines]
+        msg_queue = queue.Queue()
+        for record in records:
+            msg_queue.put(record)
+        router.validate_queue(msg_queue)
+        counts = {test_case.filepath: test_case.summary.record_count for test_case in router.test_cases()}
+        payload_types = [record['metadata']['payloadType'] for record in records]
+        self.assertEqual(payload_types.count(BSM_PAYLOAD), counts['odevalidator/configs/config_bsm.ini'])
+        self.assertEqual(payload_types.count(TIM_PAYLOAD), counts['odevalidator/configs/config_tim.ini'])
+
+    def test_unrouted_records_fail_on_the_discriminator(self):
+        router = TestCaseRouter({'bsmTx': TestCase('odevalidator/configs/config_bsm.ini')})
+        results = [result for result in router.validate_stream(self.lines) if result.serial_id is not None]
+        unrouted = [result for result in results if result.field_validations[0].field_path == 'metadata.recordType']
+        self.assertEqual(router.unrouted_count, len(unrouted))
+        self.assertTrue(unrouted)
+        self.assertFalse(unrouted[0].field_validations[0].valid)
+        self.assertIn("No configuration is routed for metadata.recordType value", unrouted[0].field_validations[0].details)
+
+    def test_csv_configurations_are_rejected(self):
+        with self.assertRaises(ValidatorException):
+            TestCaseRouter({'vsl': TestCase('odevalidator/configs/csvconfig.ini')})
@@ -0,0 +1,64 @@
+import unittest
+from odevalidator import TestCase, ValidatorException
+from odevalidator.sampling import HashSampler, ReservoirSampler, wilson_interval
+
+class SamplingTest(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/testfiles/bad.json') as f:
+            self.lines = [line for line in f if line.strip() and not line.startswith('#')]
+        self.full = [str(result) for result in TestCase('odevalidator/configs/config.ini').validate_stream(self.lines)]
+
+    def _field_results(self, results):
+        return [result for result in results if not result.startswith('{"SerialId": null')]
+
+    def _sequential_results(self, results):
+        return [result for result in results if result.startswith('{"SerialId": null')]
+
+    def test_wilson_interval(self):
+        self.assertEqual((0.0, 1.0), wilson_interval(0, 0))
+        low, high = wilson_interval(10, 100)
+        self.assertAlmostEqual(0.0552, low, places=4)
+        self.assertAlmostEqual(0.1744, high, places=4)
+        low, high = wilson_interval(0, 50)
+        self.assertEqual(0.0, low)
+        self.assertTrue(0 < high < 0.08)
+
+    def test_hash_sample_is_deterministic_and_checks_every_record_sequentially(self):
+        samples = []
+        for run in range(2):
+            sampler = HashSampler(0.3)
+            samples.append([str(result) for result in TestCase('odevalidator/configs/config.ini').validate_sample(self.lines, sampler)])
+        self.assertEqual(samples[0], samples[1])
+        sampled = self._field_results(samples[0])
+        self.assertTrue(0 < len(sampled) < len(self.lines))
+        # sampled records get the results, serial ids included, of a full run
+        self.assertTrue(set(sampled) <= set(self._field_results(self.full)))
+        self.assertEqual(self._sequential_results(self.full), self._sequential_results(samples[0]))
+        self.assertEqual(len(self.lines), sampler.report.record_count)
+        self.assertEqual(len(sampled), sampler.report.sampled_count)
+
+    def test_reservoir_sample(self):
+        sampler = ReservoirSampler(20, seed=7)
+        results = [str(result) for result in TestCase('odevalidator/configs/config.ini', failures_only=True).validate_sample(self.lines, sampler)]
+        self.assertEqual(20, sampler.report.sampled_count)
+        self.assertEqual(len(self.lines), sampler.report.record_count)
+        self.assertEqual(self._sequential_results([str(result) for result in TestCase('odevalidator/configs/config.ini', failures_only=True).validate_stream(self.lines)]), self._sequential_results(results))
+        rates = sampler.report.failure_rates()
+        self.assertEqual(20, rates['metadata.bsmSource']['Sampled'])
+        for rate in rates.values():
+            self.assertTrue(rate['Low'] <= rate['FailureRate'] <= rate['High'])
+
+    def test_full_rate_estimates_match_the_full_run(self):
+        sampler = HashSampler(1)
+        test_case = TestCase('odevalidator/configs/config.ini', failures_only=True)
+        list(test_case.validate_sample(self.lines, sampler))
+        expected = TestCase('odevalidator/configs/config.ini', failures_only=True)
+        list(expected.validate_stream(self.lines))
+        self.assertEqual(str(expected.summary), str(sampler.report.summary))
+
+    def test_invalid_rates(self):
+        with self.assertRaises(ValidatorException):
+            HashSampler(0)
+        with self.assertRaises(ValidatorException):
+            ReservoirSampler(0)
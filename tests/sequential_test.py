@@ -4,7 +4,7 @@ import unittest
 import dateutil.parser
 from datetime import datetime, timezone, timedelta
 
-from odevalidator import Sequential, Field
+from odevalidator import Sequential, Field, TestCase
 from tests import assert_results
 
 class SequentialUnitTest(unittest.TestCase):
@@ -47,6 +47,69 @@ class SequentialUnitTest(unittest.TestCase):
         results = self.seq.perform_sequential_validations(self.record_list)
         assert_results(self, results, 18)
 
+    def test_incremental_happy_path(self):
+        results = self._validate_incrementally(Sequential(), self.record_list)
+        self.assertEqual([], results)
+
+    def test_incremental_matches_batch_findings(self):
+        self.record_list.remove(self.record_list[19])
+        self.record_list.remove(self.record_list[8])
+        self.record_list[9] = copy.deepcopy(self.record_list[7])
+        sorted_list = sorted(self.record_list, key=lambda msg: msg['metadata']['serialId']['serialNumber'])
+        batch_results = self.seq.perform_sequential_validations(sorted_list)[0].field_validations
+        incremental_results = self._validate_incrementally(Sequential(), self.record_list)
+        self.assertEqual(sorted(r.details for r in batch_results), sorted(r.details for r in incremental_results))
+
+    def test_incremental_reorders_within_window(self):
+        shuffled_list = list(self.record_list)
+        shuffled_list[3], shuffled_list[5] = shuffled_list[5], shuffled_list[3]
+        shuffled_list[10], shuffled_list[11] = shuffled_list[11], shuffled_list[10]
+        results = self._validate_incrementally(Sequential(reorder_window=4), shuffled_list)
+        self.assertEqual([], results)
+
+    def test_incremental_closes_bundles_as_stream_moves_on(self):
+        seq = Sequential()
+        for record in self.record_list[:7]:
+            self.assertEqual([], seq.add_record(record))
+        # first record of the second bundle closes nothing yet, the tail bundle is still incomplete
+        seq.add_record(self.record_list[7])
+        self.assertEqual(2, len(seq.open_bundles))
+        for record in self.record_list[8:17]:
+            seq.add_record(record)
+        # the full bundle is complete and is checked and evicted once the third bundle starts
+        self.assertNotIn((self.record_list[7]['metadata']['serialId']['streamId'], 102), seq.open_bundles)
+        self.assertEqual([], seq.close())
+        self.assertEqual(0, len(seq.open_bundles))
+
+    def test_incremental_open_bundles_are_bounded(self):
+        seq = Sequential(max_open_bundles=2)
+        for record in self.record_list:
+            seq.add_record(record)
+            self.assertTrue(len(seq.open_bundles) <= 2)
+        seq.close()
+
+    def test_incremental_findings_wait_for_skips_found_later(self):
+        with open('tests/testfiles/good.json') as f:
+            lines = [line for line in f if line.strip() and not line.startswith('#')]
+        record = json.loads(lines[8])
+        record['metadata']['recordGeneratedAt'] = '2000-01-01T00:00:00.000Z'
+        lines[8] = json.dumps(record)
+        # TMC records later in the file skip the recordGeneratedAt checks, as they do for sharded checks
+        for shards in [None, 2]:
+            results = TestCase('odevalidator/configs/config.ini', sequential_shards=shards).validate_stream(lines)
+            self.assertEqual([], [str(field) for result in results for field in result.field_validations if not field.valid], shards)
+
+        seq = Sequential(set(), deferred_skips={'metadata.recordGeneratedAt'})
+        record_list = copy.deepcopy(self.record_list)
+        record_list[3]['metadata']['recordGeneratedAt'] = '2000-01-01T00:00:00.000Z'
+        self.assertEqual(1, len(self._validate_incrementally(seq, record_list)))
+
+    def _validate_incrementally(self, seq, record_list):
+        results = []
+        for record in record_list:
+            results.extend(seq.add_record(record))
+        results.extend(seq.close())
+        return results
 
     def build_happy_path(self, json_seed):
         record_list = []
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import multiprocessing
+import unittest
+from odevalidator import TestCase
+from odevalidator.service import InMemoryBroker, InMemorySink, TopicSink, ValidationService
+
+class SlowSink(InMemorySink):
+    def __init__(self, consumer):
+        super().__init__()
+        self.consumer = consumer
+        self.max_lag = 0
+
+    async def send(self, result):
+        await asyncio.sleep(0)
+        self.max_lag = max(self.max_lag, self.consumer.offset - len([r for r in self.results if r.serial_id is not None]))
+        await super().send(result)
+
+class ValidationServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/testfiles/bad.json') as f:
+            self.lines = [line for line in f if line.strip() and not line.startswith('#')]
+        self.expected = [str(r) for r in TestCase('odevalidator/configs/config.ini').validate_stream(self.lines)]
+
+    async def _produce(self, broker):
+        for line in self.lines:
+            await broker.produce('ode-output', line)
+        await broker.close_topic('ode-output')
+
+    def _run(self, sink_factory=InMemorySink, **kwargs):
+        async def run():
+            broker = InMemoryBroker()
+            consumer = broker.consumer('ode-output')
+            sink = sink_factory(consumer)
+            service = ValidationService(TestCase('odevalidator/configs/config.ini'), sink, **kwargs)
+            producer = asyncio.ensure_future(self._produce(broker))
+            summary = await service.run(consumer)
+            await producer
+            return consumer, sink, summary
+        return asyncio.run(run())
+
+    def test_results_match_validate_stream(self):
+        consumer, sink, summary = self._run(lambda consumer: InMemorySink(), batch_size=7)
+        self.assertEqual(self.expected, [str(r) for r in sink.results])
+        self.assertEqual(len(self.lines), consumer.committed)
+
+    def test_results_match_validate_stream_with_workers(self):
+        consumer, sink, summary = self._run(lambda consumer: InMemorySink(), batch_size=10, workers=2)
+        self.assertEqual(self.expected, [str(r) for r in sink.results])
+        # the pool is shut down and its workers joined once the run completes
+        self.assertEqual([], multiprocessing.active_children())
+
+    def test_reading_is_bounded_by_pending_batches(self):
+        consumer, sink, summary = self._run(SlowSink, batch_size=5, max_pending_batches=1)
+        self.assertEqual(self.expected, [str(r) for r in sink.results])
+        # read-ahead queue, the batch being formed, one queued and one publishing batch
+        self.assertTrue(sink.max_lag <= 5 * 4 + 1, sink.max_lag)
+
+    def test_results_published_to_topic(self):
+        async def run():
+            broker = InMemoryBroker()
+            for line in ['{"metadata": {}}', '', '# comment']:
+                await broker.produce('ode-output', line)
+            await broker.close_topic('ode-output')
+            await ValidationService(TestCase('odevalidator/configs/config_bsm.ini'), TopicSink(broker, 'results')).run(broker.consumer('ode-output'))
+            return broker.values('results')
+        results = [json.loads(value) for value in asyncio.run(run())]
+        self.assertEqual([1], [result['SerialId'] for result in results])
+        self.assertFalse(all(validation['Valid'] for validation in results[0]['Validations']))
+
+    def test_sink_errors_stop_the_service(self):
+        class FailingSink(InMemorySink):
+            async def send(self, result):
+                raise RuntimeError("sink unavailable")
+
+        async def run():
+            broker = InMemoryBroker()
+            for line in self.lines:
+                await broker.produce('ode-output', line)
+            # the topic stays open, as a live topic would
+            await ValidationService(TestCase('odevalidator/configs/config.ini'), FailingSink(), batch_size=3, max_pending_batches=1).run(broker.consumer('ode-output'))
+        with self.assertRaises(RuntimeError):
+            asyncio.run(asyncio.wait_for(run(), 10))
@@ -0,0 +1,123 @@
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import types
+import unittest
+from unittest import mock
+from odevalidator import TestCase
+from odevalidator.sequential import Sequential
+from odevalidator.sharding import ShardResult, ShardWriter, ShardedSequential, combine_shard_results, shard_of, validate_shard, validate_shard_files
+
+def build_records(streams=3, bundles=4, bundle_size=5):
+    records = []
+    for stream in range(streams):
+        serial_number = 0
+        for bundle in range(bundles):
+            for record_id in range(bundle_size):
+                records.append({'metadata': {
+                    'logFileName': 'stream%d.csv' % stream,
+                    'serialId': {'streamId': 'stream-%d' % stream, 'bundleSize': bundle_size, 'bundleId': bundle, 'recordId': record_id, 'serialNumber': serial_number},
+                    'recordGeneratedAt': '2019-03-14T14:54:%02d.000Z' % (serial_number % 60),
+                    'odeReceivedAt': '2019-03-25T19:21:%02d.000Z' % (serial_number % 60)}})
+                serial_number += 1
+    # gaps, a duplicate and a bundle cut short
+    del records[57]
+    del records[31]
+    records[12] = json.loads(json.dumps(records[10]))
+    del records[4]
+    return records
+
+def sequential_findings(records):
+    seq = Sequential()
+    findings = []
+    for record in records:
+        findings.extend(seq.add_record(record))
+    return findings + seq.close()
+
+class ShardingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.records = build_records()
+        self.expected = sorted(str(finding) for finding in sequential_findings(self.records))
+        self.assertTrue(self.expected)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shard_of_is_stable(self):
+        self.assertEqual(shard_of(('stream-1', 3), 7), shard_of(('stream-1', 3), 7))
+        self.assertEqual({0}, {shard_of(('stream-%d' % stream, bundle), 1) for stream in range(3) for bundle in range(4)})
+        self.assertTrue(all(0 <= shard_of(('stream-%d' % stream, bundle), 5) < 5 for stream in range(3) for bundle in range(4)))
+
+    def test_sharded_findings_match_the_unsharded_checks(self):
+        for shards, workers in [(1, None), (4, None), (3, 2)]:
+            seq = ShardedSequential(shards=shards, workers=workers)
+            for record in self.records:
+                self.assertEqual([], seq.add_record(record))
+            findings = seq.close()
+            self.assertEqual(self.expected, sorted(str(finding) for finding in findings))
+            self.assertEqual(len(self.records), seq.result.record_count)
+            self.assertEqual(12, seq.result.bundle_count)
+
+    def test_sharded_records_are_released_as_bundles_close(self):
+        for workers in [None, 2]:
+            seq = ShardedSequential(shards=2, workers=workers, batch_size=4)
+            for record in self.records:
+                seq.add_record(record)
+                self.assertTrue(all(len(batch) < 4 for batch in seq.batches))
+            if workers is None:
+                # every bundle but the last one of each stream has closed
+                self.assertTrue(sum(len(s.open_bundles) for s in seq.sequentials.values()) <= 6)
+            else:
+                self.assertTrue(all(len(pending) <= 2 for pending in seq.pending))
+            self.assertEqual(self.expected, sorted(str(finding) for finding in seq.close()))
+
+    def test_sharded_checks_resume_from_a_pickle(self):
+        for workers in [None, 2]:
+            seq = ShardedSequential(shards=3, workers=workers, batch_size=4)
+            for record in self.records[:30]:
+                seq.add_record(record)
+            restored = pickle.loads(pickle.dumps(seq))
+            seq.close()
+            for record in self.records[30:]:
+                restored.add_record(record)
+            self.assertEqual(self.expected, sorted(str(finding) for finding in restored.close()))
+            self.assertEqual(len(self.records), restored.result.record_count)
+
+    def test_shard_files_of_several_hosts_combine(self):
+        hosts = [os.path.join(self.directory, 'host%d' % host) for host in range(2)]
+        # the first host wrote the first 30 records, the second one the rest
+        for directory, records in zip(hosts, [self.records[:30], self.records[30:]]):
+            with ShardWriter(directory, 4) as writer:
+                for record in records:
+                    writer.write(record)
+        shard_paths = [[os.path.join(directory, name) for directory in hosts if os.path.exists(os.path.join(directory, name))] for name in sorted(set(os.listdir(hosts[0])) | set(os.listdir(hosts[1])))]
+        result = validate_shard_files(shard_paths, workers=2)
+        self.assertEqual(self.expected, sorted(str(finding) for finding in result.findings))
+
+        # shard files are streamed into the checks, not read into a list first
+        with mock.patch('odevalidator.sharding.validate_shard', side_effect=validate_shard) as checks:
+            validate_shard_files(shard_paths)
+        self.assertTrue(all(isinstance(call[0][0], types.GeneratorType) for call in checks.call_args_list))
+
+        # partial results of each host's view of a shard travel as json
+        partials = [ShardResult.from_json(json.loads(str(validate_shard_files([paths])))) for paths in shard_paths]
+        combined = combine_shard_results(partials)
+        self.assertEqual(len(self.records), combined.record_count)
+        self.assertEqual([str(finding) for finding in result.sorted_findings()], [str(finding) for finding in combined.sorted_findings()])
+        # findings keep their error code through json
+        self.assertEqual([finding.code for finding in result.sorted_findings()], [finding.code for finding in combined.sorted_findings()])
+        self.assertTrue(all(finding.code is not None for finding in combined.findings))
+
+    def test_test_case_with_sequential_shards(self):
+        for data_file in ['tests/testfiles/good.json', 'tests/testfiles/bad.json']:
+            with open(data_file) as f:
+                lines = f.readlines()
+            findings = []
+            for shards in [None, 2]:
+                results = TestCase(sequential_shards=shards).validate_stream(lines)
+                findings.append(sorted(str(field) for result in results if result.serial_id is None for field in result.field_validations))
+            self.assertEqual(findings[0], findings[1], data_file)
@@ -0,0 +1,25 @@
+import unittest
+import dateutil.parser
+from odevalidator.timestamps import TimestampCache, parse_timestamp
+
+class TimestampsUnitTest(unittest.TestCase):
+
+    def test_parse_timestamp_matches_dateutil(self):
+        for value in ["2019-03-14T14:54:21.596Z", "2019-03-14T14:54:21Z", "2019-03-14T14:54:21.1234567Z", "2019-03-14T14:54:21.5-05:00", "2019-03-14 14:54:21", "2019-03-14T14:54:21+0530"]:
+            self.assertEqual(dateutil.parser.parse(value), parse_timestamp(value))
+            self.assertEqual(str(dateutil.parser.parse(value)), str(parse_timestamp(value)))
+
+    def test_parse_timestamp_falls_back_to_dateutil(self):
+        self.assertEqual(dateutil.parser.parse("14 Mar 2019 14:54:21"), parse_timestamp("14 Mar 2019 14:54:21"))
+        with self.assertRaises(ValueError):
+            parse_timestamp("2019-13-14T14:54:21Z")
+        with self.assertRaises(ValueError):
+            parse_timestamp("invalidTimeStamp")
+
+    def test_cache_reuses_parsed_values(self):
+        cache = TimestampCache(max_size=2)
+        first = cache.parse("2019-03-14T14:54:21.596Z")
+        self.assertIs(first, cache.parse("2019-03-14T14:54:21.596Z"))
+        cache.parse("2019-03-14T14:54:22.596Z")
+        cache.parse("2019-03-14T14:54:23.596Z")
+        self.assertTrue(len(cache.values) <= 2)
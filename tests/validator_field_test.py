@@ -1,7 +1,7 @@
 import unittest
 import queue
 import json
-from odevalidator import Field, ValidatorException
+from odevalidator import Field, ValidatorException, get_accessor
 
 class FieldUnitTest(unittest.TestCase):
     def test_constructor_fails_no_key(self):
@@ -171,3 +171,42 @@ class FieldUnitTest(unittest.TestCase):
         test_field = Field("a.b.c", test_field_object)
         self.assertEqual('{"Path": "a.b.c", "Type": "timestamp", "UpperLimit": null, "LowerLimit": null, "Values": null, "Choices": null, "EqualsValue": null, "EarliestTime": "2019-03-14T14:54:20+00:00", "LatestTime": null, "AllowEmpty": false}', json.dumps(test_field.to_json()))
         self.assertEqual('{"Path": "a.b.c", "Type": "timestamp", "UpperLimit": null, "LowerLimit": null, "Values": null, "Choices": null, "EqualsValue": null, "EarliestTime": "2019-03-14T14:54:20+00:00", "LatestTime": null, "AllowEmpty": false}', str(test_field))
+
+    def test_get_field_value_list_index_succeeds(self):
+        test_field = Field("a.b{1}.c", {"Type":"decimal"})
+        test_data = {"a":{"b":[{"c":1}, {"c":2}]}}
+        self.assertEqual(2, test_field.accessor.get(test_data))
+        self.assertIsNone(test_field.accessor.get({"a":{"b":[{"c":1}]}}))
+
+    def test_accessors_are_shared_by_path(self):
+        first_field = Field("a.b", {"Type":"decimal"})
+        second_field = Field("a.b", {"Type":"string"})
+        self.assertIs(first_field.accessor, second_field.accessor)
+        self.assertIs(first_field.accessor, get_accessor("a.b"))
+
+    def test_validate_enum_is_case_insensitive(self):
+        test_field = Field("a.b", {"Type":"enum", "Values":"[\"Alpha\", \"beta\"]"})
+        self.assertTrue(test_field.validate({"a":{"b":"ALPHA"}}).valid)
+        self.assertEqual(frozenset(["alpha", "beta"]), test_field.enum_values)
+
+    def test_validate_regex_requires_complete_match(self):
+        test_field = Field("a.b", {"Type":"string", "RegularExpression":"\\d\\d\\d"})
+        self.assertTrue(test_field.validate({"a":{"b":"123"}}).valid)
+        self.assertEqual("Regular Expressions do not completely match in 'a.b'", test_field.validate({"a":{"b":"1234"}}).details)
+        self.assertEqual("Regular Expressions found no match in 'a.b'", test_field.validate({"a":{"b":"abc"}}).details)
+
+    def test_validate_choice_requires_exactly_one(self):
+        test_field = Field("a", {"Type":"choice", "Choices":"[\"b\", \"c\"]"})
+        self.assertTrue(test_field.validate({"a":{"b":1}}).valid)
+        result = test_field.validate({"a":{"b":1, "c":2}})
+        self.assertFalse(result.valid)
+        self.assertEqual("a", result.field_path)
+        self.assertEqual("MultipleChoices", result.code)
+        self.assertEqual("Found '2' choices in 'a'", result.details)
+
+    def test_constructor_fails_invalid_regex(self):
+        try:
+            Field("a.b", {"Type":"string", "RegularExpression":"("})
+            self.fail("Expected ValidatorException")
+        except ValidatorException as e:
+            self.assertTrue(str(e).startswith("Unable to compile configuration file RegularExpression for field a.b="))
@@ -68,6 +68,47 @@ class ValidatorIntegrationTest(unittest.TestCase):
         results = self._validate_file(data_file, regex_config)
         assert_results(self, results, 3)
 
+    def test_validate_stream_from_file_object(self):
+        validator = TestCase('odevalidator/configs/config.ini')
+        with open('tests/testfiles/good.json') as f:
+            results = validator.validate_stream(f)
+            first_result = next(results)
+            self.assertEqual(1, first_result.serial_id)
+            remaining_results = list(results)
+        assert_results(self, [first_result] + remaining_results, 0)
+        self.assertEqual(None, remaining_results[-1].serial_id)
+
+    def test_validate_stream_skips_header_and_comments(self):
+        validator = TestCase('odevalidator/configs/csvconfig.ini')
+        with open('tests/testfiles/bad_vsl.csv') as f:
+            lines = ['# exported from the roadside unit\n'] + f.readlines() + ['\n']
+        results = list(validator.validate_stream(lines))
+        assert_results(self, results, 4)
+
+    def test_parallel_validation_matches_serial_validation(self):
+        validator = TestCase('odevalidator/configs/config.ini')
+        with open('tests/testfiles/bad.json') as f:
+            lines = f.readlines()
+        serial_results = list(validator.validate_stream(lines))
+        parallel_results = list(TestCase('odevalidator/configs/config.ini').validate_stream(lines, workers=2, chunk_size=7))
+        assert_results(self, parallel_results, 29)
+        self.assertEqual([r.serial_id for r in serial_results], [r.serial_id for r in parallel_results])
+        self.assertEqual([str(r) for r in serial_results], [str(r) for r in parallel_results])
+
+    def test_failures_only_mode_keeps_only_invalid_fields(self):
+        validator = TestCase('odevalidator/configs/config.ini', failures_only=True, retain_records=False)
+        with open('tests/testfiles/bad.json') as f:
+            results = list(validator.validate_stream(f))
+        assert_results(self, results, 29)
+        for result in results:
+            self.assertIsNone(result.record)
+            for validation in result.field_validations:
+                self.assertFalse(validation.valid)
+        failed_count = sum(failed for passed, failed in validator.summary.field_counts.values())
+        self.assertEqual(29, failed_count)
+        self.assertEqual(len([r for r in results if r.serial_id is not None]), validator.summary.record_count)
+        self.assertTrue(validator.summary.field_counts['metadata.odeReceivedAt'][0] > 0)
+
     def _validate_file(self, data_file, config_file = 'odevalidator/configs/config.ini'):
         validator = TestCase(config_file, )
 
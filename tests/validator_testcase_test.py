@@ -1,4 +1,5 @@
 from odevalidator import TestCase, ValidatorException
+from odevalidator.validator import PathAccessor, PathTrie
 import unittest
 import queue
 
@@ -16,3 +17,47 @@ class ValidatorUnitTest(unittest.TestCase):
             self.assertTrue(len(validator.config.sections()) > 0)
         except ValidatorException as e:
             self.fail("Unexpected exception: %s" % str(e))
+
+    def test_list_sections_are_compiled_once_and_bound_per_record(self):
+        validator = TestCase(filepath="odevalidator/configs/config_bsm.ini")
+        self.assertTrue(len(validator.list_templates) > 0)
+        record = {"payload": {"data": {"partII": [{"id": "VehicleSafetyExtensions"}, {"id": "SpecialVehicleExtensions"}]}}}
+        first_fields = validator.populate_field_list(record)
+        second_fields = validator.populate_field_list(record)
+        self.assertIn("payload.data.partII{1}.id", [field.path for field in first_fields])
+        self.assertEqual(len(first_fields), len(second_fields))
+        for first_field, second_field in zip(first_fields, second_fields):
+            self.assertIs(first_field, second_field)
+
+    def test_path_trie_resolves_what_every_accessor_reads(self):
+        paths = ["a.b.c", "a.b.d", "a.b", "a.x.y", "l{1}.v", "l{5}.v", "n{0}", "s.k", "z", "e{0}.v"]
+        records = [
+            {},
+            {"a": {"b": {"c": 1, "d": None}}, "l": [{"v": 1}, {"v": 2}], "n": None, "s": "text", "e": []},
+            {"a": {"b": "", "x": {"y": [1]}}, "l": [], "z": 0, "e": "abc"},
+        ]
+        trie = PathTrie(paths)
+        for record in records:
+            values = trie.resolve(record, {})
+            for path in paths:
+                if path in values:
+                    self.assertEqual(PathAccessor(path).get(record), values[path], (record, path))
+
+    def test_path_trie_leaves_out_paths_whose_lookup_raises(self):
+        record = {"a": 5, "b": {"c": None}}
+        values = PathTrie(["a.x", "b.c.d", "b.c"]).resolve(record, {})
+        self.assertEqual({"b.c": ""}, values)
+        with self.assertRaises(TypeError):
+            PathAccessor("a.x").get(record)
+
+    def test_field_values_are_resolved_once_per_record(self):
+        validator = TestCase(filepath="odevalidator/configs/config_bsm.ini")
+        with open("tests/testfiles/good_bsmTx.json") as f:
+            record = validator.record_parser["json"](f.readline())
+        values = validator.record_lookups.begin(record)
+        self.assertIn("metadata.recordType", values)
+        validator.field_list_temp = validator.populate_field_list(record)
+        validator._resolve_bound_fields(record, values)
+        for field in validator.field_list + validator.field_list_temp:
+            self.assertEqual(field.accessor.get(record), values[field.path], field.path)
+        self.assertEqual(1, len(validator.bound_tries))
@@ -0,0 +1,61 @@
+import io
+import json
+import unittest
+from odevalidator import TestCase, ValidatorException
+from odevalidator.result import ERROR_REQUIRED_FIELD_MISSING, ERROR_VALUE_NOT_EXPECTED
+from odevalidator.writers import FailuresWriter, NDJSONWriter, SummaryWriter, TextWriter, get_writer
+
+class ResultWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        with open('tests/testfiles/bad.json') as f:
+            self.lines = f.readlines()
+        self.results = list(TestCase('odevalidator/configs/config.ini').validate_stream(self.lines))
+
+    def test_text_writer(self):
+        stream = io.StringIO()
+        with TextWriter(stream) as writer:
+            writer.write_all(self.results)
+        output = stream.getvalue().splitlines()
+        self.assertEqual(29, len([line for line in output if line.startswith("Invalid field '")]))
+        self.assertEqual("Success:  False ", output[-2])
+        self.assertFalse(writer.success)
+
+    def test_ndjson_writer(self):
+        stream = io.StringIO()
+        with NDJSONWriter(stream) as writer:
+            writer.write_all(self.results)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([r.to_json() for r in self.results], [json.loads(line) for line in lines])
+
+        stream = io.StringIO()
+        NDJSONWriter(stream, include_records=False).write_all(self.results[:1])
+        self.assertNotIn("Record", json.loads(stream.getvalue()))
+
+    def test_failures_writer(self):
+        stream = io.StringIO()
+        FailuresWriter(stream).write_all(self.results)
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(29, sum(len(line["Validations"]) for line in lines))
+        for line in lines:
+            self.assertTrue(line["Validations"])
+            self.assertFalse(any(validation["Valid"] for validation in line["Validations"]))
+
+    def test_summary_writer_counts_the_same_in_failures_only_mode(self):
+        summaries = []
+        for failures_only in [False, True]:
+            validator = TestCase('odevalidator/configs/config.ini', failures_only=failures_only)
+            stream = io.StringIO()
+            with SummaryWriter(stream, validator) as writer:
+                writer.write_all(validator.validate_stream(self.lines))
+            summaries.append(json.loads(stream.getvalue()))
+        self.assertEqual(summaries[0], summaries[1])
+        self.assertEqual(99, summaries[0]["Records"])
+        self.assertEqual({"Passed": 94, "Failed": 5, "Errors": {"Required Field is missing.": 3,
+            "Value of Field ('RV') is not one of the expected values (['EV'])": 1,
+            "Value of Field ('EV') is not one of the expected values (['RV'])": 1},
+            "Codes": {ERROR_REQUIRED_FIELD_MISSING: 3, ERROR_VALUE_NOT_EXPECTED: 2}}, summaries[0]["Fields"]["metadata.bsmSource"])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValidatorException):
+            get_writer('xml')